@@ -0,0 +1,74 @@
+"""
+Benchmarks the Paralympic country / medal / draft joins (paralympics/main.py)
+on synthetic Summer-Paralympics-sized inputs, and how they scale.
+
+The joins go through dict indexes, so growing both the NPCs and the events
+by N should cost about N times as much; quadratic joins would cost about N^2.
+Wall-clock ratios of millisecond-scale work are too noisy for the test suite,
+so the measurement lives here.
+
+Usage:
+    python bench_paralympics_joins.py [--scale 8] [--countries 180] [--events 520] [--repeat 5]
+"""
+import argparse
+import importlib.util
+import os
+import time
+
+_spec = importlib.util.spec_from_file_location(
+    'paralympics_main', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'paralympics', 'main.py'))
+paralympics = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(paralympics)
+
+
+def games(n_countries, n_events=520):
+    """Summer-Paralympics-sized inputs: n NPCs, medals from n_events spread over the first half of them."""
+    names = ["Norway", "USA", "Great Britain"] + [f"Nation {i}" for i in range(n_countries)]
+    participants = {paralympics.normalize_country_name(name): 5 + i % 200 for i, name in enumerate(names)}
+    medals = {}
+    for event in range(n_events):
+        for place, medal in enumerate(('Gold', 'Silver', 'Bronze')):
+            name = names[(event * 3 + place) % max(1, len(names) // 2)]
+            norm = paralympics.normalize_country_name(name)
+            row = medals.setdefault(norm, {'CountryRaw': name, 'Country': norm, 'Gold': 0, 'Silver': 0, 'Bronze': 0,
+                                           'GoldHW': 0, 'SilverHW': 0, 'BronzeHW': 0, 'Hardware': 0})
+            row[medal] += 1
+            row[medal + 'HW'] += 1
+            row['Hardware'] += 1
+    return participants, list(medals.values())
+
+
+def run(participants, medals):
+    multipliers, max_participants = paralympics.calculate_dynamic_multipliers(participants)
+    rows = paralympics.build_country_outputs(participants, medals, multipliers, max_participants)
+    return rows, paralympics.build_player_scores(rows)
+
+
+def best_time(n_countries, n_events, repeat=5):
+    participants, medals = games(n_countries, n_events)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(participants, medals)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Paralympic joins and how they scale.")
+    parser.add_argument('--scale', type=int, default=8, help="Grow NPCs and events by this factor")
+    parser.add_argument('--countries', type=int, default=180)
+    parser.add_argument('--events', type=int, default=520)
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per size (the best one counts)")
+    args = parser.parse_args(argv)
+
+    small = best_time(args.countries, args.events, args.repeat)
+    large = best_time(args.countries * args.scale, args.events * args.scale, args.repeat)
+    print(f"{args.countries} NPCs / {args.events} events: {small * 1000:.2f} ms")
+    print(f"{args.countries * args.scale} NPCs / {args.events * args.scale} events: {large * 1000:.2f} ms")
+    print(f"Ratio {large / small:.1f}x for {args.scale}x the input (linear ~{args.scale}x, "
+          f"quadratic ~{args.scale ** 2}x)")
+
+
+if __name__ == '__main__':
+    main()
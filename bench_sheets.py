@@ -0,0 +1,95 @@
+"""
+Benchmarks a full main() run against the in-process Sheets stand-in.
+
+No credentials or network needed: the sheet is seeded from the local JSON files
+and the scrape step reuses scraped_details.json / scraped_medals.json. Each run
+works in a scratch directory so the tracked CSVs are left alone.
+
+Usage:
+    python bench_sheets.py [--runs 3] [--latency 0.25] [--quota 60] [--json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import main as tracker
+from fake_sheets import FakeClient, tracker_tabs
+
+INPUT_FILES = ['scraped_details.json', 'scraped_medals.json', 'multipliers.json']
+
+
+def build_client(latency=0.0, quota_per_minute=None):
+    with open('scraped_medals.json', 'r') as f:
+        medal_counts = json.load(f)
+    with open('multipliers.json', 'r') as f:
+        multipliers = json.load(f)
+    tabs = tracker_tabs(medal_counts, multipliers, tracker.DRAFTED_TEAMS)
+    return FakeClient({tracker.SHEET_KEY: tabs}, latency=latency, quota_per_minute=quota_per_minute)
+
+
+def run_benchmark(runs=3, latency=0.0, quota_per_minute=None, verbose=False):
+    """Runs main() `runs` times against one fake sheet; returns per-run stats."""
+    client = build_client(latency, quota_per_minute)
+    results = []
+    src_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in INPUT_FILES:
+            shutil.copy(os.path.join(src_dir, name), tmp)
+        os.chdir(tmp)
+        try:
+            for run in range(1, runs + 1):
+                before = client.stats.summary()
+                start = time.perf_counter()
+                quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+                with quiet:
+                    tracker.main(client=client, offline=True)
+                elapsed = time.perf_counter() - start
+                after = client.stats.summary()
+                results.append({
+                    "run": run,
+                    "wall_time": round(elapsed, 3),
+                    "requests": after["requests"] - before["requests"],
+                    "reads": after["reads"] - before["reads"],
+                    "writes": after["writes"] - before["writes"],
+                    "cells_read": after["cells_read"] - before["cells_read"],
+                    "cells_written": after["cells_written"] - before["cells_written"],
+                    "throttled": after["throttled"] - before["throttled"],
+                })
+        finally:
+            os.chdir(src_dir)
+    return results, client
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark main() against a fake Google Sheet.")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help="Simulated seconds per API request")
+    parser.add_argument('--quota', type=int, default=None, help="Requests per minute (read and write each)")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    parser.add_argument('--verbose', action='store_true', help="Show main() output")
+    parser.add_argument('--dump', help="Save the final fake sheet to this JSON file")
+    args = parser.parse_args(argv)
+
+    results, client = run_benchmark(args.runs, args.latency, args.quota, args.verbose)
+    if args.dump:
+        client.dump(args.dump)
+
+    if args.json:
+        print(json.dumps({"runs": results, "totals": client.stats.summary()}, indent=2))
+        return
+
+    print(f"{'Run':>3} {'Wall(s)':>8} {'Reqs':>5} {'Reads':>5} {'Writes':>6} {'CellsR':>7} {'CellsW':>7} {'429s':>4}")
+    for r in results:
+        print(f"{r['run']:>3} {r['wall_time']:>8.3f} {r['requests']:>5} {r['reads']:>5} {r['writes']:>6} "
+              f"{r['cells_read']:>7} {r['cells_written']:>7} {r['throttled']:>4}")
+    print()
+    client.stats.report()
+
+
+if __name__ == '__main__':
+    main()
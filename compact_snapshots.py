@@ -0,0 +1,164 @@
+"""
+Retention and compaction for the snapshot store (see snapshot_store.py).
+
+Every run adds four small Parquet files, and most runs change nothing: the
+page wasn't edited since the last poll. Left alone the store grows by ~400
+files a day and every time-travel query opens a pile of tiny files. This:
+
+1. Folds runs whose data is identical to the run before them (same counts,
+   details and scores content hashes) into that earlier run. The kept run
+   gets valid_until = time of the last run it stands for and merged_runs =
+   how many runs it covers, so nothing is lost: an "as of" query between the
+   two times still finds it by bisecting run_time, and gets the same data.
+2. Past the recent window (RECENT_DAYS, full resolution) keeps only the last
+   run of each UTC day, a daily rollup.
+3. Rewrites every date partition it touched as one file per table
+   (date=.../compacted.parquet) with large row groups, instead of one file
+   per run.
+
+Safe to re-run: the merged file is written atomically before the per-run
+files are removed, and if a crash leaves both, the rows of a run are read
+from only one of them.
+
+    python compact_snapshots.py [--recent-days 7] [--dry-run]
+"""
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+
+import snapshot_store
+
+RECENT_DAYS = 7
+COMPACTED_NAME = 'compacted'
+HASH_COLUMNS = ('counts_hash', 'details_hash', 'scores_hash')
+
+
+def _date(run_time):
+    return run_time.astimezone(timezone.utc).strftime('%Y-%m-%d')
+
+
+def fold_identical(runs):
+    """Folds each run whose hashes match the kept run before it into that run."""
+    kept = []
+    for run in runs:
+        covers_until = run.get('valid_until') or run['run_time']
+        merged = run.get('merged_runs') or 1
+        previous = kept[-1] if kept else None
+        if previous and all(previous[c] == run[c] for c in HASH_COLUMNS):
+            previous['valid_until'] = max(previous['valid_until'], covers_until)
+            previous['merged_runs'] += merged
+        else:
+            kept.append(dict(run, valid_until=covers_until, merged_runs=merged))
+    return kept
+
+
+def plan_retention(runs, now, recent_days=RECENT_DAYS):
+    """
+    runs: run rows (dicts with run_id, run_time, the hashes and maybe
+    valid_until / merged_runs). Returns the runs to keep, oldest first, with
+    valid_until / merged_runs covering the runs folded into them.
+    """
+    cutoff = now - timedelta(days=recent_days)
+    kept = fold_identical(sorted(runs, key=lambda r: r['run_time']))
+
+    # Daily rollup: before the cutoff only the last run of each day survives
+    last_of_day = {}
+    for run in kept:
+        if run['run_time'] < cutoff:
+            last_of_day[_date(run['run_time'])] = run['run_id']
+    kept = [r for r in kept if r['run_time'] >= cutoff or last_of_day[_date(r['run_time'])] == r['run_id']]
+    # Dropping runs can leave two identical runs next to each other
+    return fold_identical(kept)
+
+
+def compact(root=snapshot_store.SNAPSHOT_ROOT, now=None, recent_days=RECENT_DAYS, dry_run=False):
+    """Applies plan_retention and rewrites the affected partitions. Returns a stats dict."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    now = now or datetime.now(timezone.utc)
+    runs = {}
+    for run in snapshot_store.read_table('runs', root=root).to_pylist():
+        # A crash between writing a compacted file and removing the per-run ones leaves a run twice
+        if run['run_id'] not in runs or (run['merged_runs'] or 1) > (runs[run['run_id']]['merged_runs'] or 1):
+            runs[run['run_id']] = run
+    runs = list(runs.values())
+    kept = plan_retention(runs, now, recent_days)
+    kept_by_id = {r['run_id']: r for r in kept}
+    kept_ids = set(kept_by_id)
+
+    # Partitions worth rewriting: dropped or updated runs, or old days still split into per-run files
+    dates = set()
+    for run in runs:
+        new = kept_by_id.get(run['run_id'])
+        if new is None or (new['valid_until'], new['merged_runs']) != (run.get('valid_until'), run.get('merged_runs')):
+            dates.add(_date(run['run_time']))
+    cutoff_date = _date(now - timedelta(days=recent_days))
+    for table in snapshot_store.TABLES:
+        table_dir = os.path.join(root, table)
+        if not os.path.isdir(table_dir):
+            continue
+        for part in os.listdir(table_dir):
+            date = part.split('=', 1)[-1]
+            files = [f for f in os.listdir(os.path.join(table_dir, part)) if f.endswith('.parquet')]
+            if len(files) > 1 and date < cutoff_date:
+                dates.add(date)
+
+    stats = {'runs': len(runs), 'kept': len(kept), 'partitions': len(dates), 'files_before': 0, 'files_after': 0}
+    if dry_run:
+        print(f"Would keep {len(kept)} of {len(runs)} runs and rewrite {len(dates)} date partitions.")
+        return stats
+
+    for date in sorted(dates):
+        for table in snapshot_store.TABLES:
+            part_dir = os.path.join(root, table, f"date={date}")
+            if not os.path.isdir(part_dir):
+                continue
+            files = sorted(f for f in os.listdir(part_dir) if f.endswith('.parquet'))
+            stats['files_before'] += len(files)
+            # The compacted file first: after a crash mid-compaction its rows win
+            files.sort(key=lambda f: f != f"{COMPACTED_NAME}.parquet")
+            pieces, seen = [], set()
+            for name in files:
+                data = snapshot_store.read_file(table, os.path.join(part_dir, name))
+                ids = set(data.column('run_id').to_pylist())
+                keep = (ids & kept_ids) - seen
+                seen |= ids
+                if keep:
+                    pieces.append(data.filter(pc.is_in(data.column('run_id').cast(pa.string()),
+                                                       value_set=pa.array(sorted(keep)))))
+            if table == 'runs' and pieces:
+                rows = [dict(r, valid_until=kept_by_id[r['run_id']]['valid_until'],
+                             merged_runs=kept_by_id[r['run_id']]['merged_runs'])
+                        for r in pa.concat_tables(pieces).to_pylist()]
+                pieces = [pa.Table.from_pylist(rows, schema=pieces[0].schema)]
+
+            target = os.path.join(part_dir, f"{COMPACTED_NAME}.parquet")
+            if pieces:
+                merged = pa.concat_tables(pieces).sort_by([('run_time', 'ascending')])
+                snapshot_store.write_arrow(target, merged.unify_dictionaries().combine_chunks())
+                stats['files_after'] += 1
+            for name in files:
+                path = os.path.join(part_dir, name)
+                if path != target or not pieces:
+                    os.remove(path)
+            if not os.listdir(part_dir):
+                os.rmdir(part_dir)
+
+    print(f"Compacted snapshots: kept {len(kept)} of {len(runs)} runs, "
+          f"{stats['files_before']} files -> {stats['files_after']} in {len(dates)} date partitions.")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fold identical runs and roll up old snapshots into daily files.")
+    parser.add_argument('--root', default=snapshot_store.SNAPSHOT_ROOT)
+    parser.add_argument('--recent-days', type=int, default=RECENT_DAYS,
+                        help="Keep every run from this many recent days (default: %(default)s)")
+    parser.add_argument('--dry-run', action='store_true', help="Only print what would change")
+    args = parser.parse_args(argv)
+    compact(args.root, recent_days=args.recent_days, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Country registry and scoring core shared by every Games (see games.py).
+
+Both pipelines normalize country names the same way (lowercase, drop
+"the " / "republic of " / "people's republic of "); the Paralympics also
+folds aliases into one canonical name. A CountryRegistry does both, with the
+alias map as its only per-Games part, and memoizes the result: the same few
+hundred names are normalized tens of thousands of times per run.
+"""
+
+PREFIXES = ("the ", "republic of ", "people's republic of ")
+MEDAL_WEIGHTS = {'Gold': 3, 'Silver': 2, 'Bronze': 1}
+
+
+def strip_name(name):
+    """Lowercase and drop the leading article / 'republic of' prefixes."""
+    if not name:
+        return ""
+    name = name.lower().strip()
+    for prefix in PREFIXES:
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+    return name.strip()
+
+
+class CountryRegistry:
+    """Normalized names for one Games. aliases: {name: canonical name}, applied after stripping."""
+
+    def __init__(self, aliases=None):
+        self.aliases = {raw.lower().strip(): canonical.lower().strip() for raw, canonical in (aliases or {}).items()}
+        self._cache = {}
+
+    def normalize(self, name):
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        norm = strip_name(name)
+        norm = self.aliases.get(norm, norm)
+        self._cache[name] = norm
+        return norm
+
+
+def weighted_medals(gold, silver, bronze):
+    """Gold x3 + Silver x2 + Bronze x1."""
+    return gold * MEDAL_WEIGHTS['Gold'] + silver * MEDAL_WEIGHTS['Silver'] + bronze * MEDAL_WEIGHTS['Bronze']
@@ -1,25 +1,13 @@
 import os
-import json
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from main import normalize_country_name, COUNTRY_NAME_MAP
+from sheets_client import get_google_sheet_client
+from totals_history import TOTALS_HISTORY_TAB_NAME, history_snapshots
 
 # --- Configuration ---
 SHEET_KEY = '18gTKqgWBv4KuAqCKppB9IZxZja-yhJzufj6oqrg7JXw'
-DRAFT_TAB_NAME = 'Draft'
 WEIGHTED_TAB_NAME = 'Weighted Totals Graph'
 MULTIPLIED_TAB_NAME = 'Multiplied Totals Graph'
 
-def get_google_sheet_client():
-    creds_json = os.environ.get('GOOGLE_CREDENTIALS')
-    if not creds_json:
-        raise ValueError("GOOGLE_CREDENTIALS environment variable not found.")
-    creds_dict = json.loads(creds_json)
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    client = gspread.authorize(creds)
-    return client
-
 def create_or_clear_tab(sheet, tab_name):
     try:
         ws = sheet.worksheet(tab_name)
@@ -30,87 +18,86 @@ def create_or_clear_tab(sheet, tab_name):
         print(f"Creating new tab: {tab_name}...")
         return sheet.add_worksheet(title=tab_name, rows="100", cols="10")
 
-def run_consolidation():
-    print("Connecting to Google Sheets...")
-    client = get_google_sheet_client()
-    sheet = client.open_by_key(SHEET_KEY)
-    draft_ws = sheet.worksheet(DRAFT_TAB_NAME)
-    
-    w_ws = create_or_clear_tab(sheet, WEIGHTED_TAB_NAME)
-    m_ws = create_or_clear_tab(sheet, MULTIPLIED_TAB_NAME)
-        
-    print("Fetching data from Draft tab...")
-    draft_data = draft_ws.get_all_values()
-    
-    # Identify player headers (typically row 1, cols A-D)
-    players = []
-    if len(draft_data) > 0:
-        header = draft_data[0]
-        for idx in range(4): # Cols A-D
-            if idx < len(header) and header[idx].strip():
-                players.append(header[idx].strip())
-            else:
-                players.append(f"Player {idx+1}")
-                
-    weighted_history = []
-    multiplied_history = []
-    
-    # Iterate through Draft data to find historical "Total" rows
-    # The structure looks like this over time (accumulating downward):
-    # 57    56    42    7    Weighted Total (3/2/1)
-    # 85.1  138.0 45.6  55.5 Multiplied Total
-    
-    print("Parsing historical Totals data...")
-    for row in draft_data:
-        # Avoid empty rows
-        if not any(row): continue
-        
-        # We identify a "Totals" block by looking at Column E (index 4)
-        if len(row) > 4:
-            context = row[4].strip()
-            
-            # Weighted Row
-            if "Weighted" in context or "Total Medals" in context:
-                scores = []
-                for i in range(len(players)):
-                    val = row[i].strip() if i < len(row) else "0"
-                    scores.append(val)
-                weighted_history.append(scores)
-                
-            # Multiplied Row
-            elif "Multiplied Total" in context:
-                scores = []
-                for i in range(len(players)):
-                    val = row[i].strip() if i < len(row) else "0"
-                    scores.append(val)
-                multiplied_history.append(scores)
-                    
-    print(f"Found {len(weighted_history)} Weighted Total snapshots.")
-    print(f"Found {len(multiplied_history)} Multiplied Total snapshots.")
-    
+def load_history(source, sheet=None):
+    """
+    Totals per run as (players, [(timestamp, {player: (weighted, multiplied)})]).
+    source 'sheet' reads the Totals History tab; 'snapshots' reads the local
+    snapshot store (no Google access needed).
+    """
+    if source == 'snapshots':
+        from time_travel import SnapshotIndex
+        players, runs = SnapshotIndex().score_history()
+        return players, [(run_time.isoformat(), {p: (s['medals'], s['multiplied_medals']) for p, s in scores.items()})
+                         for run_time, scores in runs]
+
+    history_ws = sheet.worksheet(TOTALS_HISTORY_TAB_NAME)
+    print(f"Fetching data from {TOTALS_HISTORY_TAB_NAME} tab...")
+    # One row per player per run: Timestamp | Player | Weighted Total | Multiplied Total
+    return history_snapshots(history_ws.get_all_values())
+
+def chart_tables(players, snapshots):
     # Prepend an 'Update #' column for the X-Axis in charts
     chart_headers = ["Update #"] + players
     
     # Add index to each history row
     w_updates = [chart_headers]
-    for idx, row in enumerate(weighted_history):
-        w_updates.append([idx + 1] + row)
-        
     m_updates = [chart_headers]
-    for idx, row in enumerate(multiplied_history):
-        m_updates.append([idx + 1] + row)
-    
+    for idx, (_, totals) in enumerate(snapshots):
+        w_updates.append([idx + 1] + [totals[p][0] if p in totals else "" for p in players])
+        m_updates.append([idx + 1] + [totals[p][1] if p in totals else "" for p in players])
+    return w_updates, m_updates
+
+def write_csv(path, rows):
+    import csv
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+    print(f"Wrote {path}")
+
+def run_consolidation(source='sheet', csv_dir=None):
+    """
+    Rebuilds the Weighted / Multiplied chart tabs from the totals history.
+    With csv_dir the tables are written there instead of to Google Sheets.
+    """
+    sheet = None
+    if source == 'sheet' or not csv_dir:
+        print("Connecting to Google Sheets...")
+        client = get_google_sheet_client()
+        sheet = client.open_by_key(SHEET_KEY)
+
+    players, snapshots = load_history(source, sheet)
+    print(f"Found {len(snapshots)} Totals snapshots for {len(players)} players.")
+    w_updates, m_updates = chart_tables(players, snapshots)
+
+    if csv_dir:
+        os.makedirs(csv_dir, exist_ok=True)
+        write_csv(os.path.join(csv_dir, 'weighted_totals.csv'), w_updates)
+        write_csv(os.path.join(csv_dir, 'multiplied_totals.csv'), m_updates)
+        return
+
+    w_ws = create_or_clear_tab(sheet, WEIGHTED_TAB_NAME)
+    m_ws = create_or_clear_tab(sheet, MULTIPLIED_TAB_NAME)
+    header_range = f"A1:{gspread.utils.rowcol_to_a1(1, len(w_updates[0]))}"
+
     # Write to Weighted Totals map
     print(f"Pushing updates to {WEIGHTED_TAB_NAME} tab...")
     w_ws.update('A1', w_updates)
-    w_ws.format('A1:E1', {'textFormat': {'bold': True}})
+    w_ws.format(header_range, {'textFormat': {'bold': True}})
     
     # Write to Multiplied Totals map
     print(f"Pushing updates to {MULTIPLIED_TAB_NAME} tab...")
     m_ws.update('A1', m_updates)
-    m_ws.format('A1:E1', {'textFormat': {'bold': True}})
+    m_ws.format(header_range, {'textFormat': {'bold': True}})
     
     print("Done! View the new tabs on Google Sheets to build your Google Charts!")
 
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the totals chart tabs from the totals history.")
+    parser.add_argument('--from-snapshots', action='store_true',
+                        help="Read history from the local snapshot store instead of the Totals History tab")
+    parser.add_argument('--csv', metavar='DIR', help="Write the chart tables to CSV files in DIR instead of Sheets")
+    args = parser.parse_args(argv)
+    run_consolidation('snapshots' if args.from_snapshots else 'sheet', csv_dir=args.csv)
+
 if __name__ == "__main__":
-    run_consolidation()
+    main()
@@ -0,0 +1,436 @@
+"""
+In-process stand-in for the slice of gspread the tracker uses.
+
+Lets main(), create_final_standings.py and the reproduce_* scripts run without
+GOOGLE_CREDENTIALS or a network. Every call that would be an HTTP request to
+the Sheets API is counted (calls, cells read/written), can be delayed by a
+simulated latency and is checked against a per-minute quota, so a full run can
+be benchmarked for API usage and wall time (see bench_sheets.py).
+
+Usage:
+    client = FakeClient({SHEET_KEY: {'Results': [['Country', 'Gold', ...], ...]}})
+    main(client=client, offline=True)
+    client.stats.report()
+"""
+import json
+import time
+from collections import Counter, deque
+from datetime import date, timedelta
+
+import requests
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range
+
+# Sheets API default per-user limits (read and write are metered separately)
+DEFAULT_QUOTA_PER_MINUTE = 60
+
+
+def _cell_str(value):
+    """Mimics how Sheets hands a written value back from get_all_values()."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return "%.10g" % value
+    return str(value)
+
+
+def _count_cells(values):
+    return sum(len(row) for row in values)
+
+
+def _rate_limit_error(kind, limit):
+    """Builds the same APIError gspread raises on an HTTP 429."""
+    response = requests.Response()
+    response.status_code = 429
+    response._content = json.dumps({
+        "error": {
+            "code": 429,
+            "message": f"Quota exceeded for quota metric '{kind.title()} requests' "
+                       f"(limit {limit} per minute per user).",
+            "status": "RESOURCE_EXHAUSTED",
+        }
+    }).encode("utf-8")
+    return APIError(response)
+
+
+class FakeStats:
+    """Tally of simulated Sheets API traffic."""
+
+    def __init__(self):
+        self.calls = Counter()  # method name -> number of HTTP requests
+        self.reads = 0
+        self.writes = 0
+        self.cells_read = 0
+        self.cells_written = 0
+        self.throttled = 0
+        self.simulated_latency = 0.0
+
+    @property
+    def requests(self):
+        return self.reads + self.writes
+
+    def summary(self):
+        return {
+            "requests": self.requests,
+            "reads": self.reads,
+            "writes": self.writes,
+            "cells_read": self.cells_read,
+            "cells_written": self.cells_written,
+            "throttled": self.throttled,
+            "simulated_latency": round(self.simulated_latency, 3),
+            "calls": dict(self.calls),
+        }
+
+    def report(self):
+        print(f"Sheets API requests: {self.requests} ({self.reads} reads, {self.writes} writes)")
+        print(f"Cells read: {self.cells_read}, cells written: {self.cells_written}")
+        if self.throttled:
+            print(f"Throttled (429) requests: {self.throttled}")
+        for name, count in sorted(self.calls.items()):
+            print(f"  {name}: {count}")
+
+
+class FakeClient:
+    """
+    Drop-in for gspread.Client.
+
+    sheets: {spreadsheet_key: {tab_title: [[row values], ...]}}
+    latency: seconds added to every request (slept for real, so wall time is honest)
+    quota_per_minute: read and write request budgets; None disables the check
+    """
+
+    def __init__(self, sheets=None, latency=0.0, quota_per_minute=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.latency = latency
+        self.quota_per_minute = quota_per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = FakeStats()
+        self._windows = {"read": deque(), "write": deque()}
+        self.spreadsheets = {}
+        for key, tabs in (sheets or {}).items():
+            self.add_spreadsheet(key, tabs)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Builds a client from a JSON dump written by dump()."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    def dump(self, path):
+        """Saves every spreadsheet's grid so an offline run can be resumed later."""
+        data = {key: {ws.title: ws.grid_values() for ws in sh._worksheets}
+                for key, sh in self.spreadsheets.items()}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    def add_spreadsheet(self, key, tabs=None):
+        """Seeds a spreadsheet without counting it as API traffic."""
+        sh = FakeSpreadsheet(self, key)
+        for title, rows in (tabs or {}).items():
+            sh._new_worksheet(title, rows)
+        self.spreadsheets[key] = sh
+        return sh
+
+    def _call(self, kind, name, cells=0):
+        """Accounts for one HTTP request to the Sheets API."""
+        now = self.clock()
+        if self.quota_per_minute is not None:
+            window = self._windows[kind]
+            while window and now - window[0] >= 60:
+                window.popleft()
+            if len(window) >= self.quota_per_minute:
+                self.stats.throttled += 1
+                raise _rate_limit_error(kind, self.quota_per_minute)
+            window.append(now)
+
+        if self.latency:
+            self.sleep(self.latency)
+            self.stats.simulated_latency += self.latency
+
+        self.stats.calls[name] += 1
+        if kind == "read":
+            self.stats.reads += 1
+            self.stats.cells_read += cells
+        else:
+            self.stats.writes += 1
+            self.stats.cells_written += cells
+
+    # --- gspread.Client API ---
+
+    def open_by_key(self, key):
+        self._call("read", "open_by_key")
+        if key not in self.spreadsheets:
+            # Behaves like a freshly shared, empty spreadsheet
+            self.add_spreadsheet(key)
+        return self.spreadsheets[key]
+
+
+class FakeSpreadsheet:
+    """Drop-in for gspread.Spreadsheet."""
+
+    def __init__(self, client, key):
+        self.client = client
+        self.id = key
+        self.title = key
+        self._worksheets = []
+        self._next_sheet_id = 0
+
+    def _new_worksheet(self, title, rows=None, row_count=1000, col_count=26):
+        ws = FakeWorksheet(self, title, self._next_sheet_id, rows, row_count, col_count)
+        self._next_sheet_id += 1
+        self._worksheets.append(ws)
+        return ws
+
+    def _by_id(self, sheet_id):
+        for ws in self._worksheets:
+            if ws.id == sheet_id:
+                return ws
+        raise ValueError(f"Unknown sheetId {sheet_id}")
+
+    def _by_title(self, title):
+        for ws in self._worksheets:
+            if ws.title == title:
+                return ws
+        raise WorksheetNotFound(title)
+
+    # --- gspread.Spreadsheet API ---
+
+    def worksheet(self, title):
+        self.client._call("read", "worksheet")
+        return self._by_title(title)
+
+    def worksheets(self):
+        self.client._call("read", "worksheets")
+        return list(self._worksheets)
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        self.client._call("write", "add_worksheet")
+        return self._new_worksheet(title, None, int(rows), int(cols))
+
+    def batch_update(self, body):
+        """spreadsheets.batchUpdate: every request applied in order, one HTTP call."""
+        requests_list = body.get("requests", [])
+        cells = sum(len(r.get("values", []))
+                    for req in requests_list for params in req.values()
+                    for r in params.get("rows", []))
+        self.client._call("write", "spreadsheet.batch_update", cells)
+        for req in requests_list:
+            (kind, params), = req.items()
+            if kind == "updateCells":
+                self._apply_update_cells(params)
+            elif kind == "appendCells":
+                ws = self._by_id(params["sheetId"])
+                ws._append([[_extended_to_str(v) for v in r.get("values", [])] for r in params.get("rows", [])])
+            elif kind == "deleteDimension":
+                rng = params["range"]
+                ws = self._by_id(rng["sheetId"])
+                if rng.get("dimension", "ROWS") != "ROWS":
+                    raise NotImplementedError("FakeSpreadsheet only deletes ROWS")
+                ws._delete_rows(rng["startIndex"], rng["endIndex"])
+            elif kind == "updateSheetProperties":
+                ws = self._by_id(params["properties"]["sheetId"])
+                grid = params["properties"].get("gridProperties", {})
+                ws.row_count = grid.get("rowCount", ws.row_count)
+                ws.col_count = grid.get("columnCount", ws.col_count)
+            elif kind == "repeatCell":
+                pass  # Formatting only
+            else:
+                raise NotImplementedError(f"FakeSpreadsheet does not support '{kind}' requests")
+        return {"spreadsheetId": self.id, "replies": [{} for _ in requests_list]}
+
+    def values_batch_update(self, body=None):
+        """spreadsheets.values.batchUpdate: many ranges across tabs in one HTTP call."""
+        data = (body or {}).get("data", [])
+        self.client._call("write", "values_batch_update", sum(_count_cells(item["values"]) for item in data))
+        for item in data:
+            title, _, a1 = item["range"].rpartition("!")
+            self._by_title(title.strip("'"))._write(a1, item["values"])
+        return {"spreadsheetId": self.id}
+
+    def _apply_update_cells(self, params):
+        rows = [[_extended_to_str(v) for v in r.get("values", [])] for r in params.get("rows", [])]
+        if "start" in params:
+            start = params["start"]
+            ws = self._by_id(start["sheetId"])
+            ws._write_at(start.get("rowIndex", 0), start.get("columnIndex", 0), rows)
+            return
+        rng = params["range"]
+        ws = self._by_id(rng["sheetId"])
+        if not rows and "userEnteredValue" in params.get("fields", ""):
+            ws._clear_range(rng)
+            return
+        ws._write_at(rng.get("startRowIndex", 0), rng.get("startColumnIndex", 0), rows)
+
+
+def _extended_to_str(cell):
+    """Reads a CellData {'userEnteredValue': {...}} back into a display string."""
+    value = cell.get("userEnteredValue", {})
+    if not value:
+        return ""
+    (_, v), = value.items()
+    # Date cells display in their number format (the tracker only writes yyyy-mm-dd)
+    if cell.get("userEnteredFormat", {}).get("numberFormat", {}).get("type") == "DATE":
+        return (date(1899, 12, 30) + timedelta(days=int(v))).isoformat()
+    return _cell_str(v)
+
+
+class FakeWorksheet:
+    """Drop-in for gspread.Worksheet backed by a list-of-lists grid."""
+
+    def __init__(self, spreadsheet, title, sheet_id, rows=None, row_count=1000, col_count=26):
+        self.spreadsheet = spreadsheet
+        self.client = spreadsheet.client
+        self.title = title
+        self.id = sheet_id
+        self._rows = [[_cell_str(v) for v in row] for row in (rows or [])]
+        self.row_count = max(row_count, len(self._rows))
+        self.col_count = max([col_count] + [len(r) for r in self._rows])
+        self.formats = {}
+
+    def __repr__(self):
+        return f"<FakeWorksheet '{self.title}' id:{self.id}>"
+
+    # --- grid helpers (not API calls) ---
+
+    def grid_values(self):
+        """The trimmed, rectangular grid exactly as get_all_values() would return it."""
+        last_row = 0
+        width = 0
+        for i, row in enumerate(self._rows):
+            used = len(row)
+            while used and row[used - 1] == "":
+                used -= 1
+            if used:
+                last_row = i + 1
+                width = max(width, used)
+        return [(row[:width] + [""] * (width - len(row)))[:width] for row in self._rows[:last_row]]
+
+    def _ensure(self, n_rows, n_cols):
+        while len(self._rows) < n_rows:
+            self._rows.append([])
+        self.row_count = max(self.row_count, n_rows)
+        self.col_count = max(self.col_count, n_cols)
+
+    def _write_at(self, row_idx, col_idx, values):
+        """Writes values with the top-left cell at 0-based (row_idx, col_idx)."""
+        for r, row_vals in enumerate(values):
+            self._ensure(row_idx + r + 1, col_idx + len(row_vals))
+            row = self._rows[row_idx + r]
+            if len(row) < col_idx + len(row_vals):
+                row.extend([""] * (col_idx + len(row_vals) - len(row)))
+            for c, v in enumerate(row_vals):
+                row[col_idx + c] = _cell_str(v)
+
+    def _write(self, a1, values):
+        grid = a1_range_to_grid_range(a1)
+        self._write_at(grid.get("startRowIndex", 0), grid.get("startColumnIndex", 0), values)
+
+    def _append(self, rows):
+        # Sheets appends after the last row of the detected table
+        self._write_at(len(self.grid_values()), 0, rows)
+
+    def _delete_rows(self, start_idx, end_idx):
+        del self._rows[start_idx:end_idx]
+        self.row_count = max(1, self.row_count - (end_idx - start_idx))
+
+    def _clear_range(self, rng):
+        r0 = rng.get("startRowIndex", 0)
+        r1 = rng.get("endRowIndex", len(self._rows))
+        c0 = rng.get("startColumnIndex", 0)
+        for row in self._rows[r0:r1]:
+            c1 = rng.get("endColumnIndex", len(row))
+            for c in range(c0, min(c1, len(row))):
+                row[c] = ""
+
+    def _range_values(self, a1):
+        """Values in an A1 range, trimmed the way the values API returns them."""
+        grid = a1_range_to_grid_range(a1)
+        r0 = grid.get("startRowIndex", 0)
+        r1 = grid.get("endRowIndex", len(self._rows))
+        c0 = grid.get("startColumnIndex", 0)
+        out = []
+        for row in self._rows[r0:r1]:
+            cells = row[c0:grid.get("endColumnIndex", len(row))]
+            while cells and cells[-1] == "":
+                cells = cells[:-1]
+            out.append(list(cells))
+        while out and not out[-1]:
+            out.pop()
+        return out
+
+    # --- gspread.Worksheet API ---
+
+    def get(self, range_name=None, **kwargs):
+        values = self._range_values(range_name or "A1:ZZZ")
+        self.client._call("read", "get", _count_cells(values))
+        return values
+
+    def batch_get(self, ranges, **kwargs):
+        """One values:batchGet request for several ranges of this tab."""
+        results = [self._range_values(rng) for rng in ranges]
+        self.client._call("read", "batch_get", sum(_count_cells(v) for v in results))
+        return results
+
+    def get_all_values(self, **kwargs):
+        values = self.grid_values()
+        self.client._call("read", "get_all_values", _count_cells(values))
+        return values
+
+    def batch_update(self, data, **kwargs):
+        self.client._call("write", "batch_update", sum(_count_cells(item["values"]) for item in data))
+        for item in data:
+            self._write(item["range"], item["values"])
+        return {"spreadsheetId": self.spreadsheet.id}
+
+    def update(self, range_name=None, values=None, **kwargs):
+        # gspread 6 takes (values, range_name) but still accepts the legacy
+        # (range_name, values) order the scripts in this repo use.
+        if isinstance(range_name, list):
+            range_name, values = values, range_name
+        self.client._call("write", "update", _count_cells(values))
+        self._write(range_name or "A1", values)
+        return {"spreadsheetId": self.spreadsheet.id}
+
+    def append_rows(self, values, value_input_option="RAW", **kwargs):
+        self.client._call("write", "append_rows", _count_cells(values))
+        self._append(values)
+        return {"spreadsheetId": self.spreadsheet.id}
+
+    def append_row(self, values, value_input_option="RAW", **kwargs):
+        return self.append_rows([values], value_input_option=value_input_option, **kwargs)
+
+    def clear(self):
+        self.client._call("write", "clear")
+        self._rows = []
+        return {"spreadsheetId": self.spreadsheet.id}
+
+    def format(self, ranges, format, **kwargs):
+        self.client._call("write", "format")
+        if isinstance(ranges, str):
+            ranges = [ranges]
+        for rng in ranges:
+            self.formats[rng] = format
+        return {"spreadsheetId": self.spreadsheet.id}
+
+
+def tracker_tabs(medal_counts, multipliers, drafted_teams):
+    """
+    Builds Results / Draft / Flavor tabs shaped like the live league sheet,
+    seeded from local data (scraped_medals.json, multipliers.json, DRAFTED_TEAMS).
+    """
+    results = [['Country', 'Gold', 'Silver', 'Bronze', 'Multiplier']]
+    for country in sorted(set(medal_counts) | set(multipliers)):
+        results.append([country, '0', '0', '0', _cell_str(multipliers.get(country, 1))])
+
+    players = list(drafted_teams)
+    draft = [players]
+    for i in range(max(len(c) for c in drafted_teams.values())):
+        draft.append([drafted_teams[p][i] if i < len(drafted_teams[p]) else '' for p in players])
+
+    flavor = [['Date', 'Country', 'Medal', 'Event', 'Athlete', 'Team']]
+    return {'Results': results, 'Draft': draft, 'Flavor': flavor}
@@ -0,0 +1,52 @@
+"""
+In-process stand-in for a Wikipedia page's revision history.
+
+Serves canned revisions to revision_backfill (same revisions() / html()
+interface as WikipediaRevisions) and counts page fetches, so tests and
+experiments run offline.
+
+    source = FakeRevisionSource([(1001, timestamp, html), ...])
+    source = FakeRevisionSource.from_details([(timestamp, details), ...])
+"""
+from html import escape
+
+
+def medal_winners_html(details):
+    """Minimal medal winners page for a details list, in the live page's shape."""
+    sports = {}
+    for d in details:
+        sports.setdefault(d.get('Sport') or 'Other', {}).setdefault(d['Event'], {})[d['Medal']] = d
+    parts = ['<html><body>']
+    for sport, events in sports.items():
+        parts.append(f'<h2>{escape(sport)}</h2><table class="wikitable">'
+                     '<tr><th>Event</th><th>Gold</th><th>Silver</th><th>Bronze</th></tr>')
+        for event, medals in events.items():
+            cells = []
+            for medal in ('Gold', 'Silver', 'Bronze'):
+                d = medals.get(medal)
+                cells.append(f'<td>{escape(d["Athlete"])} ({escape(d["Country"])})</td>' if d else '<td></td>')
+            parts.append(f'<tr><td>{escape(event)}</td>{"".join(cells)}</tr>')
+        parts.append('</table>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+class FakeRevisionSource:
+    def __init__(self, revisions):
+        """revisions: [(revid, timestamp, html)] in any order."""
+        self._revisions = sorted(revisions, key=lambda r: r[1])
+        self._html = {revid: html for revid, _, html in revisions}
+        self.fetches = 0
+
+    @classmethod
+    def from_details(cls, snapshots, first_revid=1000):
+        """snapshots: [(timestamp, details list)] -> one revision each."""
+        return cls([(first_revid + i, ts, medal_winners_html(details)) for i, (ts, details) in enumerate(snapshots)])
+
+    def revisions(self, since=None, until=None):
+        return [(revid, ts) for revid, ts, _ in self._revisions
+                if (since is None or ts >= since) and (until is None or ts <= until)]
+
+    def html(self, revid):
+        self.fetches += 1
+        return self._html[revid]
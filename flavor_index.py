@@ -0,0 +1,166 @@
+"""
+Local mirror of the Flavor tab used to dedupe new medal rows without
+downloading the whole tab every run.
+
+The tab only ever grows, so we keep its rows in state/flavor_index.json along
+with a watermark: the last used sheet row and a checksum of the last few rows.
+Each run reads just the header and that tail (plus one row past it) in a
+single request. If they still match, the mirror is trusted and only the new
+signatures are computed; if anything diverged (rows added or removed by hand,
+a failed run, a different sheet) we fall back to one full get_all_values()
+and rebuild the mirror from it.
+
+The index also remembers how far repair_flavor_teams has got: rows already
+examined under a given team-map fingerprint are never looked at again. Large
+appends are sent in chunks with the index saved after each one (see
+update_flavor_tab), and the chunk size that worked is kept here too.
+"""
+import hashlib
+import json
+import os
+
+FLAVOR_HEADERS = ['Date', 'Country', 'Medal', 'Event', 'Athlete', 'Team']
+FLAVOR_INDEX_PATH = os.path.join('state', 'flavor_index.json')
+TAIL_ROWS = 5  # Rows covered by the tail checksum
+DEFAULT_CHUNK_ROWS = 100  # First append chunk size; adapted to observed latency
+
+
+def medal_signature(event, medal, athlete):
+    """Uniqueness key for a Flavor row: Event_Medal_Athlete."""
+    return f"{event}_{medal}_{athlete}"
+
+
+def row_signature(row):
+    """Signature of a Flavor tab row [Date, Country, Medal, Event, Athlete, Team]."""
+    if len(row) < 5:
+        return None
+    return medal_signature(row[3], row[2], row[4])
+
+
+def _padded(row):
+    row = list(row[:len(FLAVOR_HEADERS)])
+    return row + [''] * (len(FLAVOR_HEADERS) - len(row))
+
+
+def tail_checksum(rows):
+    """Checksum of the last TAIL_ROWS rows, insensitive to trailing blank cells."""
+    tail = [_padded(r) for r in rows[-TAIL_ROWS:]]
+    return hashlib.sha256(json.dumps(tail).encode('utf-8')).hexdigest()
+
+
+class FlavorIndex:
+    """Mirror of the Flavor tab rows plus the watermark that proves it is current."""
+
+    def __init__(self, sheet_key, path=FLAVOR_INDEX_PATH):
+        self.sheet_key = sheet_key
+        self.path = path
+        self.header = []
+        self.rows = []
+        self.signatures = set()
+        self.synced = False
+        # Repair watermark: rows[:repaired_rows] were checked against repair_fingerprint
+        self.repair_fingerprint = None
+        self.repaired_rows = 0
+        # Rows per Flavor append chunk, learned from previous runs
+        self.chunk_rows = DEFAULT_CHUNK_ROWS
+
+    @classmethod
+    def load(cls, sheet_key, path=FLAVOR_INDEX_PATH):
+        index = cls(sheet_key, path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return index
+        except Exception as e:
+            print(f"Warning: Could not read {path} ({e}). Will resync from the sheet.")
+            return index
+
+        if saved.get('sheet_key') != sheet_key:
+            return index
+        index._set(saved.get('header', []), saved.get('rows', []))
+        # A hand-edited or truncated file must not be trusted
+        if saved.get('watermark') != index.watermark():
+            print(f"Warning: {path} does not match its own watermark. Will resync from the sheet.")
+            return cls(sheet_key, path)
+        repair = saved.get('repair', {})
+        index.repair_fingerprint = repair.get('fingerprint')
+        index.repaired_rows = min(repair.get('rows', 0), len(index.rows))
+        index.chunk_rows = saved.get('chunk_rows', DEFAULT_CHUNK_ROWS)
+        return index
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'sheet_key': self.sheet_key,
+                'watermark': self.watermark(),
+                'repair': {'fingerprint': self.repair_fingerprint, 'rows': self.repaired_rows},
+                'chunk_rows': self.chunk_rows,
+                'header': self.header,
+                'rows': self.rows,
+            }, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def _set(self, header, rows):
+        self.header = list(header)
+        self.rows = [list(r) for r in rows]
+        self.signatures = {sig for sig in map(row_signature, self.rows) if sig}
+        self.repaired_rows = min(self.repaired_rows, len(self.rows))
+
+    @property
+    def last_row(self):
+        """1-based number of the last used sheet row (header counts), 0 if empty."""
+        return len(self.rows) + 1 if self.header else 0
+
+    def watermark(self):
+        return {'last_row': self.last_row, 'tail_checksum': tail_checksum(self.rows)}
+
+    def fingerprint(self):
+        """What the pipeline cache hashes: which tab, how far it goes and how far it was repaired."""
+        return {'sheet_key': self.sheet_key, 'watermark': self.watermark(),
+                'repair': [self.repair_fingerprint, self.repaired_rows]}
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.rows.append(list(row))
+            sig = row_signature(row)
+            if sig:
+                self.signatures.add(sig)
+
+    def reset(self, header):
+        """The tab was wiped and restarted with just a header row."""
+        self._set(header, [])
+        self.repaired_rows = 0
+
+    def ensure_synced(self, ws):
+        """sync() once per run, however many stages share this index."""
+        if not self.synced:
+            self.sync(ws)
+
+    def sync(self, ws):
+        """
+        Makes the mirror match the tab. Costs one small read when the watermark
+        still holds, and a full tab read otherwise. Returns True if the
+        watermark held.
+        """
+        last_row = self.last_row
+        if last_row:
+            tail_start = max(2, last_row - TAIL_ROWS + 1)
+            header, tail = ws.batch_get(['A1:F1', f"A{tail_start}:F{last_row + 1}"])
+            # The probe includes one row past the watermark: it must come back empty
+            if (header and _padded(header[0]) == _padded(self.header)
+                    and len(tail) == len(self.rows[-TAIL_ROWS:])
+                    and tail_checksum(tail) == tail_checksum(self.rows)):
+                print(f"Flavor index is current ({len(self.rows)} rows). Skipping full tab read.")
+                self.synced = True
+                return True
+            print("Flavor tab diverged from the local index. Resyncing...")
+
+        data = ws.get_all_values()
+        self._set(data[0] if data else [], data[1:])
+        # Rows may have changed anywhere, so the repair starts over
+        self.repaired_rows = 0
+        self.synced = True
+        return False
@@ -0,0 +1,141 @@
+"""
+One engine for every Games the league drafts.
+
+Each Games is a config entry below: its Wikipedia pages, the event rules
+(which sport pages to read for hardware and their default multipliers), the
+draft, where the score multipliers come from, and the pipeline function that
+updates it. main.py and paralympics/main.py read their URLs and drafts from
+here.
+
+    python games.py                    # every Games, concurrently
+    python games.py paralympics        # just one
+    python games.py --offline          # reuse the last scrape where supported
+    python watch.py                    # one long-running process for the whole Games
+
+Both pipelines run in one process, on their own threads, and share the
+pooled HTTP session (http_client) and the country registry / scoring core
+(countries), so a combined run has one cold start instead of two.
+"""
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# The same four drafters and picks for both Games
+LEAGUE_DRAFT = {
+    "Maya": ["Germany", "Austria", "France", "Switzerland", "Great Britain", "Estonia", "Greece", "Ukraine"],
+    "Ross": ["Norway", "Sweden", "Japan", "China", "South Korea", "Czech Republic", "Spain", "Brazil"],
+    "Mom": ["Canada", "USA", "Italy", "Australia", "Finland", "AIN", "Denmark", "Kazakhstan"],
+    "Drew": ["Netherlands", "Poland", "New Zealand", "Slovenia", "Belgium", "Croatia", "Slovakia", "Latvia"]
+}
+
+_SPORT_PAGE = 'https://en.wikipedia.org/wiki/{}_at_the_2026_Winter_Paralympics'
+
+GAMES = {
+    'olympics': {
+        'title': '2026 Winter Olympics',
+        'dates': ('2026-02-06', '2026-02-22'), # Opening and closing ceremonies (local, see watch.py)
+        'pipeline': ('main.py', 'main'),
+        'offline': True, # main(offline=True) reuses scraped_*.json
+        'urls': {
+            'games': 'https://en.wikipedia.org/wiki/2026_Winter_Olympics',
+            'counts': 'https://en.wikipedia.org/wiki/2026_Winter_Olympics_medal_table',
+            'details': 'https://en.wikipedia.org/wiki/List_of_2026_Winter_Olympics_medal_winners',
+        },
+        # Hardware per event comes from the event name (main.get_hardware_multiplier)
+        'sport_pages': [],
+        'draft': LEAGUE_DRAFT,
+        # Max delegation / delegation size, from the cached delegation sizes (participants.py);
+        # multipliers.json is regenerated from them
+        'multipliers': 'dynamic',
+    },
+    'paralympics': {
+        'title': '2026 Winter Paralympics',
+        'dates': ('2026-03-06', '2026-03-15'),
+        'pipeline': ('paralympics/main.py', 'generate_reports'),
+        'offline': False,
+        'urls': {
+            'games': 'https://en.wikipedia.org/wiki/2026_Winter_Paralympics',
+            'counts': 'https://en.wikipedia.org/wiki/2026_Winter_Paralympics_medal_table',
+        },
+        # (sport page, physical medals per podium place unless the event says otherwise)
+        'sport_pages': [
+            (_SPORT_PAGE.format('Alpine_skiing'), 1),
+            (_SPORT_PAGE.format('Biathlon'), 1),
+            (_SPORT_PAGE.format('Cross-country_skiing'), 1),  # Relays handled specially
+            (_SPORT_PAGE.format('Para_ice_hockey'), 17),
+            (_SPORT_PAGE.format('Para_snowboard'), 1),
+            (_SPORT_PAGE.format('Wheelchair_curling'), 5),  # Team events
+        ],
+        'draft': LEAGUE_DRAFT,
+        # Max delegation size / the country's delegation size (participants.py)
+        'multipliers': 'dynamic',
+    },
+}
+
+
+def load_pipeline(key):
+    """The module that implements a Games' pipeline (imported once)."""
+    path, _ = GAMES[key]['pipeline']
+    if path == 'main.py':
+        # The module everything else imports as `main`
+        return importlib.import_module('main')
+    name = f"{key}_pipeline"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, path))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+def run_one(key, offline=False):
+    config = GAMES[key]
+    module = load_pipeline(key)
+    kwargs = {'offline': offline} if config['offline'] else {}
+    start = time.monotonic()
+    getattr(module, config['pipeline'][1])(**kwargs)
+    return time.monotonic() - start
+
+
+def run_games(keys=None, offline=False):
+    """Runs each Games' pipeline on its own thread. Returns {key: error or None}."""
+    keys = list(keys or GAMES)
+    # Import up front: module imports take the import lock, so don't race them on the threads
+    for key in keys:
+        load_pipeline(key)
+
+    errors = {}
+    with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+        futures = {key: pool.submit(run_one, key, offline) for key in keys}
+        for key, future in futures.items():
+            try:
+                elapsed = future.result()
+                print(f"[{key}] {GAMES[key]['title']} updated in {elapsed:.1f}s.")
+                errors[key] = None
+            except Exception as e:
+                print(f"[{key}] {GAMES[key]['title']} FAILED: {e}")
+                errors[key] = e
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update every Games (or the ones named) in one process.")
+    parser.add_argument('games', nargs='*', help=f"Any of {', '.join(GAMES)} (default: all of them)")
+    parser.add_argument('--offline', action='store_true', help="Reuse the last scrape where the pipeline supports it")
+    args = parser.parse_args(argv)
+    unknown = [key for key in args.games if key not in GAMES]
+    if unknown:
+        parser.error(f"unknown Games: {', '.join(unknown)}")
+    errors = run_games(args.games or None, offline=args.offline)
+    if any(errors.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,32 @@
+"""
+Writes country_summaries.md and one <Player>_summaries.md per drafter from
+country_blog_data.csv and scraped_details.json (and .html / .json versions
+with --format; the sections are report items rendered by reports.py).
+
+Everything a section needs is looked up in indexes built once per run
+(country -> largest medal multiplier and event mix from one pass over the
+details, display names, CSV rows by country), not by rescanning the lists for
+every row. The multiplier picks the hardware sentence; the event mix
+(individual vs team medals) goes into the JSON feed item. Each country section is keyed by a hash of its inputs; rendered
+sections and the section keys of every file are kept in
+state/summary_sections.json, so a section is rendered once and a file is
+only rewritten when one of its sections changed. One new medal touches one
+section, the master file and one player's file.
+"""
+import argparse
 import csv
+import hashlib
+import io
 import json
+import os
+
+import reports
 from main import get_hardware_multiplier, normalize_country_name
 
+SECTIONS_PATH = os.path.join('state', 'summary_sections.json')
+# Bump when the section templates (reports.py) change so every cached section is re-rendered
+SECTION_VERSION = 2
+
 FLAG_MAP = {
     "Norway": "🇳🇴",
     "Netherlands": "🇳🇱",
@@ -42,172 +67,239 @@ FLAG_MAP = {
     "Slovakia": "🇸🇰"
 }
 
-def generate_markdown():
-    csv_file = "country_blog_data.csv"
-    md_file = "country_summaries.md"
-    
+def country_index(details):
+    """
+    One pass over the medal details:
+    {normalized country: {'max_multiplier': n, 'individual': medals, 'team': medals}}.
+    """
+    index = {}
+    normalized = {}
+    for detail in details:
+        country = detail.get('Country', '')
+        if country not in normalized:
+            normalized[country] = normalize_country_name(country)
+        entry = index.setdefault(normalized[country], {'max_multiplier': 1, 'individual': 0, 'team': 0})
+        mult = get_hardware_multiplier(detail.get('Event', ''), detail.get('Medal', ''))
+        if mult > entry['max_multiplier']:
+            entry['max_multiplier'] = mult
+        entry['team' if mult > 1 else 'individual'] += 1
+    return index
+
+
+def display_names(country_name_map):
+    """{normalized official name: display name}, first mapping wins."""
+    names = {}
+    for k, v in country_name_map.items():
+        names.setdefault(normalize_country_name(v), k)
+    return names
+
+
+def display_name_for(country, names):
+    display_name = names.get(normalize_country_name(country), country)
+    # Apply user-requested display overrides
+    if display_name in ["United States", "USA"]:
+        display_name = "United States of America"
+    elif display_name == "AIN":
+        display_name = "Individual Neutral Athletes"
+    return display_name
+
+
+def section_inputs(target, index, names):
+    """Everything a country section depends on. target is a CSV row, or a zero-medal country name."""
+    if isinstance(target, str):
+        display_name = display_name_for(target, names)
+        return {'display_name': display_name, 'flag': FLAG_MAP.get(display_name, FLAG_MAP.get(target, ""))}
+
+    country = target['Country']
+    display_name = display_name_for(country, names)
+    search_name = "AIN" if country == "Individual Neutral Athletes" else country
+    stats = index.get(normalize_country_name(search_name), {'max_multiplier': 1, 'individual': 0, 'team': 0})
+    return {
+        'display_name': display_name,
+        'flag': FLAG_MAP.get(display_name, FLAG_MAP.get(country, "")),
+        'row': dict(target),
+        'max_multiplier': stats['max_multiplier'],
+        'event_mix': {'individual': stats['individual'], 'team': stats['team']},
+    }
+
+
+def section_key(inputs):
+    text = json.dumps([SECTION_VERSION, inputs], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _csv_number(value):
+    """CSV text -> int / float for the JSON feed, unless that would change how it prints."""
+    for kind in (int, float):
+        try:
+            if str(kind(value)) == value:
+                return kind(value)
+        except (TypeError, ValueError):
+            pass
+    return value
+
+
+def section_model(inputs):
+    """The report item for one country section (see reports.py for how it is rendered)."""
+    item = {'display_name': inputs['display_name'], 'flag': inputs['flag']}
+    row = inputs.get('row')
+    if row is None:
+        item['template'] = 'no_medals'
+        return item
+
+    total_m_int = int(row['Total Medals'])
+    if total_m_int >= 20:
+        performance_desc = "delivered a powerhouse performance"
+    elif total_m_int >= 10:
+        performance_desc = "put together a strong campaign"
+    elif total_m_int >= 5:
+        performance_desc = "had a solid showing"
+    else:
+        performance_desc = "made their mark on the games"
+
+    # Which hardware sentence fits: big team events, small teams / relays, or individual events only
+    max_multiplier = inputs['max_multiplier']
+    hardware_difference = int(row['Total Hardware']) - total_m_int
+    if max_multiplier > 6:
+        hardware = 'large_team'
+    elif max_multiplier > 1 or hardware_difference > 0:
+        hardware = 'small_team'
+    else:
+        hardware = 'individual'
+
+    item.update({
+        'template': hardware,
+        'performance': performance_desc,
+        'max_multiplier': max_multiplier,
+        # Medals from individual vs team events (only the JSON feed shows it)
+        'event_mix': inputs['event_mix'],
+        **{key: _csv_number(row[column]) for key, column in (
+            ('participants', 'Participants'), ('gold', 'Gold Medals'), ('silver', 'Silver Medals'),
+            ('bronze', 'Bronze Medals'), ('total_medals', 'Total Medals'), ('weighted_medals', 'Weighted Medals'),
+            ('total_hardware', 'Total Hardware'), ('multiplied_medals', 'Multiplied Medals'),
+            ('multiplied_hardware', 'Multiplied Hardware'))},
+    })
+    return item
+
+
+class SectionCache:
+    """Rendered sections by key, and the title + section keys each file was last written with."""
+
+    def __init__(self, path=SECTIONS_PATH):
+        self.path = path
+        self.sections = {}
+        self.files = {}
+        self.used = set()
+        self.rendered = 0
+        self.written = 0
+
+    @classmethod
+    def load(cls, path=SECTIONS_PATH):
+        cache = cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return cache
+        except Exception as e:
+            print(f"Warning: Could not read {path} ({e}). Rendering every section.")
+            return cache
+        cache.sections = saved.get('sections', {})
+        cache.files = saved.get('files', {})
+        return cache
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # Sections no file uses any more are dropped
+            json.dump({'files': self.files, 'sections': {k: v for k, v in self.sections.items() if k in self.used}},
+                      f, indent=1, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def section(self, fmt, inputs):
+        """Cache key of one country section in one format, rendering it if it is new."""
+        key = f"{fmt}:{section_key(inputs)}"
+        self.used.add(key)
+        if key not in self.sections:
+            out = io.StringIO()
+            reports.render_item(out, 'summaries', fmt, 'countries', section_model(inputs))
+            self.sections[key] = out.getvalue()
+            self.rendered += 1
+        return key
+
+    def write_file(self, path, fmt, title, section_inputs_list):
+        keys = [self.section(fmt, inputs) for inputs in section_inputs_list]
+        manifest = {'title': title, 'sections': keys}
+        if self.files.get(path) == manifest and os.path.exists(path):
+            return False
+        reports.write_report(path, 'summaries', fmt, {'title': title}, [('countries', keys)],
+                             rendered={'countries': [self.sections[k] for k in keys]})
+        self.files[path] = manifest
+        self.written += 1
+        print(f"Generated summaries successfully into {path}.")
+        return True
+
+
+def player_targets(drafted_countries, rows, country_name_map):
+    """A player's countries in draft order: their CSV row, or the name itself for zero-medal countries."""
+    by_country = {}
+    for row in rows:
+        csv_c = row['Country']
+        by_country.setdefault(normalize_country_name(csv_c), row)
+        by_country.setdefault(normalize_country_name(country_name_map.get(csv_c, csv_c)), row)
+    return [by_country.get(normalize_country_name(c), c) for c in drafted_countries]
+
+
+def generate_markdown(csv_file="country_blog_data.csv", details_file='scraped_details.json', cache_path=SECTIONS_PATH,
+                      formats=('md',)):
+    """
+    Regenerates the summary files whose sections changed, in each of formats
+    (md, html, json). Returns the SectionCache.
+    """
     with open(csv_file, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         rows = list(reader)
-        
+
     try:
-        with open('scraped_details.json', 'r', encoding='utf-8') as f:
+        with open(details_file, 'r', encoding='utf-8') as f:
             details = json.load(f)
     except Exception:
         details = []
-        
+
     from main import DRAFTED_TEAMS, COUNTRY_NAME_MAP
-    
-    def write_markdown_file(md_file, title, target_rows, details, is_master=False):
-        if not target_rows:
-            return
-            
-        markdown_content = f"# {title}\n\n"
-        
-        for row in target_rows:
-            # When writing the master file, we are handed the raw CSV rows.
-            # But we might also be handed a custom list of countries that didn't win medals 
-            # (where 'row' might be a fake dict or string).
-            if isinstance(row, str):
-                # It's a zero-medal country name, not a CSV row
-                drafted_country = row
-                display_name = drafted_country
-                for k, v in COUNTRY_NAME_MAP.items():
-                    if normalize_country_name(v) == normalize_country_name(drafted_country):
-                        display_name = k
-                        break
-                        
-                if display_name in ["United States", "USA"]:
-                    display_name = "United States of America"
-                elif display_name == "AIN":
-                    display_name = "Individual Neutral Athletes"
-                    
-                flag = FLAG_MAP.get(display_name, FLAG_MAP.get(drafted_country, ""))
-                if flag:
-                    flag = f" {flag}"
-                    
-                markdown_content += f"## {display_name}{flag}\n\n"
-                markdown_content += f"**{display_name}** did not bring home any medals during these winter games.\n\n"
-                markdown_content += "---\n\n"
-                continue
-
-            # Standard CSV Row logic
-            country = row['Country']
-            drafted_country = country # For displaying fallback
-            c_norm_drafted = normalize_country_name(country)
-            
-            display_name = country
-            for k, v in COUNTRY_NAME_MAP.items():
-                if normalize_country_name(v) == c_norm_drafted:
-                    display_name = k
-                    break
-                    
-            # Apply user-requested display overrides
-            if display_name in ["United States", "USA"]:
-                display_name = "United States of America"
-            elif display_name == "AIN":
-                display_name = "Individual Neutral Athletes"
-                
-            flag = FLAG_MAP.get(display_name, FLAG_MAP.get(drafted_country, ""))
-            if flag:
-                flag = f" {flag}"
-                
-            # Build paragraph
-            markdown_content += f"## {display_name}{flag}\n\n"
-            
-            participants = row['Participants']
-            g = row['Gold Medals']
-            s = row['Silver Medals']
-            b = row['Bronze Medals']
-            total_m = row['Total Medals']
-            weighted_m = row['Weighted Medals']
-            total_hw = row['Total Hardware']
-            mult_m = row['Multiplied Medals']
-            mult_hw = row['Multiplied Hardware']
-            
-            # Detail standard medals
-            total_m_int = int(total_m)
-            if total_m_int >= 20:
-                performance_desc = "delivered a powerhouse performance"
-            elif total_m_int >= 10:
-                performance_desc = "put together a strong campaign"
-            elif total_m_int >= 5:
-                performance_desc = "had a solid showing"
-            else:
-                performance_desc = "made their mark on the games"
-
-            # Use display_name in the text instead of the raw row country
-            markdown_content += (
-                f"**{display_name}** sent a delegation of **{participants}** athletes to the winter games. "
-                f"They {performance_desc}, bringing home a haul of **{total_m} medals** "
-                f"({g} 🥇, {s} 🥈, {b} 🥉) which netted them a baseline weighted score of {weighted_m} points.\n\n"
-            )
-            
-            # Determine highest team size for event multiplier logic
-            max_multiplier = 1
-            search_name = "AIN" if country == "Individual Neutral Athletes" else country
-            c_norm = normalize_country_name(search_name)
-            
-            for detail in details:
-                if normalize_country_name(detail.get('Country', '')) == c_norm:
-                    mult = get_hardware_multiplier(detail.get('Event', ''), detail.get('Medal', ''))
-                    if mult > max_multiplier:
-                        max_multiplier = mult
-
-            # Detail hardware and multipliers (analytical breakdown)
-            hardware_difference = int(total_hw) - int(total_m)
-            
-            if max_multiplier > 6:
-                markdown_content += (
-                    f"They excelled in large team sports, significantly boosting their physical medal count to "
-                    f"**{total_hw} total hardware medals** placed around necks. "
-                )
-            elif max_multiplier > 1 or hardware_difference > 0:
-                markdown_content += (
-                    f"Their success in small team sports and relays boosted their physical medal count to "
-                    f"**{total_hw} total hardware medals** placed around necks. "
-                )
-            else:
-                markdown_content += (
-                    f"Their medals came entirely from individual events, keeping their physical hardware output equal to their standard medal count. "
-                )
-                
-            markdown_content += (
-                f"After factoring in their custom draft handicap, they finished the games with a "
-                f"Final **Multiplied Hardware** score of **{mult_hw}** and a base **Multiplied Medals** score of **{mult_m}**.\n\n"
-            )
-                
-            markdown_content += "---\n\n"
-            
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
-            
-        print(f"Generated summaries successfully into {md_file}.")
-
-
-    # Write the master generated file containing all countries in the CSV
-    write_markdown_file("country_summaries.md", "Master Country Performance Summaries", rows, details, is_master=True)
-    
-    # Write the player-specific files
+
+    index = country_index(details)
+    names = display_names(COUNTRY_NAME_MAP)
+    cache = SectionCache.load(cache_path) if cache_path else SectionCache(None)
+
+    # The report model: every file's title and country sections, computed once for all formats
+    files = [("country_summaries", "Master Country Performance Summaries", rows)]
     for player_name, drafted_countries in DRAFTED_TEAMS.items():
-        # Setup target array linking rows with potential 0-medal drafts
-        player_targets = []
-        for drafted_country in drafted_countries:
-            c_norm_drafted = normalize_country_name(drafted_country)
-            
-            matching_row = None
-            for row in rows:
-                csv_c = row['Country']
-                if normalize_country_name(csv_c) == c_norm_drafted or normalize_country_name(COUNTRY_NAME_MAP.get(csv_c, csv_c)) == c_norm_drafted:
-                    matching_row = row
-                    break
-                    
-            if matching_row:
-                player_targets.append(matching_row)
-            else:
-                player_targets.append(drafted_country) # Pass as string
-                
-        write_markdown_file(f"{player_name}_summaries.md", f"{player_name}'s Drafted Country Summaries", player_targets, details)
+        files.append((f"{player_name}_summaries", f"{player_name}'s Drafted Country Summaries",
+                      player_targets(drafted_countries, rows, COUNTRY_NAME_MAP)))
+
+    for base, title, targets in files:
+        if not targets:
+            continue
+        inputs = [section_inputs(t, index, names) for t in targets]
+        for fmt in formats:
+            cache.write_file(reports.report_path(base, fmt), fmt, title, inputs)
+
+    cache.save()
+    print(f"Summaries: {cache.rendered} sections rendered, {cache.written} files rewritten.")
+    return cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the country and player summary reports.")
+    parser.add_argument('--format', action='append', choices=reports.FORMATS, dest='formats',
+                        help="Output format, can be repeated (default: md)")
+    args = parser.parse_args(argv)
+    return generate_markdown(formats=args.formats or ('md',))
+
 
 if __name__ == '__main__':
-    generate_markdown()
+    main()
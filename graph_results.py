@@ -1,48 +1,51 @@
-import os
-import json
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
+from time_travel import SnapshotIndex
 
 # --- Configuration ---
-SHEET_KEY = '18gTKqgWBv4KuAqCKppB9IZxZja-yhJzufj6oqrg7JXw'
-DRAFT_TAB_NAME = 'Draft'
-NEW_TAB_NAME = 'Final Standings Visualized'
-
-def get_google_sheet_client():
-    creds_json = os.environ.get('GOOGLE_CREDENTIALS')
-    if not creds_json:
-        raise ValueError("GOOGLE_CREDENTIALS environment variable not found.")
-    creds_dict = json.loads(creds_json)
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    client = gspread.authorize(creds)
-    return client
-
-def main():
-    try:
-        client = get_google_sheet_client()
-        sheet = client.open_by_key(SHEET_KEY)
-        ws = sheet.worksheet(DRAFT_TAB_NAME)
-        
-        # Get all values from the Draft tab
-        data = ws.get_all_values()
-        
-        # Target: rows 10-92 (indices 9-91), Columns A-D (indices 0-3) for players
-        # E (index 4) for contextual descriptions
-        
-        # Let's inspect the data first to determine structure
-        players = []
-        if len(data) > 9:
-            # Assuming row 9 has headers, or maybe row 10 is the first data row
-            # Let's print the first few rows of interest
-            print("Row 9 (Index 8):", data[8][:5])
-            print("Row 10 (Index 9):", data[9][:5])
-            print("Row 11 (Index 10):", data[10][:5])
-            
-    except Exception as e:
-        print(f"Error: {e}")
+OUTPUT_FILE = 'final_standings.png'
+SCORES = [('final_score', 'Final Score (HW x Mult)'), ('multiplied_medals', 'Multiplied Medals')]
+
+def load_score_frames(index):
+    """One DataFrame per score: index = run time, columns = players."""
+    import pandas as pd
+    players, runs = index.score_history()
+    frames = {}
+    for key, _ in SCORES:
+        frames[key] = pd.DataFrame(
+            [{p: scores[p][key] for p in scores} for _, scores in runs],
+            index=pd.DatetimeIndex([run_time for run_time, _ in runs], name='Run'),
+            columns=players,
+        )
+    return frames
+
+def main(output=OUTPUT_FILE):
+    # Everything comes from the local snapshot store; no Google access needed
+    index = SnapshotIndex()
+    if not len(index):
+        print("No stored snapshots yet. Run main.py first.")
+        return
+
+    # Plotting pulls in pandas and matplotlib, so only once there is something to plot
+    import matplotlib.pyplot as plt
+    frames = load_score_frames(index)
+    fig, axes = plt.subplots(len(SCORES), 1, figsize=(10, 4 * len(SCORES)), sharex=True)
+    for ax, (key, title) in zip(axes, SCORES):
+        frames[key].plot(ax=ax, marker='o', markersize=3)
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+
+    print("Final standings:")
+    for row in index.standings():
+        print(f"  {row['rank']}. {row['player']}: {row['final_score']:.2f}")
+
+    fig.tight_layout()
+    fig.savefig(output)
+    print(f"Saved chart to {output}")
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Plot player scores over time from the snapshot store.")
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    main(parser.parse_args(argv).output)
 
 if __name__ == "__main__":
-    main()
+    cli()
@@ -0,0 +1,38 @@
+"""
+One pooled HTTP session for every scraper in the process.
+
+main.py used requests.get (a new connection per call) and
+paralympics/main.py urllib (same). Everything now goes through get(), which
+reuses keep-alive connections to Wikipedia from a shared pool, so a run that
+updates both Games (games.py) pays for the TLS handshakes once.
+"""
+import threading
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+POOL_SIZE = 16 # Both Games' scrapes run at once
+TIMEOUT = 30
+
+_session = None
+_lock = threading.Lock()
+
+
+def get_session():
+    """The process-global requests.Session (created on first use)."""
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            _session = session
+        return _session
+
+
+def get(url, **kwargs):
+    """session.get with the shared pool and a default timeout."""
+    kwargs.setdefault('timeout', TIMEOUT)
+    return get_session().get(url, **kwargs)
@@ -1,44 +1,55 @@
 import os
 import json
-import requests
-# import gspread (Moved inside functions)
-# from oauth2client.service_account import ServiceAccountCredentials (Moved inside functions)
-from bs4 import BeautifulSoup
-from datetime import datetime
+import time
+from datetime import date, datetime
+import http_client
+from countries import CountryRegistry, weighted_medals
+from games import GAMES
+import participants
+from sheet_writes import WriteScheduler, adapt_chunk_size, get_or_create_worksheet
+from sheets_client import get_google_sheet_client
+from flavor_index import FlavorIndex, FLAVOR_HEADERS, medal_signature
+from sheet_summary import SUMMARY_TAB_NAME, summary_tables, summary_layout, sport_lookup
+from totals_history import (TOTALS_HISTORY_TAB_NAME, TOTALS_HISTORY_HEADERS, WEIGHTED_LABEL, MULTIPLIED_LABEL,
+                            totals_label, draft_totals_blocks, history_rows, get_or_create_history_tab)
 
 # --- Configuration ---
 SHEET_KEY = '18gTKqgWBv4KuAqCKppB9IZxZja-yhJzufj6oqrg7JXw'
-WIKIPEDIA_URL_COUNTS = 'https://en.wikipedia.org/wiki/2026_Winter_Olympics_medal_table'
-WIKIPEDIA_URL_DETAILS = 'https://en.wikipedia.org/wiki/List_of_2026_Winter_Olympics_medal_winners'
+WIKIPEDIA_URL_COUNTS = GAMES['olympics']['urls']['counts']
+WIKIPEDIA_URL_DETAILS = GAMES['olympics']['urls']['details']
 RESULTS_TAB_NAME = 'Results'
 FLAVOR_TAB_NAME = 'Flavor'
 DRAFT_TAB_NAME = 'Draft'
+# Sheets API write budget shared by every stage of a run (per-user quota is 60/min)
+SHEETS_REQUESTS_PER_MINUTE = int(os.environ.get('SHEETS_REQUESTS_PER_MINUTE', '60'))
+PIPELINE_WORKERS = 6 # Scrapes, Results cleanup, Flavor probe, CSV exports, snapshot
 
-def get_google_sheet_client():
-    """Authenticates with Google Sheets using Service Account."""
-    import gspread
-    from oauth2client.service_account import ServiceAccountCredentials
-    
-    creds_json = os.environ.get('GOOGLE_CREDENTIALS')
-    if not creds_json:
-        raise ValueError("GOOGLE_CREDENTIALS environment variable not found.")
-    creds_dict = json.loads(creds_json)
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-    client = gspread.authorize(creds)
-    return client
+# Revision and fetch time of the pages the last scrapes read, for the snapshot store
+FETCH_INFO = {} # {'counts'|'details': {'url':..., 'revision_id':..., 'fetched_at':...}}
+
+def record_fetch(kind, url, response):
+    """Notes which Wikipedia revision a scrape saw (mw.config's wgRevisionId)."""
+    import re
+    match = re.search(r'"wgRevisionId":\s*(\d+)', response.text)
+    FETCH_INFO[kind] = {
+        'url': url,
+        'revision_id': int(match.group(1)) if match else None,
+        'fetched_at': datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
 
 def scrape_medal_counts():
     """Scrapes country totals (Gold, Silver, Bronze) from Wikipedia."""
     print(f"Scraping Counts: {WIKIPEDIA_URL_COUNTS}...")
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
     try:
-        response = requests.get(WIKIPEDIA_URL_COUNTS, headers=headers)
+        response = http_client.get(WIKIPEDIA_URL_COUNTS, headers=headers)
         response.raise_for_status()
+        record_fetch('counts', WIKIPEDIA_URL_COUNTS, response)
     except Exception as e:
         print(f"Error scraping counts: {e}")
         return {}
 
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(response.content, 'html.parser')
     table = soup.find('table', class_='wikitable')
     if not table: return {}
@@ -130,27 +141,50 @@ def validate_data(data, data_type="counts"):
 
 def scrape_medal_details():
     """
-    Scrapes the list of medal winners (Event, Medal, Athlete, Country).
-    Returns list of dicts: [{'Event':..., 'Medal':..., 'Athlete':..., 'Country':...}]
+    Scrapes the list of medal winners (Event, Medal, Athlete, Country, Sport).
+    Returns list of dicts: [{'Event':..., 'Medal':..., 'Athlete':..., 'Country':..., 'Sport':...}]
     """
     print(f"Scraping Details: {WIKIPEDIA_URL_DETAILS}...")
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
     try:
-        response = requests.get(WIKIPEDIA_URL_DETAILS, headers=headers)
+        response = http_client.get(WIKIPEDIA_URL_DETAILS, headers=headers)
         if response.status_code == 404:
              print("Detail page not found. Skipping Flavor updates.")
              return []
         response.raise_for_status()
+        record_fetch('details', WIKIPEDIA_URL_DETAILS, response)
     except Exception as e:
         print(f"Error scraping details: {e}")
         return []
 
-    soup = BeautifulSoup(response.content, 'html.parser')
+    details = parse_medal_details(response.content)
+                
+    # SAVE RAW DETAILS
+    try:
+        with open('scraped_details.json', 'w') as f:
+            json.dump(details, f, indent=2)
+        print("Saved raw medal details to scraped_details.json")
+    except Exception as e:
+        print(f"Warning: Could not save JSON: {e}")
+        
+    return details
+
+def parse_medal_details(html):
+    """
+    Extracts medal rows from the medal winners page HTML (the live page or any
+    old revision of it). Returns the same list of dicts as scrape_medal_details.
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
     details = []
     
     tables = soup.find_all('table', class_='wikitable')
     
     for table in tables:
+        # The page has one section per sport (<h2>Alpine skiing</h2> ...)
+        heading = table.find_previous('h2')
+        sport = heading.get_text(" ", strip=True).replace("[edit]", "").strip() if heading else ""
+
         # Check if this is a medalists table. 
         # Usually headers are: Event | Gold | Silver | Bronze
         # Inspect headers to confirm
@@ -268,7 +302,8 @@ def scrape_medal_details():
                         'Event': event_name,
                         'Medal': color,
                         'Athlete': athlete,
-                        'Country': country
+                        'Country': country,
+                        'Sport': sport
                     })
 
                 if len(cols) >= 2: parse_medalist(cols[1], 'Gold')
@@ -278,32 +313,42 @@ def scrape_medal_details():
             except Exception:
                 continue
                 
-    # SAVE RAW DETAILS
-    try:
-        with open('scraped_details.json', 'w') as f:
-            json.dump(details, f, indent=2)
-        print("Saved raw medal details to scraped_details.json")
-    except Exception as e:
-        print(f"Warning: Could not save JSON: {e}")
-        
     return details
 
-def cleanup_garbage_rows(client):
+def group_row_ranges(row_numbers):
+    """[3, 4, 5, 9] -> [(3, 5), (9, 9)] (inclusive runs of consecutive rows)."""
+    ranges = []
+    for n in sorted(row_numbers):
+        if ranges and ranges[-1][1] == n - 1:
+            ranges[-1] = (ranges[-1][0], n)
+        else:
+            ranges.append((n, n))
+    return ranges
+
+def cleanup_garbage_rows(client, writer=None):
     """
     Reads the Results tab and removes rows that look like garbage data
     (e.g. numeric country names '0', '1', '35' or 'Totals').
+    Only the bad rows are deleted, so formatting and formulas on the rest survive.
+    Writes are queued on `writer` (a WriteScheduler); without one they are sent immediately.
+
+    Returns the Results rows as they look after cleanup, so update_results_tab can
+    reuse this read instead of downloading the tab again (None on error).
     """
     print("Running Garbage Cleanup on Results tab...")
+    own_writer = writer is None
+    if own_writer:
+        writer = WriteScheduler(SHEETS_REQUESTS_PER_MINUTE)
     try:
         sheet = client.open_by_key(SHEET_KEY)
         ws = sheet.worksheet(RESULTS_TAB_NAME)
         data = ws.get_all_values()
         
-        if not data: return
+        if not data: return data
         
         header = data[0]
         cleaned_data = [header] # Keep header
-        removed_count = 0
+        garbage_rows = [] # 1-based sheet row numbers
         
         # Identify Country column (usually Index 0)
         try:
@@ -311,12 +356,9 @@ def cleanup_garbage_rows(client):
         except ValueError:
             col_c = 0 # Fallback
             
-        for row in data[1:]:
-            # Get Country Name
-            if len(row) <= col_c: 
-                continue # Skip malformed
-            
-            c_name = row[col_c].strip()
+        for i, row in enumerate(data[1:], start=2):
+            # Get Country Name (malformed rows have none and count as garbage)
+            c_name = row[col_c].strip() if len(row) > col_c else ""
             
             # Criteria for GARBAGE:
             is_garbage = False
@@ -327,20 +369,27 @@ def cleanup_garbage_rows(client):
             elif "Rank" in c_name: is_garbage = True
             
             if is_garbage:
-                print(f"  -> Removing Garbage Row: {row}")
-                removed_count += 1
+                print(f"  -> Removing Garbage Row {i}: {row}")
+                garbage_rows.append(i)
             else:
                 cleaned_data.append(row)
         
-        if removed_count > 0:
-            print(f"Removed {removed_count} garbage rows. Writing back cleaned data...")
-            ws.clear()
-            ws.update('A1', cleaned_data)
+        if garbage_rows:
+            ranges = group_row_ranges(garbage_rows)
+            print(f"Removed {len(garbage_rows)} garbage rows in {len(ranges)} range(s).")
+            # Bottom-up, so the row numbers of earlier ranges stay valid
+            for start, end in reversed(ranges):
+                writer.delete_rows(ws, start, end)
+            if own_writer:
+                writer.flush()
         else:
             print("No garbage rows found.")
+
+        return cleaned_data
             
     except Exception as e:
         print(f"Error during cleanup: {e}")
+        return None
 
 def get_hardware_multiplier(event_name, athlete_str=""):
     """
@@ -422,36 +471,18 @@ def export_hardware_to_csv(hw_counts, filename="hardware_counts.csv"):
     headers = ["Country", "HW Gold", "HW Silver", "HW Bronze", "Total HW", "Weighted HW", "Multiplier", "Final Score"]
     rows = []
     
-    # Load multipliers
-    multipliers = {}
-    if os.path.exists('multipliers.json'):
-        try:
-            with open('multipliers.json', 'r') as f:
-                multipliers = json.load(f)
-        except Exception:
-            pass
+    # Load multipliers (normalized name -> multiplier)
+    multipliers = multiplier_lookup(load_multipliers())
     
     for country, counts in hw_counts.items():
         hw_g = counts.get('Gold', 0)
         hw_s = counts.get('Silver', 0)
         hw_b = counts.get('Bronze', 0)
         tot = hw_g + hw_s + hw_b
-        weighted = (hw_g * 3) + (hw_s * 2) + (hw_b * 1)
+        weighted = weighted_medals(hw_g, hw_s, hw_b)
         
-        # Apply multiplier (default to 1.0 if not found)
-        # Check explicit Country Name map just in case
-        from main import normalize_country_name
-        
-        # Override name for AIN mapping
-        search_name = "AIN" if country == "Individual Neutral Athletes" else country
-        
-        # We need a robust way to match the country with the multiplier file
-        mult = 1.0
-        c_norm = normalize_country_name(search_name)
-        for k, v in multipliers.items():
-            if normalize_country_name(k) == c_norm:
-                mult = v
-                break
+        # Apply multiplier (default to 1.0 if not found); multiplier_for handles AIN and other aliases
+        mult = multiplier_for(country, multipliers)
                 
         final_score = weighted * mult
         rows.append([country, hw_g, hw_s, hw_b, tot, weighted, mult, final_score])
@@ -469,12 +500,7 @@ def export_hardware_to_csv(hw_counts, filename="hardware_counts.csv"):
         print(f"Failed to export hardware counts: {e}")
 
 # --- Mappings ---
-DRAFTED_TEAMS = {
-    "Maya": ["Germany", "Austria", "France", "Switzerland", "Great Britain", "Estonia", "Greece", "Ukraine"],
-    "Ross": ["Norway", "Sweden", "Japan", "China", "South Korea", "Czech Republic", "Spain", "Brazil"],
-    "Mom": ["Canada", "USA", "Italy", "Australia", "Finland", "AIN", "Denmark", "Kazakhstan"],
-    "Drew": ["Netherlands", "Poland", "New Zealand", "Slovenia", "Belgium", "Croatia", "Slovakia", "Latvia"]
-}
+DRAFTED_TEAMS = GAMES['olympics']['draft']
 
 COUNTRY_NAME_MAP = {
     "United States": "USA",
@@ -489,6 +515,9 @@ COUNTRY_NAME_MAP = {
     "Individual Neutral Athletes": "AIN"
 }
 
+# Olympics names need no aliasing beyond the shared prefix rules
+COUNTRIES = CountryRegistry()
+
 def normalize_country_name(name):
     """
     Normalizes a country name for fuzzy matching.
@@ -496,17 +525,113 @@ def normalize_country_name(name):
     - Remove 'the', 'republic of', 'people's republic of'
     - Strip whitespace
     """
-    if not name: return ""
-    name = name.lower()
-    for prefix in ["the ", "republic of ", "people's republic of "]:
-        if name.startswith(prefix):
-            name = name[len(prefix):]
-    return name.strip()
-
-def update_results_tab(client, medal_counts):
+    return COUNTRIES.normalize(name)
+
+
+# Largest delegation when multipliers.json was made by hand (USA), for files without delegation sizes
+LEGACY_MAX_DELEGATION = 233
+
+def load_multipliers():
+    """
+    {country: multiplier} for the Olympics: largest delegation / delegation
+    size from the cached delegation sizes (participants.py), or the hand-kept
+    multipliers.json until those have been scraped. Never fetches.
+    """
+    delegations = participants.get_participants('olympics', cached_only=True)
+    if delegations:
+        return participants.dynamic_multipliers(delegations)[0]
+    try:
+        with open('multipliers.json', 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def refresh_participants():
+    """
+    Fetches the delegation sizes if the cache is older than its TTL, and keeps
+    multipliers.json in line with them. Returns the multipliers.
+    """
+    delegations = participants.get_participants('olympics')
+    if not delegations:
+        return load_multipliers()
+    multipliers = {c: round(m, 9) for c, m in sorted(participants.dynamic_multipliers(delegations)[0].items())}
+    if load_scraped_json('multipliers.json', {}) != multipliers:
+        tmp_path = 'multipliers.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(multipliers, f, indent=2)
+        os.replace(tmp_path, 'multipliers.json')
+        print(f"Regenerated multipliers.json from {len(delegations)} delegation sizes.")
+    return multipliers
+
+def multiplier_lookup(values):
+    """
+    {country: value} -> {normalized country: value} (first spelling wins).
+    Each country is also listed under its COUNTRY_NAME_MAP spellings, since
+    scraped delegation sizes use Wikipedia's names ("United States",
+    "Czechia") and the draft uses the league's ("USA", "Czech Republic").
+    """
+    aliases = {}
+    for scraped_name, sheet_name in COUNTRY_NAME_MAP.items():
+        aliases.setdefault(scraped_name, []).append(sheet_name)
+        aliases.setdefault(sheet_name, []).append(scraped_name)
+    lookup = {}
+    for k, v in values.items():
+        lookup.setdefault(normalize_country_name(k), v)
+    for k, v in values.items():
+        for alias in aliases.get(k, ()):
+            lookup.setdefault(normalize_country_name(alias), v)
+    return lookup
+
+def multiplier_for(country, lookup, default=1.0):
+    """A country's value from a multiplier_lookup. AIN may be listed under either name."""
+    search_name = "AIN" if country == "Individual Neutral Athletes" else country
+    value = lookup.get(normalize_country_name(search_name))
+    if value is None:
+        value = lookup.get(normalize_country_name(country), default)
+    return value
+
+def build_team_lookup(team_map):
+    """
+    Precomputes {country: team} lookups for resolve_team so each Flavor row costs
+    a few dict hits instead of nested scans over every drafted country.
+    The first team listing a country wins, as with the old linear scans.
+    """
+    direct = {}
+    fuzzy = {}
+    for t_name, countries in team_map.items():
+        for c in countries:
+            direct.setdefault(c, t_name)
+            fuzzy.setdefault(normalize_country_name(c), t_name)
+    return {'direct': direct, 'fuzzy': fuzzy}
+
+def resolve_team(c_name, lookup):
+    """Owning team for a scraped country name, or None if undrafted."""
+    # 1. Direct
+    if c_name in lookup['direct']:
+        return lookup['direct'][c_name]
+    # 2. Fuzzy
+    team = lookup['fuzzy'].get(normalize_country_name(c_name))
+    if team:
+        return team
+    # 3. Map Rule (e.g. scraped "United States" -> drafted "USA")
+    mapped_name = COUNTRY_NAME_MAP.get(c_name)
+    if mapped_name:
+        return lookup['direct'].get(mapped_name) or lookup['fuzzy'].get(normalize_country_name(mapped_name))
+    return None
+
+def update_results_tab(client, medal_counts, writer=None, data=None):
+    """
+    Writes scraped counts into the Results tab and appends missing countries.
+    data: the tab's rows as returned by cleanup_garbage_rows; read fresh if None.
+    Queued garbage deletions must be ahead of these writes on the same writer.
+    """
+    own_writer = writer is None
+    if own_writer:
+        writer = WriteScheduler(SHEETS_REQUESTS_PER_MINUTE)
     sheet = client.open_by_key(SHEET_KEY)
     ws = sheet.worksheet(RESULTS_TAB_NAME)
-    data = ws.get_all_values()
+    if data is None:
+        data = ws.get_all_values()
     
     # Map Helpers
     # "Individual Neutral Athletes" is a special case often requiring manual handling or specific mapping
@@ -591,7 +716,7 @@ def update_results_tab(client, medal_counts):
 
     if updates:
         print(f"Updating {len(updates)} cells in Results...")
-        ws.batch_update(updates)
+        writer.update_cells(ws, updates)
     else:
         print("No match found for any country in Results tab.")
 
@@ -641,58 +766,54 @@ def update_results_tab(client, medal_counts):
             print(f"  -> Appending {k}: {data}")
 
         if new_rows:
-            ws.append_rows(new_rows)
+            writer.append_rows(ws, new_rows)
             print("Appended missing countries.")
 
-def update_flavor_tab(client, details, team_map):
+    if own_writer:
+        writer.flush()
+
+def update_flavor_tab(client, details, team_map, writer=None, index=None, first_seen=None):
     """
     Appends NEW entries to the Flavor tab.
-    Logic: Read existing -> Check uniqueness -> Append new.
+    Logic: Sync local index -> Check uniqueness -> Append new.
     Also handles basic cleanup of "messy" rows if detected.
+
+    Existing signatures come from the local FlavorIndex (state/flavor_index.json),
+    which only costs a header+tail probe while its watermark matches the tab.
+    first_seen (medal_dates.FirstSeen) dates each row by the snapshot the medal
+    first appeared in; without it (or for unseen medals) rows get today's date.
     """
     if not details: return
+    own_writer = writer is None
+    if own_writer:
+        writer = WriteScheduler(SHEETS_REQUESTS_PER_MINUTE)
     
     sheet = client.open_by_key(SHEET_KEY)
     ws = sheet.worksheet(FLAVOR_TAB_NAME)
-    existing_data = ws.get_all_values()
+    if index is None:
+        index = FlavorIndex.load(SHEET_KEY)
+    index.ensure_synced(ws)
     
     # --- Cleanup Logic ---
     # Check if header is wrong or data is messy
-    headers = existing_data[0] if existing_data else []
+    headers = index.header
     
     # Aggressive check: If the first column header isn't "Date", we wipe it.
     # This handles the schema migration from [Country, Medal...] to [Date, Country...]
     if not headers or headers[0] != "Date":
         print("Flavor tab has old schema or is messy. Wiping and resetting...")
         # Clear everything and set correct headers
-        ws.clear()
-        ws.append_row(['Date', 'Country', 'Medal', 'Event', 'Athlete', 'Team'])
-        existing_data = [] # Reset local cache
+        writer.clear(ws)
+        writer.append_rows(ws, [FLAVOR_HEADERS])
+        index.reset(FLAVOR_HEADERS)
     
     # Signature for uniqueness: Event + Medal + Athlete
-    existing_sigs = set()
-    # Skip header
-    start_row_idx = 1 if existing_data else 0
-    
-    # Need to know which column is which in EXISTING data to check dupes
-    # New Format: Date (0), Country (1), Medal (2), Event (3), Athlete (4), Team (5)
-    # Old Format (if any survived): Country(0), Medal(1), Event(2), Athlete(3), Team(4)
-    # If we just cleared, it's empty.
-    
-    for row in existing_data[start_row_idx:]:
-        # Robust signature check
-        # Try to find Event/Medal/Athlete columns by content specific?
-        # Or just assume new format if headers match.
-        if len(row) >= 5:
-            # Assuming new format or similar enough to detect dupes
-            # Let's use a broad signature: concatenate all except Date?
-            # Or just Event+Medal+Athlete
-            # In new format: Event is idx 3, Medal is idx 2, Athlete is idx 4
-            if len(row) >= 5:
-                 sig = f"{row[3]}_{row[2]}_{row[4]}" 
-                 existing_sigs.add(sig)
+    # Format: Date (0), Country (1), Medal (2), Event (3), Athlete (4), Team (5)
+    existing_sigs = index.signatures
+    lookup = build_team_lookup(team_map)
 
     new_rows = []
+    new_sigs = set() # Prevent dupes within same batch
     
     # Calculate Date in CST (Central Standard Time)
     # GitHub Actions are UTC. CST is UTC-6, CDT is UTC-5.
@@ -705,86 +826,83 @@ def update_flavor_tab(client, details, team_map):
     today_str = cst_now.strftime("%Y-%m-%d")
     
     for d in details:
-        sig = f"{d['Event']}_{d['Medal']}_{d['Athlete']}"
-        if sig in existing_sigs: continue
+        sig = medal_signature(d['Event'], d['Medal'], d['Athlete'])
+        if sig in existing_sigs or sig in new_sigs: continue
         
         # New!
         c_name = d['Country']
         
-        # Find Team
-        owner_team = "Free Agent"
-        
-        # Normalize for matching: allow flexible matching against team list
-        # Map scraped name to potential sheet names?
-        # Or just try exact, then map.
-        
-        found = False
-        for t_name, countries in team_map.items():
-            if found: break
-            
-            # Check 1: Direct presence
-            if c_name in countries:
-                owner_team = t_name
-                found = True
-                break
-            
-            # Check 2: Fuzzy / Case insensitive
-            c_norm = normalize_country_name(c_name)
-            for c in countries:
-                if normalize_country_name(c) == c_norm:
-                    owner_team = t_name
-                    found = True
-                    break
-            
-            # Check 3: Map Lookup
-            # If d['Country'] is "United States", maybe team has "USA"
-            if not found:
-                mapped_name = COUNTRY_NAME_MAP.get(c_name)
-                # Direct Map Check
-                if mapped_name and mapped_name in countries:
-                    owner_team = t_name
-                    found = True
-                    break
-                
-                # Check normalized map result
-                if mapped_name:
-                    m_norm = normalize_country_name(mapped_name)
-                    for c in countries:
-                        if normalize_country_name(c) == m_norm:
-                            owner_team = t_name
-                            found = True
-                            break
+        # Find Team (direct, fuzzy, then COUNTRY_NAME_MAP)
+        owner_team = resolve_team(c_name, lookup) or "Free Agent"
         
         # New Row Format: [Date, Country, Medal, Event, Athlete, Team]
-        # We use today's date because Wikipedia doesn't provide it easily.
-        # User asked for "date they were earned". 
-        # Since we run daily, "today" is a good approximation for NEW rows.
+        # Wikipedia doesn't give the date a medal was earned, so we use the
+        # first snapshot it appeared in. That is right even after a missed run;
+        # "today" is only the fallback.
+        award_date = first_seen.award_date(d['Event'], d['Medal'], d['Athlete']) if first_seen else None
         
-        new_rows.append([today_str, d['Country'], d['Medal'], d['Event'], d['Athlete'], owner_team])
-        existing_sigs.add(sig) # Prevent dupes within same batch
+        new_row = [award_date or today_str, d['Country'], d['Medal'], d['Event'], d['Athlete'], owner_team]
+        new_rows.append(new_row)
+        new_sigs.add(sig)
 
     if new_rows:
         print(f"Adding {len(new_rows)} new rows to Flavor tab.")
-        # append_rows needs a list of lists
-        ws.append_rows(new_rows, value_input_option='USER_ENTERED')
     else:
         print("No new Flavor entries.")
 
-def repair_flavor_teams(client, team_map):
+    # After a gap there can be hundreds of rows. Send them in bounded chunks and
+    # checkpoint the index after each one, so a failed run resumes from the last
+    # chunk that landed instead of guessing (the watermark catches the chunk that
+    # was in flight). The last chunk rides along with the rest of the run's writes.
+    chunk_rows = index.chunk_rows
+    while len(new_rows) > chunk_rows:
+        chunk, new_rows = new_rows[:chunk_rows], new_rows[chunk_rows:]
+        writer.append_rows(ws, flavor_cells(chunk))
+        started = time.monotonic()
+        writer.flush()
+        index.add_rows(chunk)
+        chunk_rows = index.chunk_rows = adapt_chunk_size(chunk_rows, time.monotonic() - started)
+        index.save()
+        print(f"Checkpointed Flavor index at {len(index.rows)} rows. {len(new_rows)} rows to go.")
+
+    index.add_rows(new_rows)
+    writer.append_rows(ws, flavor_cells(new_rows))
+    # The index only moves forward once the appends have actually landed
+    writer.after_flush(index.save)
+
+    if own_writer:
+        writer.flush()
+
+def flavor_cells(rows):
+    """Flavor rows as sent to the sheet: the ISO Date column becomes a real date cell."""
+    return [[date.fromisoformat(row[0])] + list(row[1:]) for row in rows]
+
+def team_map_fingerprint(team_map):
+    """Changes whenever the draft (or the name mapping used to resolve it) changes."""
+    import hashlib
+    payload = json.dumps([team_map, COUNTRY_NAME_MAP], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def repair_flavor_teams(client, team_map, writer=None, index=None):
     """
-    One-off / Retroactive fix:
-    Iterates through ALL Flavor tab rows.
-    If a row has a Country that maps to a Team, but the current Team is 'Free Agent' (or empty),
+    Retroactive fix:
+    If a Flavor row has a Country that maps to a Team, but the current Team is 'Free Agent' (or empty),
     update it to the correct Team.
+
+    Works on the local FlavorIndex mirror instead of re-reading the tab. Rows already
+    examined under the same team map are skipped, so a normal run only looks at rows
+    appended since the last one; a changed draft re-examines everything.
     """
     print("Running Retroactive Flavor Team Repair...")
     sheet = client.open_by_key(SHEET_KEY)
     ws = sheet.worksheet(FLAVOR_TAB_NAME)
-    data = ws.get_all_values()
+    if index is None:
+        index = FlavorIndex.load(SHEET_KEY)
+    index.ensure_synced(ws)
     
-    if not data: return
+    if not index.header: return
 
-    headers = data[0]
+    headers = index.header
     try:
         col_country = headers.index('Country')
         col_team = headers.index('Team')
@@ -792,85 +910,33 @@ def repair_flavor_teams(client, team_map):
         print("Flavor tab missing headers for Repair.")
         return
 
+    fingerprint = team_map_fingerprint(team_map)
+    if index.repair_fingerprint == fingerprint:
+        start = index.repaired_rows
+    else:
+        print("Draft mapping changed since the last repair. Re-examining every Flavor row.")
+        start = 0
+    print(f"Examining {len(index.rows) - start} of {len(index.rows)} Flavor rows.")
+
+    lookup = build_team_lookup(team_map)
     updates = []
     
-    for i, row in enumerate(data[1:], start=2):
+    # Row k of the mirror is sheet row k + 2 (after the header)
+    for i, row in enumerate(index.rows[start:], start=start + 2):
         # Safety check for row length
         if len(row) <= max(col_country, col_team): continue
         
         current_team = row[col_team]
         c_name = row[col_country]
         
-        # Only try to repair if it looks like it needs it (Optional: or correct mismatch?)
-        # Let's be safe: If it's "Free Agent" or empty, DEFINITELY try to fix.
+        # Only try to repair if it looks like it needs it
         if current_team not in ["Free Agent", ""]: 
              continue
              
-        # Debug Logging for Targets
-        is_target = any(t in c_name for t in ["Netherlands", "Korea"])
-        
-        # --- Logic from update_flavor_tab (Shared) ---
-        owner_team = "Free Agent"
-        found = False
-        
-        match_type = ""
-
-        # 1. Direct
-        for t_name, countries in team_map.items():
-            if c_name in countries:
-                owner_team = t_name
-                found = True
-                match_type = "Direct"
-                break
-        
-        # 2. Fuzzy
-        if not found:
-            c_norm = normalize_country_name(c_name)
-            for t_name, countries in team_map.items():
-                for c in countries:
-                    if normalize_country_name(c) == c_norm:
-                        owner_team = t_name
-                        found = True
-                        match_type = f"Fuzzy (Matched '{c}')"
-                        break
-                if found: break
+        owner_team = resolve_team(c_name, lookup)
         
-        # 3. Map Rule
-        if not found:
-            mapped_name = COUNTRY_NAME_MAP.get(c_name)
-            if mapped_name:
-                # Direct check
-                for t_name, countries in team_map.items():
-                    if mapped_name in countries:
-                        owner_team = t_name
-                        found = True
-                        match_type = f"Map Direct ('{mapped_name}')"
-                        break
-                
-                # Normalized Map check
-                if not found:
-                    m_norm = normalize_country_name(mapped_name)
-                    for t_name, countries in team_map.items():
-                        for c in countries:
-                             if normalize_country_name(c) == m_norm:
-                                 owner_team = t_name
-                                 found = True
-                                 match_type = f"Map Fuzzy ('{mapped_name}' -> '{c}')"
-                                 break
-                        if found: break
-        
-        if is_target:
-             if found:
-                 print(f"DEBUG: Found '{c_name}' -> '{owner_team}' via {match_type}")
-             else:
-                 print(f"DEBUG: FAILED to match '{c_name}'. Current Team Map Keys: {list(team_map.keys())}")
-                 # Optional: print close matches?
-
         # --- Apply Update if Found & Different ---
-
-        
-        # --- Apply Update if Found & Different ---
-        if found and owner_team != current_team:
+        if owner_team and owner_team != current_team:
             print(f"Repairing Row {i}: {c_name} -> {owner_team} (Was: '{current_team}')")
             # Convert to A1 notation for update
             # col_team is 0-indexed. gspread is 1-indexed.
@@ -878,16 +944,95 @@ def repair_flavor_teams(client, team_map):
             col_letter = gspread.utils.rowcol_to_a1(1, col_team + 1)[0]
             cell_range = f"{col_letter}{i}"
             updates.append({'range': cell_range, 'values': [[owner_team]]})
+            row[col_team] = owner_team # Keep the mirror in step with the sheet
+
+    # Free Agents left now are undrafted countries; they only change with the draft
+    index.repair_fingerprint = fingerprint
+    index.repaired_rows = len(index.rows)
 
+    own_writer = writer is None
+    if own_writer:
+        writer = WriteScheduler(SHEETS_REQUESTS_PER_MINUTE)
     if updates:
-        ws.batch_update(updates)
+        writer.update_cells(ws, updates)
         print(f"Repaired {len(updates)} Flavor rows.")
     else:
         print("No Flavor rows needed repair.")
+    writer.after_flush(index.save)
+    if own_writer:
+        writer.flush()
 
-def calculate_draft_totals(client):
+def repair_flavor_dates(client, first_seen, writer=None, index=None):
+    """
+    Moves Flavor dates earlier where the snapshots (or a revision backfill)
+    show the medal existed before the row's date. Dates only move earlier:
+    a medal first seen today may have been won before we started storing
+    snapshots. Works on the local index, so it costs no reads.
+    """
+    sheet = client.open_by_key(SHEET_KEY)
+    ws = sheet.worksheet(FLAVOR_TAB_NAME)
+    if index is None:
+        index = FlavorIndex.load(SHEET_KEY)
+    index.ensure_synced(ws)
+    if index.header[:len(FLAVOR_HEADERS)] != FLAVOR_HEADERS: return
+
+    import gspread
+    from sheet_writes import parse_sheet_date
+    updates = []
+    for i, row in enumerate(index.rows, start=2):
+        if len(row) < 5: continue
+        award_date = first_seen.award_date(row[3], row[2], row[4])
+        if not award_date: continue
+        # The cell reads back in the sheet's display format (e.g. 2/7/2026); compare as dates
+        current = parse_sheet_date(row[0])
+        if current is None: continue
+        if date.fromisoformat(award_date) < current:
+            updates.append({'range': gspread.utils.rowcol_to_a1(i, 1), 'values': [[date.fromisoformat(award_date)]]})
+            row[0] = award_date # Keep the mirror in step with the sheet
+
+    own_writer = writer is None
+    if own_writer:
+        writer = WriteScheduler(SHEETS_REQUESTS_PER_MINUTE)
+    if updates:
+        print(f"Moving {len(updates)} Flavor dates to when the medal first appeared.")
+        writer.update_cells(ws, updates)
+    writer.after_flush(index.save)
+    if own_writer:
+        writer.flush()
+
+def update_summary_tab(client, team_map, details, writer=None, index=None):
+    """
+    Rewrites the Summary tab (medals per player per day, per sport and per
+    country) from the Flavor index, so sheet charts read small precomputed
+    ranges instead of recalculating over the whole Flavor log.
+    Run it after the Flavor stages so the index includes today's rows.
+    """
+    sheet = client.open_by_key(SHEET_KEY)
+    if index is None:
+        index = FlavorIndex.load(SHEET_KEY)
+    if not index.synced:
+        index.ensure_synced(sheet.worksheet(FLAVOR_TAB_NAME))
+    ws, _ = get_or_create_worksheet(sheet, SUMMARY_TAB_NAME)
+
+    tables = summary_tables(index.header, index.rows, list(team_map), sport_lookup(details or []))
+    updates, n_rows, n_cols = summary_layout(tables)
+    print(f"Updating {SUMMARY_TAB_NAME} tab ({', '.join(f'{t}: {len(rows) - 1} rows' for t, rows in tables)})...")
+
+    own_writer = writer is None
+    if own_writer:
+        writer = WriteScheduler(SHEETS_REQUESTS_PER_MINUTE)
+    # Clear + rewrite go out in the same batchUpdate, so readers never see it half-written
+    writer.resize(ws, n_rows, n_cols)
+    writer.clear(ws)
+    writer.update_cells(ws, updates)
+    if own_writer:
+        writer.flush()
+
+def calculate_draft_totals(client, writer=None):
     """
     Calculates Weighted/Multiplied totals from Results and updates Draft tab.
+    Each run's totals are also appended to the Totals History tab.
+    Reads the Results tab, so any queued Results writes must be flushed first.
     """
     sheet = client.open_by_key(SHEET_KEY)
     res_ws = sheet.worksheet(RESULTS_TAB_NAME)
@@ -932,7 +1077,7 @@ def calculate_draft_totals(client):
         except ValueError:
             g, s, b, m = 0, 0, 0, 1.0
             
-        w = g*3 + s*2 + b*1
+        w = weighted_medals(g, s, b)
         mult = w * m
         c_stats[c] = {'w': w, 'm': mult, 'raw_m': m}
         
@@ -955,22 +1100,23 @@ def calculate_draft_totals(client):
         teams[col_i] = {'name': t_name, 'countries': []}
         
     # Iterate rows for countries
-    for row in d_data[1:]:
+    # The roster ends at the first totals row (current totals or, on sheets
+    # not migrated yet, the oldest historical block).
+    roster_end = 1 # 1-based row of the last roster entry
+    for row_i, row in enumerate(d_data[1:], start=2):
+        if totals_label(row): break
         for col_i, cell_val in enumerate(row):
              if col_i in teams and cell_val:
                  teams[col_i]['countries'].append(cell_val)
+                 roster_end = row_i
 
     # 3. Calculate & Push
     updates = []
     
-    # Determine where to put totals (Dynamic Row)
-    # d_data includes header (Row 1). len(d_data) is the number of rows read.
-    # If d_data has 15 rows, the last row index is 14 (0-based) -> Row 15 (1-based).
-    # We want totals at Row 17 (last + 2).
+    # Totals live at a fixed spot below the roster and are overwritten each run.
+    # History goes to the Totals History tab instead of piling up here.
     # Minimum Row: 10 (to preserve original layout if list is short)
-    
-    last_data_row = len(d_data)
-    total_row_idx = max(10, last_data_row + 2) # 1-based index for gspread
+    total_row_idx = max(10, roster_end + 2) # 1-based index for gspread
     
     # Row 1: Weighted Total
     # Row 2: Multiplied Total
@@ -978,11 +1124,12 @@ def calculate_draft_totals(client):
     row_m_idx = total_row_idx + 1
     
     # Labels
-    updates.append({'range': f'E{row_w_idx}', 'values': [['Total Medals (Weighted)']]})
-    updates.append({'range': f'E{row_m_idx}', 'values': [['Multiplied Total']]})
+    updates.append({'range': f'E{row_w_idx}', 'values': [[WEIGHTED_LABEL]]})
+    updates.append({'range': f'E{row_m_idx}', 'values': [[MULTIPLIED_LABEL]]})
 
     # Calculate Totals
     team_map_result = {} # For Flavor tab use: {TeamName: [Countries]}
+    current_totals = {} # {TeamName: (weighted, multiplied)} for the history
     
     for col_i, t_data in teams.items():
         team_map_result[t_data['name']] = t_data['countries']
@@ -1038,15 +1185,45 @@ def calculate_draft_totals(client):
                 tot_w += s['w']
                 tot_m += s['m']
         
-        # Col letter
+        current_totals[t_data['name']] = (tot_w, tot_m)
+
         # Col letter
         import gspread
         col_char = gspread.utils.rowcol_to_a1(1, col_i+1)[0]
         updates.append({'range': f"{col_char}{row_w_idx}", 'values': [[tot_w]]})
         updates.append({'range': f"{col_char}{row_m_idx}", 'values': [[tot_m]]})
 
+    # 4. History: one row per player per run, appended in the same batch
+    history_ws, created = get_or_create_history_tab(sheet)
+    history = []
+    if created:
+        history.append(TOTALS_HISTORY_HEADERS)
+
+    # Old runs left totals blocks below the current ones. Move them across
+    # (oldest first) and delete them from the Draft tab.
+    last_old_row = 0
+    for row_i, row in enumerate(d_data[row_m_idx:], start=row_m_idx + 1):
+        if totals_label(row): last_old_row = row_i
+    if created or last_old_row:
+        players = {col_i: t['name'] for col_i, t in teams.items()}
+        old_blocks = draft_totals_blocks(d_data[roster_end:], players)
+        print(f"Moving {len(old_blocks)} old totals blocks from the Draft tab to {TOTALS_HISTORY_TAB_NAME}...")
+        for block in old_blocks:
+            history.extend(history_rows('', block))
+
+    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    history.extend(history_rows(timestamp, current_totals))
+
     print(f"Updating Draft tab totals at Row {row_w_idx}...")
-    draft_ws.batch_update(updates)
+    own_writer = writer is None
+    if own_writer:
+        writer = WriteScheduler(SHEETS_REQUESTS_PER_MINUTE)
+    writer.update_cells(draft_ws, updates)
+    if last_old_row:
+        writer.delete_rows(draft_ws, row_m_idx + 1, last_old_row)
+    writer.append_rows(history_ws, history)
+    if own_writer:
+        writer.flush()
     
     return team_map_result
 
@@ -1058,39 +1235,27 @@ def export_teams_to_csv(hw_counts):
     import csv
     import os
     import json
-    from main import normalize_country_name, DRAFTED_TEAMS
     
     filename = "team_scores.csv"
     print(f"Exporting team scores to {filename}...")
     headers = ["Team", "HW Gold", "HW Silver", "HW Bronze", "Total HW", "Weighted HW", "Final Score"]
     
-    # Load multipliers
-    multipliers = {}
-    if os.path.exists('multipliers.json'):
-        try:
-            with open('multipliers.json', 'r') as f:
-                multipliers = json.load(f)
-        except Exception:
-            pass
+    # Load multipliers (normalized name -> multiplier)
+    multipliers = multiplier_lookup(load_multipliers())
             
     team_totals = {team: {'g': 0, 's': 0, 'b': 0, 'tot': 0, 'weighted': 0, 'final': 0.0} for team in DRAFTED_TEAMS}
-    from main import COUNTRY_NAME_MAP
     
     for country, counts in hw_counts.items():
         hw_g = counts.get('Gold', 0)
         hw_s = counts.get('Silver', 0)
         hw_b = counts.get('Bronze', 0)
         tot = hw_g + hw_s + hw_b
-        weighted = (hw_g * 3) + (hw_s * 2) + (hw_b * 1)
+        weighted = weighted_medals(hw_g, hw_s, hw_b)
         
         # Apply multiplier (default to 1.0 if not found)
         search_name = "AIN" if country == "Individual Neutral Athletes" else country
-        mult = 1.0
         c_norm = normalize_country_name(search_name)
-        for k, v in multipliers.items():
-            if normalize_country_name(k) == c_norm:
-                mult = v
-                break
+        mult = multiplier_for(country, multipliers)
                 
         final_score = weighted * mult
         
@@ -1151,28 +1316,13 @@ def export_teams_to_csv(hw_counts):
     except Exception as e:
         print(f"Failed to export team scores: {e}")
 
-def export_player_scores_to_csv(hw_counts, medal_counts):
+def compute_player_scores(hw_counts, medal_counts):
     """
-    Exports a clean CSV containing only the 4 requested scores for each player:
-    Weighted HW, Final Score (HW * Mult), Medals, Multiplied Medals.
+    The 4 requested scores for each player, best Final Score first:
+    [Player, Weighted HW, Final Score (HW * Mult), Medals, Multiplied Medals].
     """
-    import csv
-    import os
-    import json
-    from main import normalize_country_name, DRAFTED_TEAMS, COUNTRY_NAME_MAP
-    
-    filename = "player_scores.csv"
-    print(f"Exporting player scores to {filename}...")
-    headers = ["Player", "Weighted HW", "Final Score", "Medals", "Multiplied Medals"]
-    
-    # Load multipliers
-    multipliers = {}
-    if os.path.exists('multipliers.json'):
-        try:
-            with open('multipliers.json', 'r') as f:
-                multipliers = json.load(f)
-        except Exception:
-            pass
+    # Load multipliers (normalized name -> multiplier)
+    multipliers = multiplier_lookup(load_multipliers())
             
     player_totals = {player: {'weighted_hw': 0, 'final_score': 0.0, 'medals': 0, 'multiplied_medals': 0.0} for player in DRAFTED_TEAMS}
     
@@ -1181,15 +1331,11 @@ def export_player_scores_to_csv(hw_counts, medal_counts):
         hw_g = counts.get('Gold', 0)
         hw_s = counts.get('Silver', 0)
         hw_b = counts.get('Bronze', 0)
-        weighted_hw = (hw_g * 3) + (hw_s * 2) + (hw_b * 1)
+        weighted_hw = weighted_medals(hw_g, hw_s, hw_b)
         
         search_name = "AIN" if country == "Individual Neutral Athletes" else country
         c_norm = normalize_country_name(search_name)
-        mult = 1.0
-        for k, v in multipliers.items():
-            if normalize_country_name(k) == c_norm:
-                mult = v
-                break
+        mult = multiplier_for(country, multipliers)
                 
         final_hw_score = weighted_hw * mult
         
@@ -1217,11 +1363,7 @@ def export_player_scores_to_csv(hw_counts, medal_counts):
         
         search_name = "AIN" if country == "Individual Neutral Athletes" else country
         c_norm = normalize_country_name(search_name)
-        mult = 1.0
-        for k, v in multipliers.items():
-            if normalize_country_name(k) == c_norm:
-                mult = v
-                break
+        mult = multiplier_for(country, multipliers)
                 
         owner_team = None
         for team, countries in DRAFTED_TEAMS.items():
@@ -1252,6 +1394,19 @@ def export_player_scores_to_csv(hw_counts, medal_counts):
         
     # Sort by Final Score (descending)
     rows.sort(key=lambda x: x[2], reverse=True)
+    return rows
+
+def export_player_scores_to_csv(hw_counts, medal_counts):
+    """
+    Exports a clean CSV containing only the 4 requested scores for each player:
+    Weighted HW, Final Score (HW * Mult), Medals, Multiplied Medals.
+    """
+    import csv
+    
+    filename = "player_scores.csv"
+    print(f"Exporting player scores to {filename}...")
+    headers = ["Player", "Weighted HW", "Final Score", "Medals", "Multiplied Medals"]
+    rows = compute_player_scores(hw_counts, medal_counts)
     
     try:
         with open(filename, 'w', newline='', encoding='utf-8') as f:
@@ -1269,7 +1424,6 @@ def export_country_blog_csv(hw_counts, medal_counts):
     import csv
     import os
     import json
-    from main import normalize_country_name
     
     filename = "country_blog_data.csv"
     print(f"Exporting country blog data to {filename}...")
@@ -1279,15 +1433,10 @@ def export_country_blog_csv(hw_counts, medal_counts):
         "Multiplied Medals", "Multiplied Hardware"
     ]
     
-    # Load multipliers
-    multipliers = {}
-    if os.path.exists('multipliers.json'):
-        try:
-            with open('multipliers.json', 'r') as f:
-                multipliers = json.load(f)
-        except Exception:
-            pass
-            
+    # Load multipliers and delegation sizes (normalized name -> value)
+    multipliers = multiplier_lookup(load_multipliers())
+    delegations = multiplier_lookup(participants.get_participants('olympics', cached_only=True))
+
     # Combine the list of countries from both dictionaries to ensure we don't miss any
     all_countries = set(hw_counts.keys()).union(set(medal_counts.keys()))
     
@@ -1298,27 +1447,21 @@ def export_country_blog_csv(hw_counts, medal_counts):
         s_counts = medal_counts.get(country, {})
         g, s, b = s_counts.get('Gold', 0), s_counts.get('Silver', 0), s_counts.get('Bronze', 0)
         total_medals = g + s + b
-        weighted_medals = (g * 3) + (s * 2) + b
+        weighted_m = weighted_medals(g, s, b)
         
         # Hardware Math
         h_counts = hw_counts.get(country, {})
         hw_g, hw_s, hw_b = h_counts.get('Gold', 0), h_counts.get('Silver', 0), h_counts.get('Bronze', 0)
         total_hw = hw_g + hw_s + hw_b
-        weighted_hw = (hw_g * 3) + (hw_s * 2) + (hw_b * 1)
+        weighted_hw = weighted_medals(hw_g, hw_s, hw_b)
         
         # Multiplier Logic
-        search_name = "AIN" if country == "Individual Neutral Athletes" else country
-        c_norm = normalize_country_name(search_name)
-        mult = 1.0
-        for k, v in multipliers.items():
-            if normalize_country_name(k) == c_norm:
-                mult = v
-                break
-                
-        # Calculate True Participants (from User logic: Multiplier = 233 / Athletes)
-        true_participants = round(233 / mult)
+        mult = multiplier_for(country, multipliers)
+
+        # Scraped delegation size, else reverse-engineered (Multiplier = 233 / Athletes)
+        true_participants = multiplier_for(country, delegations, default=None) or round(LEGACY_MAX_DELEGATION / mult)
                 
-        multiplied_medals = weighted_medals * mult
+        multiplied_medals = weighted_m * mult
         multiplied_hw = weighted_hw * mult
         
         # Only add countries that actually have medals to keep the blog clean
@@ -1328,7 +1471,7 @@ def export_country_blog_csv(hw_counts, medal_counts):
                 true_participants,
                 g, s, b,
                 total_medals,
-                weighted_medals,
+                weighted_m,
                 total_hw,
                 weighted_hw,
                 round(multiplied_medals, 2),
@@ -1347,58 +1490,249 @@ def export_country_blog_csv(hw_counts, medal_counts):
     except Exception as e:
         print(f"Failed to export country blog data: {e}")
 
-def main():
+def load_scraped_json(filename, default):
+    """Loads the output of a previous scrape (scraped_medals.json / scraped_details.json)."""
     try:
-        client = get_google_sheet_client()
-        
-        # 0. Cleanup Garbage Rows (Automated Maintenance)
-        cleanup_garbage_rows(client)
-        
-        # 1. Scrape Details & Validate Phase
-        # We run this early now to compute hardware explicitly for CSV export.
-        details = scrape_medal_details()
-        is_valid_d, msg_d = validate_data(details, "details")
-        if is_valid_d:
-            hw_counts = aggregate_hardware_counts(details)
-            if hw_counts:
-                export_hardware_to_csv(hw_counts)
-        else:
-            details = []
-            print(f"Validation FAILED for Details ({msg_d}). Hardware counts will skip.")
-            
-        # 2. Scrape Counts & Validate
-        counts = scrape_medal_counts()
-        is_valid_c, msg_c = validate_data(counts, "counts")
-        
-        # Export team and player scores after BOTH hardware and counts are available
-        if is_valid_d and is_valid_c and hw_counts:
-            export_teams_to_csv(hw_counts)
-            export_player_scores_to_csv(hw_counts, counts)
-            export_country_blog_csv(hw_counts, counts)
-        elif is_valid_d and hw_counts:
-            export_teams_to_csv(hw_counts)
-        
-        if is_valid_c:
-            update_results_tab(client, counts)
-        else:
-            print(f"Validation FAILED for Counts ({msg_c}). Skipping Results update.")
+        with open(filename, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not load {filename}: {e}")
+        return default
+
+def load_flavor_index(client):
+    """Loads the local Flavor index and probes the tab (see FlavorIndex.sync)."""
+    index = FlavorIndex.load(SHEET_KEY)
+    ws = client.open_by_key(SHEET_KEY).worksheet(FLAVOR_TAB_NAME)
+    index.ensure_synced(ws)
+    return index
+
+def run_exports(hw_counts, counts, counts_valid):
+    """Local CSV exports. Needs no Sheets data, so it runs beside the Sheets stages."""
+    if not hw_counts:
+        return
+    export_hardware_to_csv(hw_counts)
+    export_teams_to_csv(hw_counts)
+    # Player and country scores need BOTH hardware and counts
+    if counts_valid:
+        export_player_scores_to_csv(hw_counts, counts)
+        export_country_blog_csv(hw_counts, counts)
+
+def store_snapshot(details, counts, hw_counts):
+    """
+    Appends this run's counts, details and player scores to the Parquet history,
+    then diffs it against the previous snapshots to date new medals.
+    Returns the medal_dates.FirstSeen times, or None if that failed.
+    """
+    import snapshot_store
+    import medal_dates
+    scores = compute_player_scores(hw_counts, counts) if hw_counts and counts else []
+    try:
+        snapshot_store.write_run(counts or {}, details or [], scores, fetch_info=FETCH_INFO)
+        return medal_dates.update_first_seen()
+    except Exception as e:
+        # History is nice to have; it must never cost us the Sheets update
+        print(f"Failed to store snapshot: {e}")
+
+def fetch_details(offline):
+    """Medal details (scraped, or the last scrape offline); [] if they fail validation."""
+    details = load_scraped_json('scraped_details.json', []) if offline else scrape_medal_details()
+    is_valid_d, msg_d = validate_data(details, "details")
+    if not is_valid_d:
+        print(f"Validation FAILED for Details ({msg_d}). Hardware counts will skip.")
+        return []
+    return details
+
+def fetch_counts(offline):
+    """(medal counts, whether they passed validation)."""
+    counts = load_scraped_json('scraped_medals.json', {}) if offline else scrape_medal_counts()
+    is_valid_c, msg_c = validate_data(counts, "counts")
+    if not is_valid_c:
+        print(f"Validation FAILED for Counts ({msg_c}). Skipping Results update.")
+    return counts, is_valid_c
+
+def fetch_multipliers(offline):
+    # Delegation sizes are cached for weeks, so this is usually just a file read
+    return load_multipliers() if offline else refresh_participants()
+
+def load_first_seen():
+    import medal_dates
+    return medal_dates.FirstSeen.load()
+
+def update_results_stage(client, writer, counts, counts_valid, results_snapshot):
+    # The cleanup snapshot already reflects the queued deletions, so it stands in for a fresh read
+    if counts_valid:
+        update_results_tab(client, counts, writer, data=results_snapshot)
+
+def draft_totals_stage(client, writer):
+    # Draft totals are computed from the Results tab, so its writes go out first
+    writer.flush()
+    return calculate_draft_totals(client, writer)
+
+def flavor_append_stage(client, writer, details, team_map, flavor_index, first_seen):
+    # New rows are dated by when the snapshots first saw each medal
+    if team_map and details:
+        update_flavor_tab(client, details, team_map, writer, index=flavor_index, first_seen=first_seen)
+
+def flavor_dates_stage(client, writer, first_seen, flavor_index):
+    if first_seen:
+        repair_flavor_dates(client, first_seen, writer, index=flavor_index)
+
+def flavor_repair_stage(client, writer, team_map, flavor_index):
+    # Only examines rows added since its last run unless the draft changed
+    if team_map:
+        repair_flavor_teams(client, team_map, writer, index=flavor_index)
+
+def summary_stage(client, writer, team_map, details, flavor_index):
+    if team_map:
+        update_summary_tab(client, team_map, details, writer, index=flavor_index)
+
+EXPORT_FILES = ["hardware_counts.csv", "team_scores.csv", "player_scores.csv", "country_blog_data.csv"]
+
+def build_pipeline():
+    """
+    main()'s stages. Resources (never hashed): client, writer, offline.
+    The scrapes and the stages that read a tab always run; the rest are
+    skipped when what they read is unchanged since the last run.
+    """
+    from pipeline import Pipeline, Stage
+    return Pipeline([
+        Stage('details', fetch_details, ['offline'], ['details'], cache=False),
+        Stage('counts', fetch_counts, ['offline'], ['counts', 'counts_valid'], cache=False),
+        Stage('multipliers', fetch_multipliers, ['offline'], ['multipliers'], cache=False),
+        # Cleanup Garbage Rows (Automated Maintenance); returns the Results tab as it will be
+        Stage('cleanup', cleanup_garbage_rows, ['client', 'writer'], ['results_snapshot'], cache=False, reuse=False),
+        # Every Flavor stage shares one local index, so the tab is probed once
+        Stage('flavor_probe', load_flavor_index, ['client'], ['flavor_index'], cache=False, reuse=False),
+        Stage('hardware', lambda details: aggregate_hardware_counts(details) if details else {},
+              ['details'], ['hw_counts']),
+        # Player standings (for `tracker.py score`); multipliers is read inside compute_player_scores
+        Stage('scores', lambda hw_counts, counts, counts_valid, multipliers:
+              compute_player_scores(hw_counts, counts) if hw_counts and counts_valid else [],
+              ['hw_counts', 'counts', 'counts_valid', 'multipliers'], ['player_scores']),
+        # Local CSVs; multipliers is read inside, listed so a new one reruns the exports
+        Stage('exports', lambda hw_counts, counts, counts_valid, multipliers: run_exports(hw_counts, counts, counts_valid),
+              ['hw_counts', 'counts', 'counts_valid', 'multipliers'], files=EXPORT_FILES),
+        # Every run is recorded in the history, changed or not. Upstream of a
+        # selection (e.g. sync-sheets) the stored dates stand in for a new snapshot.
+        Stage('snapshot', lambda details, counts, counts_valid, hw_counts, multipliers:
+              store_snapshot(details, counts if counts_valid else {}, hw_counts),
+              ['details', 'counts', 'counts_valid', 'hw_counts', 'multipliers'], ['first_seen'], cache=False,
+              restore=load_first_seen),
+        Stage('results', update_results_stage, ['client', 'writer', 'counts', 'counts_valid', 'results_snapshot']),
+        # Reads the Results and Draft tabs, so it always runs
+        Stage('draft', draft_totals_stage, ['client', 'writer'], ['team_map'], after=['results'], cache=False),
+        Stage('flavor_append', flavor_append_stage,
+              ['client', 'writer', 'details', 'team_map', 'flavor_index', 'first_seen']),
+        Stage('flavor_dates', flavor_dates_stage, ['client', 'writer', 'first_seen', 'flavor_index'],
+              after=['flavor_append']),
+        Stage('flavor_repair', flavor_repair_stage, ['client', 'writer', 'team_map', 'flavor_index'],
+              after=['flavor_dates']),
+        # Summary tables for the sheet's charts, from the (now current) index
+        Stage('summary', summary_stage, ['client', 'writer', 'team_map', 'details', 'flavor_index'],
+              after=['flavor_repair']),
+    ])
+
+# Local state a dry run copies to a scratch directory (see sheet_plan.py)
+DRY_RUN_FILES = ['scraped_details.json', 'scraped_medals.json', 'multipliers.json', 'state']
+
+def dry_run_main(client, offline=False, start=None, only=None, plan_path=None):
+    """
+    Runs the stages against a copy of the sheet, in a scratch copy of the
+    local state, and prints what the run would change. Nothing is written to
+    the sheet or to the files here (except the plan at plan_path).
+    """
+    import pipeline
+    import sheet_plan
+    if client is not None:
+        client = sheet_plan.snapshot_client(client, SHEET_KEY)
+        tabs_before = {ws.title for ws in client.spreadsheets[SHEET_KEY]._worksheets}
+    plan_path = os.path.abspath(plan_path) if plan_path else None
+    writer = sheet_plan.PlanningScheduler(label=pipeline.current_stage)
+    with sheet_plan.scratch_copy(DRY_RUN_FILES):
+        # The cache is ignored: a skipped stage would hide its changes from the plan
+        report = build_pipeline().run({'client': client, 'writer': writer, 'offline': offline},
+                                      start=start, only=only, use_cache=False, workers=PIPELINE_WORKERS)
+        writer.flush()
+    if client is not None:
+        writer.note_new_tabs(client, SHEET_KEY, tabs_before)
+    print(writer.plan.text())
+    if plan_path:
+        writer.plan.save(plan_path)
+        print(f"Saved the change plan to {plan_path}")
+    report['plan'] = writer.plan.to_json()
+    return report
+
+def main(client=None, offline=False, start=None, only=None, use_cache=True, force=True, dry_run=False,
+         plan_path=None):
+    """
+    client: an authorized gspread client. Defaults to the service account;
+            pass a fake_sheets.FakeClient to run without Google credentials.
+    offline: reuse the last scraped JSON files instead of fetching Wikipedia.
+    start / only: run from one stage on / just these stages (see pipeline.py).
+    use_cache: False runs every stage even if its inputs are unchanged.
+    force: False lets the selected stages be skipped too when unchanged.
+    dry_run: send no writes; print the change plan the run would apply
+             (and save it as JSON to plan_path). See sheet_plan.py.
+    Returns the pipeline report (which stages ran, were skipped or reused,
+    plus the 'plan' of a dry run).
+
+    The stages and the values they pass are declared in build_pipeline():
+        details, counts, multipliers, cleanup, flavor_probe: no deps
+        hardware <- details
+        scores, exports, snapshot <- details, counts, hardware, multipliers
+        results            <- cleanup, counts
+        draft              <- results (writes flushed)
+        flavor_append      <- draft, details, flavor_probe, snapshot
+        flavor_dates -> flavor_repair -> summary (one after another)
+    Independent stages run on a thread pool, so a run takes about as long as
+    its slowest chain, and a stage whose inputs are unchanged since the last
+    run is skipped.
+    """
+    try:
+        pipeline = build_pipeline()
+        # Offline runs of local stages only (e.g. --offline --only exports) never touch Google
+        if client is None and 'client' in pipeline.resources_needed(start, only):
+            client = get_google_sheet_client()
+        if dry_run:
+            return dry_run_main(client, offline, start, only, plan_path)
+        from pipeline import current_stage
+        # Every stage queues its writes here; they go out as spreadsheet batchUpdates.
+        # A stage is only cached as done once its writes have been sent.
+        writer = WriteScheduler(SHEETS_REQUESTS_PER_MINUTE, label=current_stage)
+        report = pipeline.run({'client': client, 'writer': writer, 'offline': offline},
+                                      start=start, only=only, use_cache=use_cache, workers=PIPELINE_WORKERS,
+                                      force=force, writes=writer)
+        writer.flush()
+        print(f"Sheets writes: {writer.api_calls} batchUpdate call(s), {writer.retries} retries.")
+        return report
 
-        # 3. Update Draft Totals & Labels
-        # Returns mapping needed for Flavor tab
-        team_map = calculate_draft_totals(client)
-        
-        # 4. Update Flavor Tab
-        if team_map and details:
-             update_flavor_tab(client, details, team_map)
-            
-        # 5. Retroactive Repair (Run anyway to fix existing rows if map changed)
-        if team_map:
-             repair_flavor_teams(client, team_map)
-             
     except Exception as e:
         print(f"Critical Error: {e}")
         raise
 
-if __name__ == "__main__":
-    main()
+def cli(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Update the Olympics medal tracker.")
+    parser.add_argument('--offline', action='store_true', help="Reuse scraped_*.json instead of fetching Wikipedia")
+    selector = parser.add_mutually_exclusive_group()
+    selector.add_argument('--from', dest='start', metavar='STAGE', help="Run this stage and everything after it")
+    selector.add_argument('--only', metavar='STAGE[,STAGE]', help="Run just these stages")
+    parser.add_argument('--no-cache', action='store_true', help="Run every stage even if its inputs are unchanged")
+    parser.add_argument('--list', action='store_true', help="List the stages in run order and exit")
+    parser.add_argument('--dry-run', action='store_true', help="Print the changes to the sheet without writing them")
+    parser.add_argument('--plan-json', metavar='PATH', help="With --dry-run, also save the change plan as JSON")
+    args = parser.parse_args(argv)
+    if args.plan_json and not args.dry_run:
+        parser.error("--plan-json needs --dry-run")
+    if args.list:
+        pipeline = build_pipeline()
+        for name in pipeline.order:
+            deps = sorted(pipeline.deps(name))
+            print(f"{name:<15} <- {', '.join(deps)}" if deps else name)
+        return
+    only = [name.strip() for name in args.only.split(',') if name.strip()] if args.only else None
+    main(offline=args.offline, start=args.start, only=only, use_cache=not args.no_cache, dry_run=args.dry_run,
+         plan_path=args.plan_json)
 
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,140 @@
+"""
+When did each medal first show up? Attribution by diffing stored snapshots.
+
+update_flavor_tab used to stamp new rows with "today in CST", so medals found
+after a missed run, and every backfill, landed on the wrong day. Instead we
+walk the stored details snapshots (snapshot_store) in run order and record
+the first run time each medal appeared in. Medals are keyed by a short hash
+of their Event_Medal_Athlete signature.
+
+The result lives in state/medal_first_seen.json together with the last run
+already processed, so each run only diffs the snapshots added since, and the
+whole history is processed once: linear in the number of snapshots.
+Other sources (the revision bisector) can add earlier times with
+record(); a time is only ever moved earlier.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from flavor_index import medal_signature
+
+FIRST_SEEN_PATH = os.path.join('state', 'medal_first_seen.json')
+# Flavor dates are in CST like the rest of the league sheet (UTC-6, no DST handling)
+LOCAL_UTC_OFFSET = timedelta(hours=-6)
+
+
+def record_key(event, medal, athlete):
+    return hashlib.sha1(medal_signature(event, medal, athlete).encode('utf-8')).hexdigest()[:16]
+
+
+def local_date(when):
+    """CST calendar date (YYYY-MM-DD) of an aware datetime."""
+    return (when.astimezone(timezone.utc) + LOCAL_UTC_OFFSET).strftime("%Y-%m-%d")
+
+
+def diff_keys(previous, current):
+    """(added, removed) record keys between two consecutive snapshots."""
+    return current - previous, previous - current
+
+
+class FirstSeen:
+    """{record key: first time seen} plus how far through the snapshots we are."""
+
+    def __init__(self, path=FIRST_SEEN_PATH):
+        self.path = path
+        self.times = {}
+        self.last_run_time = None
+        self.last_keys = set()  # Keys of the last processed snapshot, to diff the next one against
+
+    @classmethod
+    def load(cls, path=FIRST_SEEN_PATH):
+        first_seen = cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return first_seen
+        except Exception as e:
+            print(f"Warning: Could not read {path} ({e}). Rebuilding from the snapshots.")
+            return first_seen
+        first_seen.times = {k: datetime.fromisoformat(v) for k, v in saved.get('times', {}).items()}
+        if saved.get('last_run_time'):
+            first_seen.last_run_time = datetime.fromisoformat(saved['last_run_time'])
+        first_seen.last_keys = set(saved.get('last_keys', []))
+        return first_seen
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'last_run_time': self.last_run_time.isoformat() if self.last_run_time else None,
+                'last_keys': sorted(self.last_keys),
+                'times': {k: v.isoformat() for k, v in sorted(self.times.items())},
+            }, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def fingerprint(self):
+        """What the pipeline cache hashes: the dates (not how far through the snapshots we are)."""
+        return {key: when.isoformat() for key, when in self.times.items()}
+
+    def record(self, key, when):
+        """Notes that a medal existed at `when`. Only ever moves its time earlier."""
+        if key not in self.times or when < self.times[key]:
+            self.times[key] = when
+            return True
+        return False
+
+    def first_seen(self, event, medal, athlete):
+        return self.times.get(record_key(event, medal, athlete))
+
+    def award_date(self, event, medal, athlete):
+        """CST date the medal first appeared, or None if we never saw it."""
+        when = self.first_seen(event, medal, athlete)
+        return local_date(when) if when else None
+
+    def apply_snapshots(self, snapshots):
+        """
+        snapshots: [(run_time, set of record keys)] in run order. Each one is
+        diffed against the one before. Returns the number of newly seen medals.
+        """
+        added_total = 0
+        for run_time, keys in snapshots:
+            added, removed = diff_keys(self.last_keys, keys)
+            for key in added:
+                added_total += self.record(key, run_time)
+            if removed:
+                print(f"{len(removed)} medals disappeared in the {run_time.isoformat()} snapshot.")
+            self.last_keys = keys
+            self.last_run_time = run_time
+        return added_total
+
+
+def update_first_seen(root=None, path=FIRST_SEEN_PATH):
+    """Diffs the details snapshots stored since the last call. Returns the FirstSeen."""
+    import snapshot_store
+    root = root or snapshot_store.SNAPSHOT_ROOT
+    first_seen = FirstSeen.load(path)
+
+    runs = snapshot_store.read_table('runs', root=root, columns=['run_id', 'run_time']).to_pylist()
+    new_runs = sorted((r for r in runs if first_seen.last_run_time is None or r['run_time'] > first_seen.last_run_time),
+                      key=lambda r: r['run_time'])
+    if not new_runs:
+        return first_seen
+
+    dates = {r['run_time'].astimezone(timezone.utc).strftime('%Y-%m-%d') for r in new_runs}
+    rows = snapshot_store.read_table('details', root=root, run_ids=[r['run_id'] for r in new_runs], dates=dates,
+                                     columns=['run_id', 'event', 'medal', 'athlete']).to_pylist()
+    keys_by_run = {r['run_id']: set() for r in new_runs}
+    for row in rows:
+        keys_by_run[row['run_id']].add(record_key(row['event'], row['medal'], row['athlete']))
+
+    # A run without a details file (failed scrape) says nothing about what exists
+    snapshots = [(r['run_time'], keys_by_run[r['run_id']]) for r in new_runs if keys_by_run[r['run_id']]]
+    added = first_seen.apply_snapshots(snapshots)
+    first_seen.last_run_time = new_runs[-1]['run_time']
+    print(f"Diffed {len(new_runs)} new snapshots: {added} medals seen for the first time.")
+    first_seen.save()
+    return first_seen
@@ -2,20 +2,31 @@ import csv
 import json
 import os
 import math
-import urllib.request
+import sys
 from bs4 import BeautifulSoup
 import re
 import os
 import math
 
+# Shared modules (games config, HTTP pool, country registry, report templates) live at the repo root
+PARALYMPICS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(PARALYMPICS_DIR))
+import http_client
+import reports
+from countries import CountryRegistry, weighted_medals
+from games import GAMES
+from participants import dynamic_multipliers, get_participants
+
+# Outputs are relative to this folder, not the working directory, so games.py
+# can run this next to the Olympics pipeline in one process
+OUTPUT_DIR = os.path.join(PARALYMPICS_DIR, 'output')
+DATA_DIR = os.path.join(PARALYMPICS_DIR, 'data')
+# Scrape caches shared with the Olympics pipeline
+STATE_DIR = os.path.join(os.path.dirname(PARALYMPICS_DIR), 'state')
+
 # --- Configuration & Mappings ---
 
-DRAFTED_TEAMS = {
-    "Maya": ["Germany", "Austria", "France", "Switzerland", "Great Britain", "Estonia", "Greece", "Ukraine"],
-    "Ross": ["Norway", "Sweden", "Japan", "China", "South Korea", "Czech Republic", "Spain", "Brazil"],
-    "Mom": ["Canada", "USA", "Italy", "Australia", "Finland", "AIN", "Denmark", "Kazakhstan"],
-    "Drew": ["Netherlands", "Poland", "New Zealand", "Slovenia", "Belgium", "Croatia", "Slovakia", "Latvia"]
-}
+DRAFTED_TEAMS = GAMES['paralympics']['draft']
 
 COUNTRY_NAME_MAP = {
     "United States": "USA",
@@ -30,23 +41,22 @@ COUNTRY_NAME_MAP = {
     "PR China": "China"
 }
 
-# Build a normalized lookup map for canonical country names
-NORMALIZED_COUNTRY_MAP = {}
-for raw_name, canonical in COUNTRY_NAME_MAP.items():
-    NORMALIZED_COUNTRY_MAP[raw_name.lower().strip()] = canonical.lower().strip()
+MEDAL_STAND_DEFINITIONS = {
+    "Total Medals": "Count of medal events won (gold + silver + bronze)",
+    "Weighted Medals": "Gold × 3 + Silver × 2 + Bronze × 1",
+    "Raw Hardware": "Physical medals around necks (team events count all members)",
+    "Weighted Hardware": "Gold hardware × 3 + Silver hardware × 2 + Bronze hardware × 1",
+    "Multiplied Medals": "Weighted Medals × Dynamic Multiplier",
+    "Multiplied Raw Hardware": "Raw Hardware × Dynamic Multiplier",
+    "Multiplied Weighted Hardware": "Weighted Hardware × Dynamic Multiplier",
+}
+
+# Canonical names: shared prefix rules plus this Games' aliases
+COUNTRIES = CountryRegistry(COUNTRY_NAME_MAP)
 
 def normalize_country_name(name):
     """Normalize for fuzzy matching and apply canonical mappings."""
-    if not name: return ""
-    name = name.lower().strip()
-    for prefix in ["the ", "republic of ", "people's republic of "]:
-        if name.startswith(prefix):
-            name = name[len(prefix):]
-    name = name.strip()
-    # Apply canonical mapping if available
-    if name in NORMALIZED_COUNTRY_MAP:
-        return NORMALIZED_COUNTRY_MAP[name]
-    return name
+    return COUNTRIES.normalize(name)
 
 # --- Core Logic ---
 
@@ -130,20 +140,14 @@ def scrape_event_results():
                 return first_line
         return None
 
-    # List of sport pages to scrape for event results
-    sport_configs = [
-        ('https://en.wikipedia.org/wiki/Alpine_skiing_at_the_2026_Winter_Paralympics', 1),
-        ('https://en.wikipedia.org/wiki/Biathlon_at_the_2026_Winter_Paralympics', 1),
-        ('https://en.wikipedia.org/wiki/Cross-country_skiing_at_the_2026_Winter_Paralympics', 1),  # Relays handled specially
-        ('https://en.wikipedia.org/wiki/Para_ice_hockey_at_the_2026_Winter_Paralympics', 17),
-        ('https://en.wikipedia.org/wiki/Para_snowboard_at_the_2026_Winter_Paralympics', 1),
-        ('https://en.wikipedia.org/wiki/Wheelchair_curling_at_the_2026_Winter_Paralympics', 5),  # Team events
-    ]
+    # Sport pages to scrape for event results, with default multipliers (games.py)
+    sport_configs = GAMES['paralympics']['sport_pages']
 
     for sport_url, default_multiplier in sport_configs:
         try:
-            req = urllib.request.Request(sport_url, headers={'User-Agent': 'Mozilla/5.0'})
-            html = urllib.request.urlopen(req).read()
+            response = http_client.get(sport_url)
+            response.raise_for_status()
+            html = response.content
             soup = BeautifulSoup(html, 'html.parser')
 
             # Find tables with "Event | Gold | Silver | Bronze" structure
@@ -212,41 +216,13 @@ def scrape_event_results():
 
 def scrape_wikipedia_data():
     """
-    Scrapes the 2026 Winter Paralympics page (or 2022 as fallback if 2026 is empty)
-    to get participant counts and the medal table.
-    For now, since 2026 hasn't started, we'll build the robust parser.
+    Participant counts (cached, see participants.py), event hardware and the
+    medal table for the 2026 Winter Paralympics.
     """
-    url = 'https://en.wikipedia.org/wiki/2026_Winter_Paralympics'
-    req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-    try:
-        html = urllib.request.urlopen(req).read()
-    except Exception as e:
-        print(f"Failed to fetch {url}: {e}")
-        return {}, [], {}
-
-    soup = BeautifulSoup(html, 'html.parser')
+    # Delegation sizes are cached for weeks (participants.py), so this is usually just a file read
     participants = {}
-
-    # Extract Participants
-    span = soup.find(id='Participating_National_Paralympic_Committees')
-    if not span:
-        span = soup.find(id='Participating_Nations')
-
-    if span:
-        # Find the list of countries following this span
-        for node in span.parent.find_all_next(['ul', 'div']):
-            found_any = False
-            for li in node.find_all('li'):
-                text = li.text.strip().replace('\xa0', ' ')
-                # Match Country (Number)
-                match = re.search(r'([A-Za-z\s\w]+)(?:\[.*?\])?\s*\((\d+)\)', text)
-                if match:
-                    country = normalize_country_name(match.group(1).strip())
-                    count = int(match.group(2))
-                    participants[country] = count
-                    found_any = True
-            if found_any:
-                break
+    for country, count in get_participants('paralympics', directory=STATE_DIR).items():
+        participants[normalize_country_name(country)] = count
 
     # Scrape event-level results for hardware calculation
     print("Scraping event results for hardware calculation...")
@@ -256,10 +232,11 @@ def scrape_wikipedia_data():
     medals = []
 
     # Fetch dedicated medal table page
-    medal_url = 'https://en.wikipedia.org/wiki/2026_Winter_Paralympics_medal_table'
-    medal_req = urllib.request.Request(medal_url, headers={'User-Agent': 'Mozilla/5.0'})
+    medal_url = GAMES['paralympics']['urls']['counts']
     try:
-        medal_html = urllib.request.urlopen(medal_req).read()
+        medal_response = http_client.get(medal_url)
+        medal_response.raise_for_status()
+        medal_html = medal_response.content
         medal_soup = BeautifulSoup(medal_html, 'html.parser')
 
         # Look for the main medal table by checking headers
@@ -328,38 +305,141 @@ def scrape_wikipedia_data():
 
     return participants, medals, event_hardware
 
-def load_participant_counts(filepath="data/participants.json"):
-    """
-    Loads raw participant counts for each country.
-    Returns: dict mapping normalized country names to integer participant counts.
-    """
-    try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"Warning: {filepath} not found. Returning empty participant data.")
-        return {}
-
 def calculate_dynamic_multipliers(participants_data):
     """
     Finds the maximum participant count across all nations, then calculates
     the multiplier for each country: (Max Participants / Country Participants).
     """
-    if not participants_data:
-        return {}
-        
-    max_participants = max(participants_data.values())
-    print(f"Max Delegation Size found: {max_participants}")
-    
-    multipliers = {}
-    for country, count in participants_data.items():
-        if count > 0:
-            multipliers[country] = max_participants / float(count)
-        else:
-            multipliers[country] = 1.0 # Fallback
-            
+    multipliers, max_participants = dynamic_multipliers(participants_data)
+    if max_participants:
+        print(f"Max Delegation Size found: {max_participants}")
     return multipliers, max_participants
 
+def country_pretty_names():
+    """{normalized name: pretty name}. Like the old per-country scan, the last matching map entry wins."""
+    pretty_names = {}
+    for pretty, maps_to in COUNTRY_NAME_MAP.items():
+        pretty_names[normalize_country_name(pretty)] = pretty
+        pretty_names[normalize_country_name(maps_to)] = pretty
+    return pretty_names
+
+def build_country_outputs(participants, medals, multipliers, max_participants):
+    """
+    One scored row per participating, medalling or drafted country, sorted by
+    Multiplied Weighted Hardware. participants and multipliers are keyed by
+    normalized name; medals is the consolidated list (one row per normalized
+    name). Every lookup is a dict join on the normalized name.
+    """
+    medals_by_country = {}
+    for m in medals:
+        medals_by_country.setdefault(m['Country'], m)
+    pretty_names = country_pretty_names()
+
+    # Pre-populate all drafted and participating countries into our main table
+    all_countries_set = set(participants.keys()) | set(medals_by_country)
+    for player, teams in DRAFTED_TEAMS.items():
+        for team in teams:
+            all_countries_set.add(normalize_country_name(team))
+
+    country_outputs = []
+    for c_norm in all_countries_set:
+        # Reverse mapping for pretty print
+        c_raw = pretty_names.get(c_norm, c_norm.title())
+
+        # Get raw stats
+        p_count = participants.get(c_norm, 1) # default to 1 if unknown to avoid div zero
+        mult = multipliers.get(c_norm, float(max_participants) if max_participants > 0 else 1.0)
+
+        # Find medaling data
+        g = s = b = total_hw = gold_hw = silver_hw = bronze_hw = 0
+        m = medals_by_country.get(c_norm)
+        if m:
+            c_raw = m['CountryRaw'] # Upgrade to exact Wikipedia casing
+            g = m['Gold']
+            s = m['Silver']
+            b = m['Bronze']
+            gold_hw = m.get('GoldHW', g)
+            silver_hw = m.get('SilverHW', s)
+            bronze_hw = m.get('BronzeHW', b)
+            total_hw = m['Hardware']
+
+        # Calculate medal counts
+        total_medals = g + s + b
+        weighted_m = weighted_medals(g, s, b)
+
+        # Calculate hardware counts (raw = physical medals, weighted = gold*3 + silver*2 + bronze*1)
+        raw_hardware = total_hw  # gold_hw + silver_hw + bronze_hw
+        weighted_hardware = weighted_medals(gold_hw, silver_hw, bronze_hw)
+
+        # Calculate multiplied values
+        mult_medals = round(weighted_m * mult, 2)
+        mult_raw_hw = round(raw_hardware * mult, 2)
+        mult_weighted_hw = round(weighted_hardware * mult, 2)
+
+        country_outputs.append({
+            "Country": c_raw,
+            "NormName": c_norm,
+            "Participants": p_count,
+            "Max Delegation": max_participants,
+            "Dynamic Multiplier": round(mult, 4),
+            "Gold": g,
+            "Silver": s,
+            "Bronze": b,
+            "Total Medals": total_medals,
+            "Weighted Medals": weighted_m,
+            "Raw Hardware": raw_hardware,
+            "Weighted Hardware": weighted_hardware,
+            "Multiplied Medals": mult_medals,
+            "Multiplied Raw Hardware": mult_raw_hw,
+            "Multiplied Weighted Hardware": mult_weighted_hw
+        })
+
+    # Sort by Multiplied Weighted Hardware
+    country_outputs.sort(key=lambda x: x['Multiplied Weighted Hardware'], reverse=True)
+    return country_outputs
+
+def build_player_scores(country_outputs):
+    """Each drafter's totals over their countries. Rows are found through a normalized-name index."""
+    # First row (in score order) matching a name wins, as in the old scan
+    rows_by_name = {}
+    for row in country_outputs:
+        rows_by_name.setdefault(row['NormName'], row)
+        mapped = normalize_country_name(COUNTRY_NAME_MAP.get(row['Country'], ""))
+        if mapped:
+            rows_by_name.setdefault(mapped, row)
+
+    player_scores = []
+    for player, teams in DRAFTED_TEAMS.items():
+        p_mult_medals = 0
+        p_mult_raw_hw = 0
+        p_mult_weighted_hw = 0
+        p_total_medals = 0
+        p_weighted_medals = 0
+        p_raw_hw = 0
+        p_weighted_hw = 0
+        for team in teams:
+            row = rows_by_name.get(normalize_country_name(team))
+            if row:
+                p_mult_medals += row['Multiplied Medals']
+                p_mult_raw_hw += row['Multiplied Raw Hardware']
+                p_mult_weighted_hw += row['Multiplied Weighted Hardware']
+                p_total_medals += row['Total Medals']
+                p_weighted_medals += row['Weighted Medals']
+                p_raw_hw += row['Raw Hardware']
+                p_weighted_hw += row['Weighted Hardware']
+
+        player_scores.append({
+            "Player": player,
+            "Total Medals": p_total_medals,
+            "Weighted Medals": p_weighted_medals,
+            "Raw Hardware": p_raw_hw,
+            "Weighted Hardware": p_weighted_hw,
+            "Multiplied Medals": round(p_mult_medals, 2),
+            "Multiplied Raw Hardware": round(p_mult_raw_hw, 2),
+            "Multiplied Weighted Hardware": round(p_mult_weighted_hw, 2)
+        })
+    return player_scores
+
 def generate_reports():
     """
     Main execution pipeline.
@@ -368,10 +448,8 @@ def generate_reports():
     print("Scraping Wikipedia for participants and medals...")
     participants, medals, event_hardware = scrape_wikipedia_data()
 
-    # Optional load from local JSON if scraping fails
     if not participants:
-        print("Using local participants data fallback...")
-        participants = load_participant_counts()
+        print("Warning: No participant counts (page and cache both unavailable); every country gets the default multiplier.")
 
     # Consolidate participants with same normalized names
     consolidated_participants = {}
@@ -413,77 +491,12 @@ def generate_reports():
     multipliers, max_participants = calculate_dynamic_multipliers(participants)
     
     # 3. Aggregate Player Scores and Generate Output Data
-    country_outputs = []
-    
-    # Pre-populate all drafted and participating countries into our main table
-    all_countries_set = set(participants.keys())
-    for medals_row in medals:
-        all_countries_set.add(medals_row['Country'])
-    for player, teams in DRAFTED_TEAMS.items():
-        for team in teams:
-            all_countries_set.add(normalize_country_name(team))
-            
-    for c_norm in all_countries_set:
-        c_raw = c_norm.title()
-        
-        # Look for reverse mapping for pretty print
-        for pretty, maps_to in COUNTRY_NAME_MAP.items():
-            if normalize_country_name(pretty) == c_norm or normalize_country_name(maps_to) == c_norm:
-                c_raw = pretty
-                
-        # Get raw stats
-        p_count = participants.get(c_norm, 1) # default to 1 if unknown to avoid div zero
-        mult = multipliers.get(c_norm, float(max_participants) if max_participants > 0 else 1.0)
-        
-        # Find medaling data
-        g = s = b = total_hw = gold_hw = silver_hw = bronze_hw = 0
-        for m in medals:
-            if m['Country'] == c_norm:
-                c_raw = m['CountryRaw'] # Upgrade to exact Wikipedia casing
-                g = m['Gold']
-                s = m['Silver']
-                b = m['Bronze']
-                gold_hw = m.get('GoldHW', g)
-                silver_hw = m.get('SilverHW', s)
-                bronze_hw = m.get('BronzeHW', b)
-                total_hw = m['Hardware']
-                break
-
-        # Calculate medal counts
-        total_medals = g + s + b
-        weighted_medals = (g * 3) + (s * 2) + (b * 1)
-
-        # Calculate hardware counts (raw = physical medals, weighted = gold*3 + silver*2 + bronze*1)
-        raw_hardware = total_hw  # gold_hw + silver_hw + bronze_hw
-        weighted_hardware = (gold_hw * 3) + (silver_hw * 2) + (bronze_hw * 1)
-
-        # Calculate multiplied values
-        mult_medals = round(weighted_medals * mult, 2)
-        mult_raw_hw = round(raw_hardware * mult, 2)
-        mult_weighted_hw = round(weighted_hardware * mult, 2)
-
-        country_outputs.append({
-            "Country": c_raw,
-            "NormName": c_norm,
-            "Participants": p_count,
-            "Max Delegation": max_participants,
-            "Dynamic Multiplier": round(mult, 4),
-            "Gold": g,
-            "Silver": s,
-            "Bronze": b,
-            "Total Medals": total_medals,
-            "Weighted Medals": weighted_medals,
-            "Raw Hardware": raw_hardware,
-            "Weighted Hardware": weighted_hardware,
-            "Multiplied Medals": mult_medals,
-            "Multiplied Raw Hardware": mult_raw_hw,
-            "Multiplied Weighted Hardware": mult_weighted_hw
-        })
+    country_outputs = build_country_outputs(participants, medals, multipliers, max_participants)
 
     # 4. Export CSVs
     print("Exporting Country Scores...")
-    os.makedirs("output", exist_ok=True)
-    with open("output/paralympic_country_scores.csv", 'w', newline='', encoding='utf-8') as f:
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with open(os.path.join(OUTPUT_DIR, "paralympic_country_scores.csv"), 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=[
             "Country", "Participants", "Max Delegation", "Dynamic Multiplier",
             "Gold", "Silver", "Bronze", "Total Medals", "Weighted Medals",
@@ -492,47 +505,14 @@ def generate_reports():
         ])
         writer.writeheader()
 
-        # Sort by Multiplied Weighted Hardware
-        country_outputs.sort(key=lambda x: x['Multiplied Weighted Hardware'], reverse=True)
         for row in country_outputs:
             out_row = {k: v for k, v in row.items() if k != 'NormName'}
             writer.writerow(out_row)
             
     print("Exporting Player Scores...")
-    player_scores = []
-    for player, teams in DRAFTED_TEAMS.items():
-        p_mult_medals = 0
-        p_mult_raw_hw = 0
-        p_mult_weighted_hw = 0
-        p_total_medals = 0
-        p_weighted_medals = 0
-        p_raw_hw = 0
-        p_weighted_hw = 0
-        for team in teams:
-            c_norm = normalize_country_name(team)
-            for row in country_outputs:
-                if row['NormName'] == c_norm or normalize_country_name(COUNTRY_NAME_MAP.get(row['Country'], "")) == c_norm:
-                    p_mult_medals += row['Multiplied Medals']
-                    p_mult_raw_hw += row['Multiplied Raw Hardware']
-                    p_mult_weighted_hw += row['Multiplied Weighted Hardware']
-                    p_total_medals += row['Total Medals']
-                    p_weighted_medals += row['Weighted Medals']
-                    p_raw_hw += row['Raw Hardware']
-                    p_weighted_hw += row['Weighted Hardware']
-                    break
+    player_scores = build_player_scores(country_outputs)
 
-        player_scores.append({
-            "Player": player,
-            "Total Medals": p_total_medals,
-            "Weighted Medals": p_weighted_medals,
-            "Raw Hardware": p_raw_hw,
-            "Weighted Hardware": p_weighted_hw,
-            "Multiplied Medals": round(p_mult_medals, 2),
-            "Multiplied Raw Hardware": round(p_mult_raw_hw, 2),
-            "Multiplied Weighted Hardware": round(p_mult_weighted_hw, 2)
-        })
-
-    with open("output/paralympic_player_scores.csv", 'w', newline='', encoding='utf-8') as f:
+    with open(os.path.join(OUTPUT_DIR, "paralympic_player_scores.csv"), 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=[
             "Player", "Total Medals", "Weighted Medals", "Raw Hardware", "Weighted Hardware",
             "Multiplied Medals", "Multiplied Raw Hardware", "Multiplied Weighted Hardware"
@@ -589,13 +569,27 @@ def generate_reports():
             "Bronze Score": third_score
         })
 
-    with open("output/paralympic_medal_stand.csv", 'w', newline='', encoding='utf-8') as f:
+    with open(os.path.join(OUTPUT_DIR, "paralympic_medal_stand.csv"), 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=[
             "Category", "Gold (1st)", "Gold Score", "Silver (2nd)", "Silver Score", "Bronze (3rd)", "Bronze Score"
         ])
         writer.writeheader()
         writer.writerows(medal_stand_rows)
 
+    # One medal stand model, rendered as Markdown, HTML and JSON
+    podiums = {p['Player']: {"Player": p['Player'], "Golds": 0, "Silvers": 0, "Bronzes": 0} for p in player_scores}
+    for row in medal_stand_rows:
+        for column, tally in (("Gold (1st)", "Golds"), ("Silver (2nd)", "Silvers"), ("Bronze (3rd)", "Bronzes")):
+            for name in filter(None, row[column].split(", ")):
+                podiums[name][tally] += 1
+    podium_rows = sorted(podiums.values(), key=lambda p: (p['Golds'], p['Silvers'], p['Bronzes']), reverse=True)
+    definitions = [{"Metric": category, "Description": MEDAL_STAND_DEFINITIONS[category]}
+                   for category, _ in medal_stand_categories]
+    sections = [("categories", medal_stand_rows), ("players", podium_rows), ("definitions", definitions)]
+    for fmt in reports.FORMATS:
+        reports.write_report(reports.report_path(os.path.join(OUTPUT_DIR, "paralympic_medal_stand"), fmt), 'medal_stand', fmt,
+                             {'title': "Paralympic Player Medal Stand"}, sections)
+
     print("Successfully exported all Paralympics CSV reports.")
 
 if __name__ == '__main__':
@@ -0,0 +1,158 @@
+"""
+Delegation sizes for each Games, scraped once and cached, and the score
+multipliers derived from them.
+
+Rosters are fixed after the opening ceremony, so the "Participating National
+(Para)Olympic Committees" list on the Games page is fetched at most once per
+PARTICIPANTS_TTL and kept in state/participants_<games>.json. Runs in
+between skip the page fetch and parse entirely. If a refresh fails, the
+last cached list is used however old it is.
+
+Multipliers follow the league rule: largest delegation / this delegation.
+The Olympics used to keep them by hand in multipliers.json; main.py now
+regenerates that file from here (it stays the fallback when nothing has
+been scraped yet).
+
+    python participants.py olympics [--refresh] [--json]
+"""
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+PARTICIPANTS_DIR = 'state'
+PARTICIPANTS_TTL = timedelta(days=30)
+SECTION_IDS = (
+    'Participating_National_Olympic_Committees',
+    'Participating_National_Paralympic_Committees',
+    'Participating_Nations',
+)
+# "Norway (80)" with an optional footnote marker before the count
+ENTRY_RE = re.compile(r'([A-Za-z\s\w]+)(?:\[.*?\])?\s*\((\d+)\)')
+
+
+def cache_path(games, directory=PARTICIPANTS_DIR):
+    return os.path.join(directory, f"participants_{games}.json")
+
+
+def parse_participants(html):
+    """{country name as listed: athletes} from a Games page's participating-nations list."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    span = None
+    for section_id in SECTION_IDS:
+        span = soup.find(id=section_id)
+        if span:
+            break
+    participants = {}
+    if not span:
+        return participants
+
+    # The list is the first ul / div after the heading that has "Country (N)" entries
+    for node in span.parent.find_all_next(['ul', 'div']):
+        for li in node.find_all('li'):
+            match = ENTRY_RE.search(li.text.strip().replace('\xa0', ' '))
+            if match:
+                participants[match.group(1).strip()] = int(match.group(2))
+        if participants:
+            break
+    return participants
+
+
+def load_cached(games, directory=PARTICIPANTS_DIR):
+    try:
+        with open(cache_path(games, directory), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Could not read cached participants for {games} ({e}).")
+        return None
+
+
+def save_cached(games, entry, directory=PARTICIPANTS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = cache_path(games, directory)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def get_participants(games, ttl=PARTICIPANTS_TTL, refresh=False, directory=PARTICIPANTS_DIR, fetch=None, now=None,
+                     cached_only=False):
+    """
+    {country: athletes} for a Games key of games.GAMES, from the cache while
+    it is younger than ttl. cached_only: whatever is cached, never fetch.
+    fetch(url) -> html overrides the HTTP fetch (tests).
+    """
+    from games import GAMES
+    now = now or datetime.now(timezone.utc)
+    cached = load_cached(games, directory)
+    if cached_only:
+        return cached['participants'] if cached else {}
+    if cached and not refresh:
+        fetched_at = datetime.fromisoformat(cached['fetched_at'])
+        if now - fetched_at < ttl:
+            return cached['participants']
+
+    url = GAMES[games]['urls']['games']
+    try:
+        if fetch:
+            html = fetch(url)
+        else:
+            import http_client
+            response = http_client.get(url)
+            response.raise_for_status()
+            html = response.content
+        participants = parse_participants(html)
+    except Exception as e:
+        print(f"Failed to fetch participants from {url}: {e}")
+        participants = {}
+
+    if not participants:
+        if cached:
+            print(f"Using cached {games} participants from {cached['fetched_at']}.")
+            return cached['participants']
+        return {}
+
+    save_cached(games, {'url': url, 'fetched_at': now.isoformat(), 'participants': participants}, directory)
+    print(f"Cached {len(participants)} {games} delegations.")
+    return participants
+
+
+def dynamic_multipliers(participants):
+    """
+    ({country: multiplier}, largest delegation). A country's multiplier is
+    largest delegation / its delegation (1.0 for an empty delegation).
+    """
+    if not participants:
+        return {}, 0
+    max_participants = max(participants.values())
+    multipliers = {}
+    for country, count in participants.items():
+        multipliers[country] = max_participants / float(count) if count > 0 else 1.0
+    return multipliers, max_participants
+
+
+def main(argv=None):
+    from games import GAMES
+    parser = argparse.ArgumentParser(description="Show (and cache) a Games' delegation sizes and multipliers.")
+    parser.add_argument('games', choices=list(GAMES))
+    parser.add_argument('--refresh', action='store_true', help="Fetch the page even if the cache is fresh")
+    parser.add_argument('--json', action='store_true', help="Print JSON")
+    args = parser.parse_args(argv)
+
+    participants = get_participants(args.games, refresh=args.refresh)
+    multipliers, max_participants = dynamic_multipliers(participants)
+    if args.json:
+        print(json.dumps({'max_participants': max_participants, 'participants': participants,
+                          'multipliers': multipliers}, indent=1, sort_keys=True))
+        return
+    for country, count in sorted(participants.items(), key=lambda kv: -kv[1]):
+        print(f"{country:<40} {count:>4}  x{multipliers[country]:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Declarative stage runner for main.main.
+
+Each Stage names the values it reads (inputs) and produces (outputs). The
+runner orders stages by those edges, runs independent ones on a thread pool,
+and remembers, per stage, a hash of everything it read:
+
+- A stage whose input hash matches its last successful run is skipped and
+  its previous outputs are reused, so a run where one medal changed only
+  executes the stages downstream of that change.
+- Stages that read state the runner cannot see (a scrape, a sheet tab) are
+  declared cache=False and always run; what they return is what decides
+  whether the stages after them run.
+
+Inputs are hashed as JSON. Objects that are not JSON (the Flavor index,
+first-seen dates) hash their fingerprint() instead; an input with neither
+makes its stage run every time. Resources (the Sheets client, the write
+scheduler, flags) are passed to stages but never hashed.
+
+Selecting stages:
+    start='results'   run results and everything downstream of it
+    only=['exports']  run just those stages
+Selected stages ignore the cache (unless force=False). Stages upstream of
+the selection reuse their outputs from the last run where they may
+(reuse=True), else run.
+
+The hashes and reusable outputs are kept in state/pipeline_cache.json.
+A stage that queued Sheets writes is only recorded there once those writes
+have been sent (run(writes=...)): if the flush fails, the next run does the
+stage again instead of skipping it against a stale tab.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+PIPELINE_CACHE_PATH = os.path.join('state', 'pipeline_cache.json')
+
+_running = threading.local()
+
+
+def current_stage():
+    """Name of the stage running on this thread (None outside a stage)."""
+    return getattr(_running, 'stage', None)
+
+
+class Stage:
+    """
+    func(**inputs) returns the single output, a tuple for several outputs, or
+    nothing. after: stages that must finish first without passing a value.
+    files: outputs on disk; a missing file makes the stage run again.
+    restore: rebuilds the outputs without running the stage, for use upstream
+    of a selection when they cannot be saved as JSON.
+    version: bump to invalidate the cache when the stage's code changes.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), after=(), cache=True, reuse=True, files=(), restore=None,
+                 version=1):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.after = tuple(after)
+        self.cache = cache
+        self.reuse = reuse
+        self.files = tuple(files)
+        self.restore = restore
+        self.version = version
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def _fingerprint(value):
+    if hasattr(value, 'fingerprint'):
+        return value.fingerprint()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    raise TypeError(f"{type(value).__name__} is not hashable as JSON")
+
+
+def content_hash(value):
+    """sha256 of a value's JSON (fingerprint() for objects). None if it has neither."""
+    try:
+        text = json.dumps(value, sort_keys=True, separators=(',', ':'), default=_fingerprint)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _json_or_none(values):
+    """values if they survive a JSON round trip unchanged in meaning, else None."""
+    try:
+        json.dumps(values)
+    except (TypeError, ValueError):
+        return None
+    return values
+
+
+class StageCache:
+    """{stage: {'hash': input hash, 'outputs': {name: value} or absent}} from the last runs."""
+
+    def __init__(self, path=PIPELINE_CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        # Entries are also committed from a write flush, which can run on a stage's thread
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=PIPELINE_CACHE_PATH):
+        cache = cls(path)
+        if not path:
+            return cache
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cache.entries = json.load(f).get('stages', {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not read {path} ({e}). Running every stage.")
+        return cache
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            entries = dict(self.entries)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'stages': entries}, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def commit(self, name, entry):
+        """Records a stage's entry and saves the cache (an after_flush callback)."""
+        with self.lock:
+            self.entries[name] = entry
+        self.save()
+
+    def outputs(self, stage):
+        """The stage's saved outputs, or None if they were not (or could not be) saved."""
+        entry = self.entries.get(stage.name)
+        if not entry or 'outputs' not in entry:
+            return None
+        saved = entry['outputs']
+        if any(name not in saved for name in stage.outputs):
+            return None
+        return saved
+
+
+class Pipeline:
+    def __init__(self, stages):
+        self.stages = {}
+        self.producers = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage {stage.name!r}")
+            self.stages[stage.name] = stage
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f"{output!r} is produced by both {self.producers[output]!r} and {stage.name!r}")
+                self.producers[output] = stage.name
+        for stage in stages:
+            for name in stage.after:
+                if name not in self.stages:
+                    raise ValueError(f"{stage.name!r} runs after unknown stage {name!r}")
+        self.order = self._toposort()
+
+    def deps(self, name):
+        """Stages that must finish before this one."""
+        stage = self.stages[name]
+        deps = {self.producers[i] for i in stage.inputs if i in self.producers}
+        return deps | set(stage.after)
+
+    def _toposort(self):
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Stage cycle: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for dep in sorted(self.deps(name)):
+                visit(dep, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def upstream(self, names):
+        seen, todo = set(), list(names)
+        while todo:
+            for dep in self.deps(todo.pop()):
+                if dep not in seen:
+                    seen.add(dep)
+                    todo.append(dep)
+        return seen
+
+    def downstream(self, names):
+        seen = set(names)
+        for name in self.order:
+            if self.deps(name) & seen:
+                seen.add(name)
+        return seen
+
+    def select(self, start=None, only=None):
+        """(stages to run with the cache ignored, stages needed upstream of them)."""
+        unknown = [n for n in ([start] if start else []) + list(only or []) if n not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(unknown)}. Stages: {', '.join(self.order)}")
+        if only:
+            forced = set(only)
+        elif start:
+            forced = self.downstream([start])
+        else:
+            return set(), set(self.stages)
+        return forced, self.upstream(forced) - forced
+
+    def resources_needed(self, start=None, only=None):
+        """Names the selected stages (and those upstream of them) read that no stage produces."""
+        forced, needed = self.select(start, only)
+        return {i for name in forced | needed for i in self.stages[name].inputs if i not in self.producers}
+
+    def run(self, resources=None, start=None, only=None, use_cache=True, cache_path=PIPELINE_CACHE_PATH, workers=4,
+            force=True, writes=None):
+        """
+        Runs the selected stages. Returns {'values': {output: value},
+        'ran': [...], 'skipped': [...], 'reused': [...]} (stage names).
+
+        writes: the WriteScheduler the stages queue on, labelled with
+        current_stage. A stage with writes still queued when it finishes is
+        recorded in the cache by writes.after_flush, i.e. only once they
+        have been sent; until then it has no entry and the next run does it.
+        """
+        resources = resources or {}
+        forced, needed = self.select(start, only)
+        cache = StageCache.load(cache_path)
+        values, hashes = {}, {}
+        report = {'values': values, 'ran': [], 'skipped': [], 'reused': []}
+
+        # Upstream of a selection: take the last run's outputs where a stage allows it
+        todo = []
+        for name in self.order:
+            if name not in forced and name not in needed:
+                continue
+            stage = self.stages[name]
+            saved = None
+            if name not in forced and (start or only) and stage.reuse:
+                if stage.restore:
+                    restored = stage.restore()
+                    saved = dict(zip(stage.outputs, restored if len(stage.outputs) != 1 else (restored,)))
+                else:
+                    saved = cache.outputs(stage)
+            if saved is not None:
+                values.update({o: saved[o] for o in stage.outputs})
+                report['reused'].append(name)
+            else:
+                todo.append(name)
+        done = set(report['reused'])
+
+        def input_hash(stage):
+            parts = [stage.name, stage.version]
+            for name in stage.inputs:
+                if name in resources:
+                    continue
+                value = values.get(name)
+                # Fingerprinted objects can change in place between stages; plain data cannot
+                if name not in hashes or hasattr(value, 'fingerprint'):
+                    hashes[name] = content_hash(value)
+                if hashes[name] is None:
+                    return None
+                parts.append([name, hashes[name]])
+            return content_hash(parts)
+
+        def execute(stage, skip_ok):
+            key = input_hash(stage)
+            entry = cache.entries.get(stage.name, {})
+            if (skip_ok and key is not None and entry.get('hash') == key
+                    and all(os.path.exists(path) for path in stage.files)):
+                saved = cache.outputs(stage) if stage.outputs else {}
+                if saved is not None:
+                    return 'skipped', {o: saved[o] for o in stage.outputs}, key
+            kwargs = {}
+            for name in stage.inputs:
+                kwargs[name] = resources[name] if name in resources else values.get(name)
+            _running.stage = stage.name
+            try:
+                result = stage.func(**kwargs)
+            finally:
+                _running.stage = None
+            if len(stage.outputs) == 1:
+                result = (result,)
+            outputs = dict(zip(stage.outputs, result)) if stage.outputs else {}
+            return 'ran', outputs, key
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            while (todo and not errors) or running:
+                if not errors:
+                    for name in [n for n in todo if (self.deps(n) & (forced | needed)) <= done]:
+                        todo.remove(name)
+                        stage = self.stages[name]
+                        skip_ok = use_cache and stage.cache and not (force and name in forced)
+                        running[pool.submit(execute, stage, skip_ok)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    stage = self.stages[name]
+                    try:
+                        status, outputs, key = future.result()
+                    except Exception as e:
+                        print(f"Stage {name} failed: {e}")
+                        errors.append(e)
+                        continue
+                    values.update(outputs)
+                    report[status].append(name)
+                    done.add(name)
+                    if status == 'ran':
+                        entry = {'hash': key} if stage.cache and key is not None else {}
+                        saved = _json_or_none(outputs) if stage.reuse else None
+                        if saved is not None:
+                            entry['outputs'] = saved
+                        if writes is not None and writes.queued_by(name):
+                            with cache.lock:
+                                cache.entries.pop(name, None)
+                            writes.after_flush(functools.partial(cache.commit, name, entry))
+                        else:
+                            with cache.lock:
+                                cache.entries[name] = entry
+                        if stage.cache and key is None:
+                            print(f"Stage {name}: inputs not hashable, it will run every time.")
+
+        cache.save()
+        if errors:
+            raise errors[0]
+        if report['skipped']:
+            print(f"Stages unchanged since the last run (skipped): {', '.join(report['skipped'])}")
+        if report['reused']:
+            print(f"Stages reused from the last run: {', '.join(report['reused'])}")
+        return report
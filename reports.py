@@ -0,0 +1,226 @@
+"""
+Report templates: one report model, rendered to Markdown, HTML or JSON.
+
+A report is a context dict (title...) plus named sections, each a list of
+item dicts. The model is computed once (generate_summaries builds the country
+sections, paralympics/main.py the medal stand) and each format is just
+another set of templates over it, so adding a format never means another
+pass over the data.
+
+Templates are str.format strings, parsed once per process (compile_templates)
+and written straight to the output stream block by block:
+
+    header, then per section: <section>_start, <section> items (or
+    <section>_<item['template']> for variants) separated by <section>_sep,
+    <section>_end, then footer
+
+Missing blocks are skipped. Values are escaped per format (HTML-escaped,
+JSON-encoded, Markdown as is).
+"""
+import html
+import json
+import os
+from string import Formatter
+
+FORMATS = ('md', 'html', 'json')
+EXTENSIONS = {'md': '.md', 'html': '.html', 'json': '.json'}
+
+ENCODERS = {
+    'md': str,
+    'html': lambda value: html.escape(str(value)),
+    'json': lambda value: json.dumps(value, ensure_ascii=False),
+}
+
+_formatter = Formatter()
+
+
+class Template:
+    """A format string parsed once; render() writes it straight to a stream."""
+
+    def __init__(self, text, encode=str):
+        self.parts = list(_formatter.parse(text))
+        self.encode = encode
+
+    def render(self, out, context):
+        for literal, field, spec, conversion in self.parts:
+            if literal:
+                out.write(literal)
+            if field is not None:
+                value = _formatter.get_field(field, (), context)[0]
+                if conversion:
+                    value = _formatter.convert_field(value, conversion)
+                out.write(self.encode(format(value, spec) if spec else value))
+
+
+# --- Country summaries (generate_summaries.py) ---
+
+_SECTION_HEAD_MD = "## {display_name}{flag_suffix}\n\n"
+_SECTION_BODY_MD = (
+    "**{display_name}** sent a delegation of **{participants}** athletes to the winter games. "
+    "They {performance}, bringing home a haul of **{total_medals} medals** "
+    "({gold} 🥇, {silver} 🥈, {bronze} 🥉) which netted them a baseline weighted score of {weighted_medals} points.\n\n"
+)
+_SECTION_TAIL_MD = (
+    "After factoring in their custom draft handicap, they finished the games with a "
+    "Final **Multiplied Hardware** score of **{multiplied_hardware}** and a base **Multiplied Medals** score of **{multiplied_medals}**.\n\n"
+    "---\n\n"
+)
+_HARDWARE_MD = {
+    'large_team': ("They excelled in large team sports, significantly boosting their physical medal count to "
+                   "**{total_hardware} total hardware medals** placed around necks. "),
+    'small_team': ("Their success in small team sports and relays boosted their physical medal count to "
+                   "**{total_hardware} total hardware medals** placed around necks. "),
+    'individual': ("Their medals came entirely from individual events, keeping their physical hardware "
+                   "output equal to their standard medal count. "),
+}
+
+_SECTION_HEAD_HTML = '<section class="country">\n<h2>{display_name}{flag_suffix}</h2>\n'
+_SECTION_BODY_HTML = (
+    "<p><strong>{display_name}</strong> sent a delegation of <strong>{participants}</strong> athletes to the winter games. "
+    "They {performance}, bringing home a haul of <strong>{total_medals} medals</strong> "
+    "({gold} 🥇, {silver} 🥈, {bronze} 🥉) which netted them a baseline weighted score of {weighted_medals} points.</p>\n"
+)
+_SECTION_TAIL_HTML = (
+    "After factoring in their custom draft handicap, they finished the games with a "
+    "Final <strong>Multiplied Hardware</strong> score of <strong>{multiplied_hardware}</strong> and a base "
+    "<strong>Multiplied Medals</strong> score of <strong>{multiplied_medals}</strong>.</p>\n</section>\n"
+)
+_HARDWARE_HTML = {
+    'large_team': ("<p>They excelled in large team sports, significantly boosting their physical medal count to "
+                   "<strong>{total_hardware} total hardware medals</strong> placed around necks. "),
+    'small_team': ("<p>Their success in small team sports and relays boosted their physical medal count to "
+                   "<strong>{total_hardware} total hardware medals</strong> placed around necks. "),
+    'individual': ("<p>Their medals came entirely from individual events, keeping their physical hardware "
+                   "output equal to their standard medal count. "),
+}
+
+_HTML_PAGE_HEAD = '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{title}</title>\n</head>\n<body>\n<h1>{title}</h1>\n'
+_HTML_PAGE_FOOT = '</body>\n</html>\n'
+
+TEMPLATES = {
+    ('summaries', 'md'): dict(
+        header="# {title}\n\n",
+        countries_no_medals=_SECTION_HEAD_MD + "**{display_name}** did not bring home any medals during these winter games.\n\n---\n\n",
+        **{f'countries_{kind}': _SECTION_HEAD_MD + _SECTION_BODY_MD + text + _SECTION_TAIL_MD
+           for kind, text in _HARDWARE_MD.items()},
+    ),
+    ('summaries', 'html'): dict(
+        header=_HTML_PAGE_HEAD,
+        countries_no_medals=_SECTION_HEAD_HTML + "<p><strong>{display_name}</strong> did not bring home any medals "
+                                                 "during these winter games.</p>\n</section>\n",
+        footer=_HTML_PAGE_FOOT,
+        **{f'countries_{kind}': _SECTION_HEAD_HTML + _SECTION_BODY_HTML + text + _SECTION_TAIL_HTML
+           for kind, text in _HARDWARE_HTML.items()},
+    ),
+    ('summaries', 'json'): dict(
+        header='{{"title": {title}, ',
+        countries_start='"countries": [\n',
+        countries='{item}',
+        countries_sep=',\n',
+        countries_end='\n]',
+        footer='}}\n',
+    ),
+
+    # --- Paralympic medal stand (paralympics/main.py) ---
+    ('medal_stand', 'md'): dict(
+        header="# {title}\n\n",
+        categories_start=("## Category Winners\n\n"
+                          "| Category | 🥇 Gold (1st) | Score | 🥈 Silver (2nd) | Score | 🥉 Bronze (3rd) | Score |\n"
+                          "|----------|---------------|-------|-----------------|-------|-----------------|-------|\n"),
+        categories="| **{Category}** | {Gold (1st)} | {Gold Score} | {Silver (2nd)} | {Silver Score} | {Bronze (3rd)} | {Bronze Score} |\n",
+        categories_end="\n",
+        players_start=("## Summary by Player\n\n"
+                       "| Player | 🥇 Golds | 🥈 Silvers | 🥉 Bronzes |\n"
+                       "|--------|----------|------------|------------|\n"),
+        players="| **{Player}** | {Golds} | {Silvers} | {Bronzes} |\n",
+        players_end="\n",
+        definitions_start="## Category Definitions\n\n| Metric | Description |\n|--------|-------------|\n",
+        definitions="| **{Metric}** | {Description} |\n",
+    ),
+    ('medal_stand', 'html'): dict(
+        header=_HTML_PAGE_HEAD,
+        categories_start=("<h2>Category Winners</h2>\n<table>\n<tr><th>Category</th><th>🥇 Gold (1st)</th><th>Score</th>"
+                          "<th>🥈 Silver (2nd)</th><th>Score</th><th>🥉 Bronze (3rd)</th><th>Score</th></tr>\n"),
+        categories=("<tr><th>{Category}</th><td>{Gold (1st)}</td><td>{Gold Score}</td><td>{Silver (2nd)}</td>"
+                    "<td>{Silver Score}</td><td>{Bronze (3rd)}</td><td>{Bronze Score}</td></tr>\n"),
+        categories_end="</table>\n",
+        players_start=("<h2>Summary by Player</h2>\n<table>\n"
+                       "<tr><th>Player</th><th>🥇 Golds</th><th>🥈 Silvers</th><th>🥉 Bronzes</th></tr>\n"),
+        players="<tr><th>{Player}</th><td>{Golds}</td><td>{Silvers}</td><td>{Bronzes}</td></tr>\n",
+        players_end="</table>\n",
+        definitions_start="<h2>Category Definitions</h2>\n<dl>\n",
+        definitions="<dt>{Metric}</dt><dd>{Description}</dd>\n",
+        definitions_end="</dl>\n",
+        footer=_HTML_PAGE_FOOT,
+    ),
+    ('medal_stand', 'json'): dict(
+        header='{{"title": {title}, ',
+        categories_start='"categories": [\n', categories='{item}', categories_sep=',\n', categories_end='\n], ',
+        players_start='"players": [\n', players='{item}', players_sep=',\n', players_end='\n], ',
+        definitions_start='"definitions": [\n', definitions='{item}', definitions_sep=',\n', definitions_end='\n]',
+        footer='}}\n',
+    ),
+}
+
+_compiled = {}
+
+
+def compile_templates(kind, fmt):
+    """{block: Template} for one report kind and format, parsed on first use."""
+    key = (kind, fmt)
+    if key not in _compiled:
+        encode = ENCODERS[fmt]
+        _compiled[key] = {block: Template(text, encode) for block, text in TEMPLATES[key].items()}
+    return _compiled[key]
+
+
+def _item_context(fmt, item):
+    if fmt == 'json':
+        # The whole item is the JSON object
+        return {'item': item}
+    context = dict(item)
+    if 'flag' in context:
+        context['flag_suffix'] = f" {context['flag']}" if context['flag'] else ""
+    return context
+
+
+def render_block(out, kind, fmt, block, context):
+    template = compile_templates(kind, fmt).get(block)
+    if template:
+        template.render(out, context)
+
+
+def render_item(out, kind, fmt, section, item):
+    templates = compile_templates(kind, fmt)
+    template = templates.get(f"{section}_{item['template']}") if 'template' in item else None
+    template = template or templates[section]
+    template.render(out, _item_context(fmt, item))
+
+
+def write_report(path, kind, fmt, context, sections, rendered=None):
+    """
+    Streams one report to path (atomically). sections: [(name, items)].
+    rendered: optional {section: [already rendered item text]} to write
+    instead of rendering those items again (see generate_summaries.SectionCache).
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        render_block(out, kind, fmt, 'header', context)
+        for name, items in sections:
+            render_block(out, kind, fmt, f'{name}_start', context)
+            texts = (rendered or {}).get(name)
+            for i, item in enumerate(items):
+                if i:
+                    render_block(out, kind, fmt, f'{name}_sep', context)
+                if texts is not None:
+                    out.write(texts[i])
+                else:
+                    render_item(out, kind, fmt, name, item)
+            render_block(out, kind, fmt, f'{name}_end', context)
+        render_block(out, kind, fmt, 'footer', context)
+    os.replace(tmp_path, path)
+
+
+def report_path(base, fmt):
+    """'country_summaries' -> 'country_summaries.md' / '.html' / '.json'."""
+    return base + EXTENSIONS[fmt]
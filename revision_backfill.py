@@ -0,0 +1,183 @@
+"""
+Backfill when each medal first appeared by bisecting the medal winners
+page's Wikipedia revision history.
+
+For Games we didn't poll, the snapshot store has nothing to diff (see
+medal_dates.py). Instead of replaying every edit, we binary-search the
+revision list: parse the middle revision, split the medals we are looking
+for into "already there" (first appeared in the left half) and "not yet"
+(right half), and recurse. Every medal row only ever appears once and then
+stays, so this finds each medal's first revision with
+O(events x log revisions) page fetches at worst, and far fewer in practice
+since medals added by the same edit share every fetch.
+
+Each revision is parsed with main.parse_medal_details and cached on disk
+(state/revision_cache/<revid>.json), so re-runs and overlapping ranges cost
+nothing. Results go into the medal_dates first-seen store; the next main.py
+run moves Flavor dates earlier to match.
+
+    python revision_backfill.py [--since 2026-02-06] [--until 2026-02-23] [--dry-run]
+
+fake_wikipedia.FakeRevisionSource serves canned revisions for tests.
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+import http_client
+import medal_dates
+from watch import WIKIPEDIA_API, page_title
+
+REVISION_CACHE_DIR = os.path.join('state', 'revision_cache')
+WIKIPEDIA_INDEX = 'https://en.wikipedia.org/w/index.php'
+
+
+class WikipediaRevisions:
+    """Revision list and old revision HTML of one Wikipedia page."""
+
+    def __init__(self, title, session=None):
+        self.title = title
+        # The scrapers' pooled session (and its User-Agent) unless a test passes its own
+        self.session = session or http_client.get_session()
+        self.fetches = 0
+
+    def revisions(self, since=None, until=None):
+        """[(revid, timestamp)] oldest first."""
+        params = {
+            'action': 'query', 'format': 'json', 'prop': 'revisions', 'titles': self.title,
+            'rvprop': 'ids|timestamp', 'rvlimit': 'max', 'rvdir': 'newer',
+        }
+        if since:
+            params['rvstart'] = since.strftime('%Y-%m-%dT%H:%M:%SZ')
+        if until:
+            params['rvend'] = until.strftime('%Y-%m-%dT%H:%M:%SZ')
+        revisions = []
+        while True:
+            data = self.session.get(WIKIPEDIA_API, params=params, timeout=http_client.TIMEOUT).json()
+            for page in data.get('query', {}).get('pages', {}).values():
+                for rev in page.get('revisions', []):
+                    revisions.append((rev['revid'], datetime.fromisoformat(rev['timestamp'].replace('Z', '+00:00'))))
+            if 'continue' not in data:
+                return revisions
+            params.update(data['continue'])
+
+    def html(self, revid):
+        self.fetches += 1
+        response = self.session.get(WIKIPEDIA_INDEX, params={'title': self.title, 'oldid': revid},
+                                    timeout=http_client.TIMEOUT)
+        response.raise_for_status()
+        return response.content
+
+
+class RevisionCache:
+    """Parsed medal keys per revision, in memory and on disk."""
+
+    def __init__(self, source, parse, cache_dir=REVISION_CACHE_DIR):
+        self.source = source
+        self.parse = parse
+        self.cache_dir = cache_dir
+        self.memory = {}
+        self.parsed = 0  # Revisions we actually had to fetch and parse
+
+    def _path(self, revid):
+        return os.path.join(self.cache_dir, f"{revid}.json") if self.cache_dir else None
+
+    def details(self, revid):
+        if revid in self.memory:
+            return self.memory[revid]
+        path = self._path(revid)
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                details = json.load(f)
+        else:
+            details = self.parse(self.source.html(revid))
+            self.parsed += 1
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(details, f)
+        self.memory[revid] = details
+        return details
+
+    def keys(self, revid):
+        return {medal_dates.record_key(d['Event'], d['Medal'], d['Athlete']) for d in self.details(revid)}
+
+
+def bisect_first_revisions(revisions, cache, targets=None):
+    """
+    revisions: [(revid, timestamp)] oldest first. targets: record keys to
+    place (default: every medal on the newest revision).
+    Returns {key: (revid, timestamp)} of the first revision each key is on.
+    Keys already on the oldest revision get that revision (an upper bound).
+    """
+    if not revisions:
+        return {}
+    last = len(revisions) - 1
+    targets = set(targets) if targets is not None else cache.keys(revisions[last][0])
+    found = {}
+
+    present = targets & cache.keys(revisions[0][0])
+    for key in present:
+        found[key] = revisions[0]
+
+    # Each entry: keys known to be absent at revisions[lo] and present at revisions[hi]
+    stack = [(0, last, targets - present)]
+    while stack:
+        lo, hi, keys = stack.pop()
+        if not keys:
+            continue
+        if hi - lo == 1:
+            for key in keys:
+                found[key] = revisions[hi]
+            continue
+        mid = (lo + hi) // 2
+        at_mid = cache.keys(revisions[mid][0])
+        stack.append((lo, mid, keys & at_mid))
+        stack.append((mid, hi, keys - at_mid))
+    return found
+
+
+def backfill(source, since=None, until=None, cache_dir=REVISION_CACHE_DIR, first_seen=None, dry_run=False):
+    """Bisects the page history and records first-seen times. Returns {key: (revid, timestamp)}."""
+    from main import parse_medal_details
+    revisions = source.revisions(since, until)
+    print(f"{len(revisions)} revisions to search.")
+    cache = RevisionCache(source, parse_medal_details, cache_dir)
+    found = bisect_first_revisions(revisions, cache)
+    print(f"Placed {len(found)} medals looking at {len(cache.memory)} revisions "
+          f"({cache.parsed} fetched, the rest from the cache).")
+
+    if not dry_run:
+        first_seen = first_seen or medal_dates.FirstSeen.load()
+        moved = sum(first_seen.record(key, timestamp) for key, (_, timestamp) in found.items())
+        first_seen.save()
+        print(f"Moved {moved} first-seen times earlier. The next main.py run will fix the Flavor dates.")
+    return found
+
+
+def main(argv=None):
+    from main import WIKIPEDIA_URL_DETAILS
+    parser = argparse.ArgumentParser(description="Backfill medal first-seen times from Wikipedia revision history.")
+    parser.add_argument('--title', default=page_title(WIKIPEDIA_URL_DETAILS))
+    parser.add_argument('--since', help="Only search revisions from this date/time (UTC)")
+    parser.add_argument('--until', help="...up to this date/time (UTC)")
+    parser.add_argument('--cache', default=REVISION_CACHE_DIR, help="Parsed revision cache directory")
+    parser.add_argument('--dry-run', action='store_true', help="Print what was found without saving it")
+    args = parser.parse_args(argv)
+
+    def when(value):
+        if not value:
+            return None
+        parsed = datetime.fromisoformat(value)
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    source = WikipediaRevisions(args.title)
+    found = backfill(source, when(args.since), when(args.until), args.cache, dry_run=args.dry_run)
+    if args.dry_run:
+        for key, (revid, timestamp) in sorted(found.items(), key=lambda kv: kv[1][1]):
+            print(f"{timestamp.isoformat()}  rev {revid}  {key}")
+
+
+if __name__ == "__main__":
+    main()
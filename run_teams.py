@@ -10,7 +10,7 @@ def generate_team_csv():
         
     print("Aggregating team scores with standard medals...")
     hw_counts = aggregate_hardware_counts(details)
-    export_teams_to_csv(hw_counts, medal_counts)
+    export_teams_to_csv(hw_counts)
 
 if __name__ == '__main__':
     generate_team_csv()
@@ -0,0 +1,256 @@
+"""
+Dry runs: the change plan a run would apply to the league sheet, without
+sending a single write.
+
+    python main.py --dry-run [--plan-json plan.json]
+    python tracker.py sync-sheets --dry-run
+
+Every stage already queues write intents on a WriteScheduler instead of
+writing to a tab itself. A dry run:
+
+1. Reads every tab of the live spreadsheet once into a fake_sheets.FakeClient.
+2. Runs the pipeline against that copy, in a scratch copy of the working
+   directory, so local state (caches, CSVs, snapshots) is left alone.
+3. Uses a PlanningScheduler. At each flush it works out what every queued
+   intent actually changes on the copy before applying it there, so later
+   stages read what they would read live.
+
+The resulting plan is minimal:
+- Cells written with the value they already hold are dropped.
+- A tab that is cleared and rewritten shows only the cells that end up
+  different.
+- Each step is tagged with the stage that queued it.
+Row numbers are those of the sheet when the step is applied: a deletion
+shifts the rows of the steps after it. Cell changes are listed at the end
+of the flush that sends them (or before a deletion on their tab).
+"""
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+
+from sheet_writes import MAX_REQUESTS_PER_CALL, WriteScheduler
+
+
+def snapshot_client(client, key):
+    """A FakeClient holding a copy of every tab of one live spreadsheet (reads only)."""
+    from fake_sheets import FakeClient
+    tabs, sizes = {}, {}
+    for ws in client.open_by_key(key).worksheets():
+        tabs[ws.title] = ws.get_all_values()
+        sizes[ws.title] = (ws.row_count, ws.col_count)
+    fake = FakeClient({key: tabs})
+    for ws in fake.spreadsheets[key]._worksheets:
+        ws.row_count, ws.col_count = sizes[ws.title]
+    return fake
+
+
+@contextlib.contextmanager
+def scratch_copy(paths):
+    """Runs the block in a temporary directory holding copies of paths (files or directories)."""
+    src_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in paths:
+            if os.path.isdir(path):
+                shutil.copytree(path, os.path.join(tmp, path))
+            elif os.path.exists(path):
+                shutil.copy(path, tmp)
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(src_dir)
+
+
+def _a1(row_idx, col_idx):
+    from gspread.utils import rowcol_to_a1
+    return rowcol_to_a1(row_idx + 1, col_idx + 1)
+
+
+def _cell(ws, row_idx, col_idx):
+    rows = ws._rows
+    if row_idx < len(rows) and col_idx < len(rows[row_idx]):
+        return rows[row_idx][col_idx]
+    return ""
+
+
+class ChangePlan:
+    """Ordered steps: cell writes, row appends, row deletions, resizes, new tabs."""
+
+    def __init__(self):
+        self.steps = []
+        self.batch_updates = 0
+
+    def add(self, step):
+        # Consecutive appends to one tab from one stage are one step
+        last = self.steps[-1] if self.steps else None
+        if (step['op'] == 'append' and last and last['op'] == 'append' and last['stage'] == step['stage']
+                and last['tab'] == step['tab'] and last['row'] + len(last['values']) == step['row']):
+            last['values'].extend(step['values'])
+            return
+        self.steps.append(step)
+
+    def summary(self):
+        counts = {'cells': 0, 'appended_rows': 0, 'deleted_rows': 0, 'tabs_created': 0}
+        tabs = set()
+        for step in self.steps:
+            tabs.add(step['tab'])
+            if step['op'] == 'cell':
+                counts['cells'] += 1
+            elif step['op'] == 'append':
+                counts['appended_rows'] += len(step['values'])
+            elif step['op'] == 'delete':
+                counts['deleted_rows'] += step['end_row'] - step['start_row'] + 1
+            elif step['op'] == 'add_tab':
+                counts['tabs_created'] += 1
+        counts['tabs'] = len(tabs)
+        counts['batch_updates'] = self.batch_updates
+        return counts
+
+    def to_json(self):
+        return {'summary': self.summary(), 'steps': self.steps}
+
+    def text(self):
+        s = self.summary()
+        lines = [f"Dry run: {s['cells']} cell write(s), {s['appended_rows']} row(s) appended, "
+                 f"{s['deleted_rows']} row(s) deleted, {s['tabs_created']} tab(s) created on {s['tabs']} tab(s); "
+                 f"{s['batch_updates']} batchUpdate call(s). Nothing was sent."]
+        stage = object()
+        for step in self.steps:
+            if step['stage'] != stage:
+                stage = step['stage']
+                lines.append(f"[{stage or '-'}]")
+            if step['op'] == 'cell':
+                lines.append(f"  ~ {step['tab']}!{step['cell']}: {step['old']!r} -> {step['new']!r}")
+            elif step['op'] == 'append':
+                for i, row in enumerate(step['values']):
+                    lines.append(f"  + {step['tab']} row {step['row'] + i}: {' | '.join(row)}")
+            elif step['op'] == 'delete':
+                for i, row in enumerate(step['values']):
+                    lines.append(f"  - {step['tab']} row {step['start_row'] + i}: {' | '.join(row)}")
+            elif step['op'] == 'resize':
+                lines.append(f"  # resize {step['tab']} to {step['rows']}x{step['cols']}")
+            elif step['op'] == 'add_tab':
+                lines.append(f"  # create tab {step['tab']}")
+            else:
+                lines.append(f"  # {step['op']} on {step['tab']}")
+        if not self.steps:
+            lines.append("The sheet is already up to date.")
+        return "\n".join(lines)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, indent=1, ensure_ascii=False)
+
+
+class PlanningScheduler(WriteScheduler):
+    """
+    A WriteScheduler whose flush() records the minimal effect of each intent
+    in self.plan and applies it to the (copied) spreadsheet it was queued for.
+    """
+
+    def __init__(self, label=None):
+        super().__init__(requests_per_minute=None, label=label)
+        self.plan = ChangePlan()
+        self._cells = {}  # (stage, sheet id, row, col) -> [tab, value before, value after]
+
+    def flush(self):
+        from fake_sheets import _extended_to_str
+        with self.lock:
+            pending, self.pending = self.pending, []
+            # What the live flush would cost (see WriteScheduler.flush)
+            batches, last, size = 0, None, 0
+            for spreadsheet, _, _, _ in pending:
+                if last is not None and last == spreadsheet.id and size < MAX_REQUESTS_PER_CALL:
+                    size += 1
+                else:
+                    batches, last, size = batches + 1, spreadsheet.id, 1
+            self.plan.batch_updates += batches
+
+            for spreadsheet, request, _, stage in pending:
+                self._record(spreadsheet, request, stage, _extended_to_str)
+                spreadsheet.batch_update({"requests": [request]})
+            self._settle()
+            self._run_callbacks()
+            return 0
+
+    def _touch(self, stage, ws, row_idx, col_idx, value):
+        key = (stage, ws.id, row_idx, col_idx)
+        if key in self._cells:
+            self._cells[key][2] = value
+        else:
+            self._cells[key] = [ws.title, _cell(ws, row_idx, col_idx), value]
+
+    def _settle(self, ws=None):
+        """Turns the pending cell writes (of one tab, or all) into plan steps, dropping no-ops."""
+        for key in [k for k in self._cells if ws is None or k[1] == ws.id]:
+            stage, _, row_idx, col_idx = key
+            tab, old, new = self._cells.pop(key)
+            if old != new:
+                self.plan.add({'op': 'cell', 'stage': stage, 'tab': tab, 'cell': _a1(row_idx, col_idx),
+                               'old': old, 'new': new})
+
+    def _record(self, spreadsheet, request, stage, to_str):
+        (kind, params), = request.items()
+        if kind == "updateCells" and not params.get("rows") and "userEnteredValue" in params.get("fields", ""):
+            # A clear: every non-empty cell in the range becomes empty
+            rng = params["range"]
+            ws = spreadsheet._by_id(rng["sheetId"])
+            for r in range(rng.get("startRowIndex", 0), min(rng.get("endRowIndex", len(ws._rows)), len(ws._rows))):
+                row = ws._rows[r]
+                for c in range(rng.get("startColumnIndex", 0), min(rng.get("endColumnIndex", len(row)), len(row))):
+                    if row[c] != "":
+                        self._touch(stage, ws, r, c, "")
+        elif kind == "updateCells":
+            if "start" in params:
+                start = params["start"]
+                sheet_id, row_idx, col_idx = start["sheetId"], start.get("rowIndex", 0), start.get("columnIndex", 0)
+            else:
+                rng = params["range"]
+                sheet_id, row_idx, col_idx = rng["sheetId"], rng.get("startRowIndex", 0), rng.get("startColumnIndex", 0)
+            ws = spreadsheet._by_id(sheet_id)
+            for r, row in enumerate(params.get("rows", [])):
+                for c, cell in enumerate(row.get("values", [])):
+                    self._touch(stage, ws, row_idx + r, col_idx + c, to_str(cell))
+        elif kind == "appendCells":
+            ws = spreadsheet._by_id(params["sheetId"])
+            at = len(ws.grid_values())
+            for i, row in enumerate(params.get("rows", [])):
+                values = [to_str(cell) for cell in row.get("values", [])]
+                if at + i < len(ws._rows):
+                    # Lands on rows that exist but are blank (e.g. after a clear)
+                    for c, value in enumerate(values):
+                        self._touch(stage, ws, at + i, c, value)
+                else:
+                    self.plan.add({'op': 'append', 'stage': stage, 'tab': ws.title, 'row': at + i + 1,
+                                   'values': [values]})
+        elif kind == "deleteDimension":
+            rng = params["range"]
+            ws = spreadsheet._by_id(rng["sheetId"])
+            start_idx, end_idx = rng["startIndex"], rng["endIndex"]
+            # Rows deleted after being cleared or edited are shown as they were
+            values = [list(r) for r in ws._rows[start_idx:end_idx]]
+            for key in [k for k in self._cells if k[1] == ws.id and start_idx <= k[2] < end_idx]:
+                row = values[key[2] - start_idx]
+                row.extend([""] * (key[3] + 1 - len(row)))
+                row[key[3]] = self._cells.pop(key)[1]
+            # Cell writes queued before the deletion refer to the rows as they were
+            self._settle(ws)
+            self.plan.add({'op': 'delete', 'stage': stage, 'tab': ws.title, 'start_row': start_idx + 1,
+                           'end_row': end_idx, 'values': values})
+        elif kind == "updateSheetProperties":
+            grid = params["properties"].get("gridProperties", {})
+            ws = spreadsheet._by_id(params["properties"]["sheetId"])
+            self.plan.add({'op': 'resize', 'stage': stage, 'tab': ws.title,
+                           'rows': grid.get("rowCount", ws.row_count), 'cols': grid.get("columnCount", ws.col_count)})
+        else:
+            sheet_id = next((v.get("sheetId") for v in params.values() if isinstance(v, dict)), None)
+            ws = spreadsheet._by_id(sheet_id) if sheet_id is not None else None
+            self.plan.add({'op': kind, 'stage': stage, 'tab': ws.title if ws else None})
+
+    def note_new_tabs(self, client, key, before):
+        """Tabs the run created on the copy (get_or_create_worksheet creates them straight away)."""
+        for ws in client.spreadsheets[key]._worksheets:
+            if ws.title not in before:
+                self.plan.steps.insert(0, {'op': 'add_tab', 'stage': None, 'tab': ws.title})
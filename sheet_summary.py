@@ -0,0 +1,117 @@
+"""
+Compact summary tables for the Summary tab.
+
+The sheet's charts and per-player views used to be formulas over the whole
+Flavor log, which got slow to recalculate late in the Games. The pipeline now
+computes the tables here from the local Flavor index (one row per medal) and
+writes them in one batch, side by side so each table's range only ever grows
+downward:
+
+    Medals per Player per Day   | Medals per Player per Sport | Medals per Country
+    Date | <player>... | <player> (total)...
+                                  Sport | <player>... | Total
+                                                                Country | Team | Gold | Silver | Bronze | Total
+"""
+from flavor_index import FLAVOR_HEADERS, medal_signature
+from sheet_writes import parse_sheet_date
+
+SUMMARY_TAB_NAME = 'Summary'
+MEDALS = ['Gold', 'Silver', 'Bronze']
+UNKNOWN_SPORT = 'Other'
+
+
+def sport_lookup(details):
+    """{Event_Medal_Athlete: Sport} for the scraped medals that carry a sport."""
+    return {medal_signature(d['Event'], d['Medal'], d['Athlete']): d['Sport']
+            for d in details if d.get('Sport')}
+
+
+def _medal_rows(header, rows):
+    """Yields (date, country, medal, signature, team) for each Flavor row."""
+    cols = [header.index(h) if h in header else FLAVOR_HEADERS.index(h) for h in FLAVOR_HEADERS]
+    i_date, i_country, i_medal, i_event, i_athlete, i_team = cols
+    width = max(cols) + 1
+    for row in rows:
+        row = list(row) + [''] * (width - len(row))
+        if row[i_medal] not in MEDALS:
+            continue
+        yield (row[i_date], row[i_country], row[i_medal],
+               medal_signature(row[i_event], row[i_medal], row[i_athlete]), row[i_team] or "Free Agent")
+
+
+def medals_per_player_per_day(medals, players):
+    daily = {}
+    for text, _, _, _, team in medals:
+        # Flavor dates are date cells; whatever format they display in, order them as dates
+        date = parse_sheet_date(text)
+        if date is None:
+            continue
+        daily.setdefault(date, dict.fromkeys(players, 0))
+        if team in daily[date]:
+            daily[date][team] += 1
+
+    table = [['Date'] + players + [f"{p} (total)" for p in players]]
+    running = dict.fromkeys(players, 0)
+    for date in sorted(daily):
+        for p in players:
+            running[p] += daily[date][p]
+        table.append([date] + [daily[date][p] for p in players] + [running[p] for p in players])
+    return table
+
+
+def medals_per_player_per_sport(medals, players, sports):
+    per_sport = {}
+    for _, _, _, sig, team in medals:
+        counts = per_sport.setdefault(sports.get(sig, UNKNOWN_SPORT), dict.fromkeys(players, 0))
+        if team in counts:
+            counts[team] += 1
+
+    table = [['Sport'] + players + ['Total']]
+    for sport in sorted(per_sport):
+        counts = [per_sport[sport][p] for p in players]
+        table.append([sport] + counts + [sum(counts)])
+    return table
+
+
+def medals_per_country(medals):
+    per_country = {}
+    for _, country, medal, _, team in medals:
+        entry = per_country.setdefault(country, {'Team': team, 'Gold': 0, 'Silver': 0, 'Bronze': 0})
+        entry[medal] += 1
+
+    rows = []
+    for country, e in per_country.items():
+        rows.append([country, e['Team'], e['Gold'], e['Silver'], e['Bronze'], e['Gold'] + e['Silver'] + e['Bronze']])
+    rows.sort(key=lambda r: (-r[5], -r[2], -r[3], r[0]))
+    return [['Country', 'Team', 'Gold', 'Silver', 'Bronze', 'Total']] + rows
+
+
+def summary_tables(header, rows, players, sports):
+    """[(title, table)] computed from the Flavor rows. players sets the column order."""
+    medals = list(_medal_rows(header, rows))
+    players = list(players)
+    if any(m[4] == "Free Agent" for m in medals) and "Free Agent" not in players:
+        players.append("Free Agent")
+    return [
+        ('Medals per Player per Day', medals_per_player_per_day(medals, players)),
+        ('Medals per Player per Sport', medals_per_player_per_sport(medals, players, sports)),
+        ('Medals per Country', medals_per_country(medals)),
+    ]
+
+
+def summary_layout(tables):
+    """
+    Places the tables side by side (title row, then the table), one blank
+    column apart. Returns (updates for WriteScheduler.update_cells, rows, cols).
+    """
+    from gspread.utils import rowcol_to_a1
+    updates = []
+    col = 1
+    n_rows = 0
+    for title, table in tables:
+        width = max(len(r) for r in table)
+        updates.append({'range': rowcol_to_a1(1, col), 'values': [[title]]})
+        updates.append({'range': rowcol_to_a1(2, col), 'values': table})
+        n_rows = max(n_rows, len(table) + 1)
+        col += width + 1
+    return updates, n_rows, col - 2
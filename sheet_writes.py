@@ -0,0 +1,296 @@
+"""
+Quota-aware write scheduler for the league spreadsheet.
+
+Stages queue write intents (cell updates, row appends, clears, row deletions)
+instead of calling ws.batch_update / ws.append_rows themselves. flush() turns
+everything queued into spreadsheet-level batchUpdate requests:
+
+- Intents for every tab go into the same call, so a whole run usually costs a
+  single write request instead of one per stage.
+- Requests inside a batchUpdate are applied in order and atomically, so
+  "clear, then append" keeps its meaning and a call never lands half-applied.
+- Calls are paced to a requests-per-minute budget, and 429 / 5xx responses are
+  retried with truncated exponential backoff. A 5xx does not say whether the
+  call was applied, and appending rows twice is not harmless, so a batch
+  with appendCells is only retried on 429 (rejected before it was applied).
+
+Values go in as typed cells: numbers as numbers, datetime.date as a real
+date (formatted yyyy-mm-dd, so sorting, filters and date formulas work), and
+text as text, even if it starts with "=". Wrap a value in Formula() to send
+it as a formula.
+
+One scheduler is shared by stages running on different threads (see
+main.main), so queueing and flushing are serialized with a lock.
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+DEFAULT_REQUESTS_PER_MINUTE = 60
+MAX_REQUESTS_PER_CALL = 500  # Keeps each batchUpdate payload comfortably small
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Statuses that mean the call was rejected without being applied
+REJECTED_STATUS = {429}
+SHEETS_EPOCH = date(1899, 12, 30)  # Day 0 of Sheets date serial numbers
+DATE_FORMAT = {"type": "DATE", "pattern": "yyyy-mm-dd"}
+# How date cells may read back through get_all_values (the sheet's display format)
+SHEET_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%Y/%m/%d', '%d.%m.%Y', '%b %d, %Y', '%d %b %Y']
+# Chunked uploads (see adapt_chunk_size): seconds one chunk may take, and size bounds
+CHUNK_TARGET_SECONDS = 5.0
+MIN_CHUNK_ROWS = 10
+MAX_CHUNK_ROWS = 1000
+
+
+class Formula(str):
+    """A cell value to send as a formula, e.g. Formula('=SUM(B2:B9)')."""
+
+
+def parse_sheet_date(value):
+    """A date cell as get_all_values shows it (ISO, a locale format or a serial number) -> date, else None."""
+    text = str(value).strip()
+    for fmt in SHEET_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    try:
+        serial = float(text)
+    except ValueError:
+        return None
+    # Unformatted date cells read back as their serial number
+    return SHEETS_EPOCH + timedelta(days=int(serial)) if 0 < serial < 200000 else None
+
+
+def _extended_value(value):
+    """Converts a Python cell value into a Sheets CellData."""
+    if value is None or value == "":
+        return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return {"userEnteredValue": {"numberValue": (value - SHEETS_EPOCH).days},
+                "userEnteredFormat": {"numberFormat": DATE_FORMAT}}
+    if isinstance(value, Formula):
+        return {"userEnteredValue": {"formulaValue": str(value)}}
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
+
+def _row_data(rows):
+    return [{"values": [_extended_value(v) for v in row]} for row in rows]
+
+
+def _fields(row_data):
+    """Field mask for rows: the date format is only written alongside rows that hold dates."""
+    if any("userEnteredFormat" in cell for row in row_data for cell in row["values"]):
+        return "userEnteredValue,userEnteredFormat.numberFormat"
+    return "userEnteredValue"
+
+
+def _a1_start(a1):
+    """'C12' or 'C12:F20' -> 0-based (row, col) of the top-left cell."""
+    from gspread.utils import a1_to_rowcol
+    row, col = a1_to_rowcol(a1.split(':')[0])
+    return row - 1, col - 1
+
+
+def _status_code(error):
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def adapt_chunk_size(size, elapsed, target=CHUNK_TARGET_SECONDS, lo=MIN_CHUNK_ROWS, hi=MAX_CHUNK_ROWS):
+    """
+    Next chunk size for a chunked upload, from how long the last chunk took:
+    double it while calls are quick, halve it once they get slow.
+    """
+    if elapsed > target:
+        return max(lo, size // 2)
+    if elapsed < target / 2:
+        return min(hi, size * 2)
+    return size
+
+
+def get_or_create_worksheet(sheet, title, rows=1000, cols=26):
+    """Returns (worksheet, created). Creating a tab is an immediate write (it needs an id)."""
+    import gspread
+    try:
+        return sheet.worksheet(title), False
+    except gspread.exceptions.WorksheetNotFound:
+        print(f"Creating new tab: {title}...")
+        return sheet.add_worksheet(title=title, rows=str(rows), cols=str(cols)), True
+
+
+class WriteScheduler:
+    """
+    Queues writes from every stage of a run and sends them in as few
+    spreadsheet batchUpdate calls as possible.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, max_retries=5,
+                 backoff=1.0, max_backoff=64.0, clock=time.monotonic, sleep=time.sleep, label=None):
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.sleep = sleep
+        self.pending = []  # [(spreadsheet, request dict, description, label)]
+        # Tags each intent with who queued it, e.g. pipeline.current_stage (see sheet_plan)
+        self.label = label or (lambda: None)
+        self.callbacks = []  # Run once everything queued so far has been sent
+        self.sent_calls = []  # Timestamps of API calls, for the per-minute budget
+        self.api_calls = 0
+        self.retries = 0
+        self.lock = threading.RLock()
+
+    def _queue(self, ws, request, description):
+        with self.lock:
+            self.pending.append((ws.spreadsheet, request, description, self.label()))
+
+    # --- Intents ---
+
+    def update_cells(self, ws, updates):
+        """Same payload as ws.batch_update: [{'range': 'B2', 'values': [[...]]}, ...]."""
+        if not updates:
+            return
+        # Adjacent single-row writes (e.g. Country/Gold/Silver/Bronze of one row)
+        # become one updateCells request.
+        runs = []
+        for u in sorted(updates, key=lambda u: _a1_start(u['range'])):
+            row, col = _a1_start(u['range'])
+            values = u['values']
+            last = runs[-1] if runs else None
+            if (last and len(values) == 1 and len(last['values']) == 1
+                    and last['row'] == row and last['col'] + len(last['values'][0]) == col):
+                last['values'][0].extend(values[0])
+            else:
+                runs.append({'row': row, 'col': col, 'values': [list(r) for r in values]})
+
+        for run in runs:
+            row_data = _row_data(run['values'])
+            self._queue(ws, {"updateCells": {
+                "start": {"sheetId": ws.id, "rowIndex": run['row'], "columnIndex": run['col']},
+                "rows": row_data,
+                "fields": _fields(row_data),
+            }}, f"update {ws.title}!R{run['row'] + 1}C{run['col'] + 1}")
+
+    def append_rows(self, ws, rows):
+        if not rows:
+            return
+        row_data = _row_data(rows)
+        self._queue(ws, {"appendCells": {
+            "sheetId": ws.id,
+            "rows": row_data,
+            "fields": _fields(row_data),
+        }}, f"append {len(rows)} rows to {ws.title}")
+
+    def clear(self, ws):
+        self._queue(ws, {"updateCells": {
+            "range": {"sheetId": ws.id},
+            "fields": "userEnteredValue",
+        }}, f"clear {ws.title}")
+
+    def delete_rows(self, ws, start_index, end_index=None):
+        """Deletes 1-based rows start_index..end_index inclusive (like ws.delete_rows)."""
+        end_index = end_index or start_index
+        self._queue(ws, {"deleteDimension": {"range": {
+            "sheetId": ws.id,
+            "dimension": "ROWS",
+            "startIndex": start_index - 1,
+            "endIndex": end_index,
+        }}}, f"delete {ws.title} rows {start_index}-{end_index}")
+
+    def resize(self, ws, rows, cols):
+        """Grows the tab's grid so later writes in the batch fit (never shrinks)."""
+        rows, cols = max(rows, ws.row_count), max(cols, ws.col_count)
+        if (rows, cols) == (ws.row_count, ws.col_count):
+            return
+        self._queue(ws, {"updateSheetProperties": {
+            "properties": {"sheetId": ws.id, "gridProperties": {"rowCount": rows, "columnCount": cols}},
+            "fields": "gridProperties(rowCount,columnCount)",
+        }}, f"resize {ws.title} to {rows}x{cols}")
+
+    def after_flush(self, callback):
+        """
+        Runs callback() once the writes queued so far have been sent successfully,
+        e.g. to persist local state that must only move forward with the sheet.
+        """
+        with self.lock:
+            if callback not in self.callbacks:
+                self.callbacks.append(callback)
+
+    # --- Sending ---
+
+    def _wait_for_budget(self):
+        if not self.requests_per_minute:
+            return
+        now = self.clock()
+        self.sent_calls = [t for t in self.sent_calls if now - t < 60]
+        if len(self.sent_calls) >= self.requests_per_minute:
+            wait = 60 - (now - self.sent_calls[0])
+            print(f"Write budget of {self.requests_per_minute}/min reached. Waiting {wait:.1f}s...")
+            self.sleep(wait)
+        self.sent_calls.append(self.clock())
+
+    def _send(self, spreadsheet, requests):
+        from gspread.exceptions import APIError
+        # A 5xx may come back for a call that was applied; only resend appends if it surely was not
+        retryable = REJECTED_STATUS if any("appendCells" in r for r in requests) else RETRYABLE_STATUS
+        attempt = 0
+        while True:
+            self._wait_for_budget()
+            try:
+                self.api_calls += 1
+                return spreadsheet.batch_update({"requests": requests})
+            except APIError as e:
+                status = _status_code(e)
+                if status not in retryable or attempt >= self.max_retries:
+                    raise
+                delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+                attempt += 1
+                self.retries += 1
+                print(f"Sheets API returned {status}. Retrying in {delay:.1f}s (attempt {attempt}/{self.max_retries})...")
+                self.sleep(delay)
+
+    def flush(self):
+        """Sends every queued intent, in order. Returns the number of API calls made."""
+        with self.lock:
+            if not self.pending:
+                self._run_callbacks()
+                return 0
+
+            # Group consecutive intents per spreadsheet (normally there is only one)
+            batches = []
+            for spreadsheet, request, _, _ in self.pending:
+                # Each stage opens its own Spreadsheet handle, so compare by key
+                if (batches and batches[-1][0].id == spreadsheet.id
+                        and len(batches[-1][1]) < MAX_REQUESTS_PER_CALL):
+                    batches[-1][1].append(request)
+                else:
+                    batches.append((spreadsheet, [request]))
+
+            print(f"Flushing {len(self.pending)} queued writes in {len(batches)} batchUpdate call(s)...")
+            calls_before = self.api_calls
+            while batches:
+                spreadsheet, requests = batches[0]
+                self._send(spreadsheet, requests)
+                batches.pop(0)
+                self.pending = self.pending[len(requests):]
+            self._run_callbacks()
+            return self.api_calls - calls_before
+
+    def _run_callbacks(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def queued_by(self, label):
+        """Whether intents queued under this label are still waiting to be sent."""
+        with self.lock:
+            return any(queued == label for *_, queued in self.pending)
+
+    def describe(self):
+        """Human-readable list of queued intents."""
+        return [description for _, _, description, _ in self.pending]
@@ -0,0 +1,112 @@
+"""
+Shared Google Sheets client factory.
+
+main.py, create_final_standings.py and graph_results.py used to each parse
+GOOGLE_CREDENTIALS and do a fresh OAuth token exchange (with the deprecated
+oauth2client) every time they needed a client. Now:
+
+- One gspread client per process. Its google-auth AuthorizedSession keeps its
+  connections alive for every Sheets call and refreshes the token on its own
+  shortly before it expires, so a long-lived process (watch mode) never
+  re-authenticates from scratch.
+- Optionally, the access token and its expiry are cached on disk
+  (GOOGLE_TOKEN_CACHE=path), encrypted with a key derived from the service
+  account's private key. A new process reuses it until it is close to expiry
+  instead of paying for another token exchange.
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+TOKEN_CACHE_ENV = 'GOOGLE_TOKEN_CACHE'
+EXPIRY_MARGIN = timedelta(minutes=5)  # Don't start a run on a token about to lapse
+
+_client = None
+_lock = threading.Lock()
+
+
+def load_service_account_info():
+    creds_json = os.environ.get('GOOGLE_CREDENTIALS')
+    if not creds_json:
+        raise ValueError("GOOGLE_CREDENTIALS environment variable not found.")
+    return json.loads(creds_json)
+
+
+def _fernet(info):
+    from cryptography.fernet import Fernet
+    secret = hashlib.sha256(info['private_key'].encode('utf-8')).digest()
+    return Fernet(base64.urlsafe_b64encode(secret))
+
+
+def _fresh(expiry):
+    # google-auth keeps expiry as a naive UTC datetime
+    return expiry is not None and expiry - EXPIRY_MARGIN > datetime.utcnow()
+
+
+def load_cached_token(path, info, credentials):
+    """Puts a cached token on credentials if there is a fresh one. Returns True if so."""
+    try:
+        with open(path, 'rb') as f:
+            cached = json.loads(_fernet(info).decrypt(f.read()))
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable token cache {path} ({e}).")
+        return False
+
+    expiry = datetime.fromisoformat(cached['expiry'])
+    if cached.get('client_email') != info.get('client_email') or not _fresh(expiry):
+        return False
+    credentials.token = cached['token']
+    credentials.expiry = expiry
+    return True
+
+
+def save_cached_token(path, info, credentials):
+    payload = json.dumps({
+        'client_email': info.get('client_email'),
+        'token': credentials.token,
+        'expiry': credentials.expiry.isoformat(),
+    }).encode('utf-8')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    # Only the owner should be able to read it, even encrypted
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(_fernet(info).encrypt(payload))
+    os.replace(tmp_path, path)
+
+
+def get_google_sheet_client(token_cache=None):
+    """
+    Authenticates with Google Sheets using the service account in
+    GOOGLE_CREDENTIALS. Returns the same client for the rest of the process.
+    token_cache: path of the encrypted token cache (default: $GOOGLE_TOKEN_CACHE, off if unset).
+    """
+    global _client
+    with _lock:
+        if _client is not None:
+            return _client
+
+        import gspread
+        from google.auth.transport.requests import AuthorizedSession, Request
+        from google.oauth2.service_account import Credentials
+
+        info = load_service_account_info()
+        credentials = Credentials.from_service_account_info(info, scopes=SCOPES)
+        session = AuthorizedSession(credentials)
+
+        token_cache = token_cache or os.environ.get(TOKEN_CACHE_ENV)
+        if token_cache and load_cached_token(token_cache, info, credentials):
+            print("Reusing cached Google access token.")
+        else:
+            credentials.refresh(Request())
+            if token_cache:
+                save_cached_token(token_cache, info, credentials)
+
+        _client = gspread.authorize(credentials, session=session)
+        return _client
@@ -0,0 +1,181 @@
+"""
+Columnar history of every run, kept as a date-partitioned Parquet dataset.
+
+Each run used to overwrite scraped_medals.json, scraped_details.json and the
+CSVs, so the only history was git. Now main() also appends the run's data
+here, one small file per table per run:
+
+    state/snapshots/runs/date=2026-02-08/20260208T140012Z.parquet
+    state/snapshots/counts/date=2026-02-08/20260208T140012Z.parquet
+    state/snapshots/details/...
+    state/snapshots/scores/...
+
+- runs:    run_id, run_time, revision ids and fetch times of both pages, a
+           content hash per table (identical runs are easy to spot), and
+           valid_until / merged_runs once compaction has folded later
+           identical runs into this one (see compact_snapshots.py)
+- counts:  run_id, run_time, country, gold, silver, bronze
+- details: run_id, run_time, event, medal, athlete, country, sport
+- scores:  run_id, run_time, player, weighted_hw, final_score, medals, multiplied_medals
+
+The store stays out of git (.gitignore): committing it would add new binary
+files on every run and another copy on every compaction. The workflows keep
+it in the Actions cache, restored at the start of each job and saved at the
+end. A cache unused for a week is evicted; the first-seen dates derived from
+it (medal_dates.py) are committed, so only the raw history would be lost.
+
+String columns are dictionary-encoded (country, sport, player... repeat on
+every row and every run). pyarrow is imported lazily so plain Sheets runs
+don't pay for it.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+SNAPSHOT_ROOT = os.path.join('state', 'snapshots')
+TABLES = ('runs', 'counts', 'details', 'scores')
+ROW_GROUP_ROWS = 256 * 1024
+
+
+def _schemas():
+    import pyarrow as pa
+    text = pa.dictionary(pa.int32(), pa.string())
+    ts = pa.timestamp('us', tz='UTC')
+    base = [('run_id', text), ('run_time', ts)]
+    return {
+        'runs': pa.schema(base + [
+            ('counts_revision', pa.int64()), ('counts_fetched_at', ts),
+            ('details_revision', pa.int64()), ('details_fetched_at', ts),
+            ('counts_hash', pa.string()), ('details_hash', pa.string()), ('scores_hash', pa.string()),
+            # Set by compaction: this run's data also stands for later identical runs
+            ('valid_until', ts), ('merged_runs', pa.int32()),
+        ]),
+        'counts': pa.schema(base + [
+            ('country', text), ('gold', pa.int32()), ('silver', pa.int32()), ('bronze', pa.int32()),
+        ]),
+        'details': pa.schema(base + [
+            ('event', text), ('medal', text), ('athlete', pa.string()), ('country', text), ('sport', text),
+        ]),
+        'scores': pa.schema(base + [
+            ('player', text), ('weighted_hw', pa.float64()), ('final_score', pa.float64()),
+            ('medals', pa.float64()), ('multiplied_medals', pa.float64()),
+        ]),
+    }
+
+
+def content_hash(records):
+    """Order-insensitive hash of a table's rows (without run columns)."""
+    lines = sorted(json.dumps(r, sort_keys=True, default=str) for r in records)
+    return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+def run_id_for(run_time):
+    return run_time.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def run_records(counts, details, scores):
+    """Turns main()'s dict / list data into per-table record lists."""
+    counts_records = [{'country': c, 'gold': m.get('Gold', 0), 'silver': m.get('Silver', 0), 'bronze': m.get('Bronze', 0)}
+                      for c, m in sorted(counts.items())]
+    details_records = [{'event': d.get('Event'), 'medal': d.get('Medal'), 'athlete': d.get('Athlete'),
+                        'country': d.get('Country'), 'sport': d.get('Sport') or None} for d in details]
+    scores_records = [{'player': r[0], 'weighted_hw': r[1], 'final_score': r[2], 'medals': r[3], 'multiplied_medals': r[4]}
+                      for r in scores]
+    return {'counts': counts_records, 'details': details_records, 'scores': scores_records}
+
+
+def partition_path(root, table, run_time, name):
+    return os.path.join(root, table, f"date={run_time.astimezone(timezone.utc):%Y-%m-%d}", f"{name}.parquet")
+
+
+def read_file(table, path):
+    """One Parquet file of a table, conformed to the current schema."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = _schemas()[table]
+    data = pq.read_table(path)
+    columns = [data.column(f.name).cast(f.type) if f.name in data.column_names else pa.nulls(data.num_rows, f.type)
+               for f in schema]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def write_arrow(path, arrow_table):
+    """Atomically writes a whole table to one file, as few large row groups as possible."""
+    import pyarrow.parquet as pq
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    pq.write_table(arrow_table, tmp_path, compression='zstd', row_group_size=ROW_GROUP_ROWS)
+    os.replace(tmp_path, path)
+
+
+def write_table(root, table, records, run_id, run_time, name=None):
+    """Writes one Parquet file with the run columns added to every record."""
+    import pyarrow as pa
+    schema = _schemas()[table]
+    rows = [dict(r, run_id=run_id, run_time=run_time) for r in records]
+    arrow_table = pa.Table.from_pylist(rows, schema=schema)
+    path = partition_path(root, table, run_time, name or run_id)
+    write_arrow(path, arrow_table)
+    return path
+
+
+def write_run(counts, details, scores, fetch_info=None, run_time=None, root=SNAPSHOT_ROOT):
+    """
+    Appends one run. counts is {country: {Gold, Silver, Bronze}}, details the
+    scraped medal list, scores the player score rows (see compute_player_scores),
+    fetch_info {'counts'|'details': {'revision_id', 'fetched_at'}}. Returns the run id.
+    """
+    run_time = run_time or datetime.now(timezone.utc)
+    run_id = run_id_for(run_time)
+    fetch_info = fetch_info or {}
+    records = run_records(counts, details, scores)
+
+    for table, rows in records.items():
+        if rows:
+            write_table(root, table, rows, run_id, run_time)
+
+    meta = {}
+    for page in ('counts', 'details'):
+        info = fetch_info.get(page, {})
+        meta[f'{page}_revision'] = info.get('revision_id')
+        meta[f'{page}_fetched_at'] = _parse_time(info.get('fetched_at'))
+    for table, rows in records.items():
+        meta[f'{table}_hash'] = content_hash(rows) if rows else None
+    meta['merged_runs'] = 1
+    # The runs row goes last: a run only "exists" once all of its data is on disk
+    write_table(root, 'runs', [meta], run_id, run_time)
+    print(f"Stored snapshot {run_id} ({', '.join(f'{t}: {len(r)}' for t, r in records.items())}).")
+    return run_id
+
+
+def read_table(table, root=SNAPSHOT_ROOT, run_ids=None, dates=None, columns=None):
+    """
+    Reads a table (or just some runs / dates of it) as a pyarrow Table.
+    Partition pruning means only the matching date directories are opened.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    path = os.path.join(root, table)
+    schema = _schemas()[table]
+    if not os.path.isdir(path):
+        return schema.empty_table()
+
+    partitioning = ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+    dataset = ds.dataset(path, schema=schema.append(pa.field('date', pa.string())),
+                         format='parquet', partitioning=partitioning)
+    flt = None
+    if dates is not None:
+        flt = ds.field('date').isin(list(dates))
+    if run_ids is not None:
+        by_run = ds.field('run_id').isin(list(run_ids))
+        flt = by_run if flt is None else flt & by_run
+    return dataset.to_table(columns=columns or schema.names, filter=flt)
@@ -0,0 +1,48 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import compact_snapshots
+import snapshot_store
+import time_travel
+
+NOW = datetime(2026, 2, 20, 12, tzinfo=timezone.utc)
+
+
+def write(root, when, norway):
+    snapshot_store.write_run({'Norway': {'Gold': norway, 'Silver': 0, 'Bronze': 0}}, [],
+                             [['Ross', norway, norway, norway, norway]], run_time=when, root=root)
+
+
+def parquet_files(root):
+    return sorted(os.path.relpath(os.path.join(d, f), root) for d, _, files in os.walk(root) for f in files)
+
+
+def test_identical_runs_fold_and_old_days_roll_up(tmp_path):
+    root = str(tmp_path)
+    day = datetime(2026, 2, 8, tzinfo=timezone.utc)
+    # Old day: 1, 1, 2, 2 -> only the day's last state survives, covering both of its runs
+    for hour, norway in zip((1, 2, 3, 4), (1, 1, 2, 2)):
+        write(root, day + timedelta(hours=hour), norway)
+    # Recent day: 3, 3, 4 -> full resolution, but the repeat folds into the first run
+    recent = datetime(2026, 2, 19, tzinfo=timezone.utc)
+    for hour, norway in zip((1, 2, 3), (3, 3, 4)):
+        write(root, recent + timedelta(hours=hour), norway)
+
+    compact_snapshots.compact(root, now=NOW)
+
+    runs = sorted(snapshot_store.read_table('runs', root=root).to_pylist(), key=lambda r: r['run_time'])
+    assert [(r['run_id'], r['merged_runs']) for r in runs] == [
+        ('20260208T030000Z', 2), ('20260219T010000Z', 2), ('20260219T030000Z', 1)]
+    assert runs[0]['valid_until'] == day + timedelta(hours=4)
+    assert all(f.endswith('compacted.parquet') for f in parquet_files(root))
+
+    # As-of queries between the folded runs still see the same data
+    index = time_travel.SnapshotIndex(root)
+    assert index.country_counts(recent + timedelta(hours=2, minutes=30))['Norway']['gold'] == 3
+    assert index.country_counts('2026-02-08')['Norway']['gold'] == 2
+
+    # Running it again changes nothing
+    before = parquet_files(root)
+    stats = compact_snapshots.compact(root, now=NOW)
+    assert stats['kept'] == 3 and stats['partitions'] == 0
+    assert parquet_files(root) == before
@@ -0,0 +1,72 @@
+import pytest
+from gspread.exceptions import APIError, WorksheetNotFound
+
+from fake_sheets import FakeClient
+
+KEY = 'test-sheet'
+
+
+def make_client(**kwargs):
+    return FakeClient({KEY: {'Results': [
+        ['Country', 'Gold', 'Silver', 'Bronze'],
+        ['Norway', '1', '0', '0'],
+    ]}}, **kwargs)
+
+
+def test_reads_and_writes_are_counted():
+    client = make_client()
+    ws = client.open_by_key(KEY).worksheet('Results')
+    ws.batch_update([{'range': 'B2', 'values': [[5]]}, {'range': 'C2:D2', 'values': [[2, 3]]}])
+    ws.append_rows([['Sweden', 1, 2, 3]])
+
+    assert ws.get_all_values() == [
+        ['Country', 'Gold', 'Silver', 'Bronze'],
+        ['Norway', '5', '2', '3'],
+        ['Sweden', '1', '2', '3'],
+    ]
+    assert client.stats.requests == 5
+    assert client.stats.cells_written == 7
+    assert client.stats.cells_read == 12
+
+
+def test_missing_worksheet_raises_gspread_error():
+    client = make_client()
+    with pytest.raises(WorksheetNotFound):
+        client.open_by_key(KEY).worksheet('Nope')
+
+
+def test_spreadsheet_batch_update_applies_requests_in_order():
+    client = make_client()
+    sh = client.open_by_key(KEY)
+    ws = sh.worksheet('Results')
+    sh.batch_update({'requests': [
+        {'appendCells': {'sheetId': ws.id, 'fields': 'userEnteredValue',
+                         'rows': [{'values': [{'userEnteredValue': {'stringValue': 'Total'}}]}]}},
+        {'deleteDimension': {'range': {'sheetId': ws.id, 'dimension': 'ROWS', 'startIndex': 2, 'endIndex': 3}}},
+    ]})
+    assert ws.get_all_values() == [['Country', 'Gold', 'Silver', 'Bronze'], ['Norway', '1', '0', '0']]
+    assert client.stats.calls['spreadsheet.batch_update'] == 1
+
+
+def test_quota_raises_429_until_the_window_passes():
+    now = [0.0]
+    client = make_client(quota_per_minute=2, clock=lambda: now[0])
+    client.open_by_key(KEY)
+    client.open_by_key(KEY)
+    with pytest.raises(APIError) as exc:
+        client.open_by_key(KEY)
+    assert exc.value.response.status_code == 429
+    assert client.stats.throttled == 1
+
+    now[0] = 61.0
+    client.open_by_key(KEY)
+
+
+def test_dump_and_load_round_trip(tmp_path):
+    client = make_client()
+    client.open_by_key(KEY).worksheet('Results').update('A3', [['Japan', 0, 1, 0]])
+    path = tmp_path / 'sheet.json'
+    client.dump(path)
+
+    restored = FakeClient.load(path)
+    assert restored.open_by_key(KEY).worksheet('Results').get_all_values()[-1] == ['Japan', '0', '1', '0']
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+import games
+from countries import CountryRegistry, weighted_medals
+
+
+@pytest.fixture
+def fake_games(tmp_path, monkeypatch):
+    for name, body in (('slow_a', 'time.sleep(0.3)'), ('slow_b', 'time.sleep(0.3)'), ('broken', 'raise RuntimeError("no page")')):
+        (tmp_path / f'{name}.py').write_text(f"import time\n\ndef run():\n    {body}\n", encoding='utf-8')
+    monkeypatch.setattr(games, 'ROOT', str(tmp_path))
+    monkeypatch.setattr(games, 'GAMES', {
+        name: {'title': name, 'pipeline': (f'{name}.py', 'run'), 'offline': False} for name in ('slow_a', 'slow_b', 'broken')
+    })
+
+
+def test_games_run_concurrently_and_failures_are_reported(fake_games):
+    start = time.monotonic()
+    errors = games.run_games()
+    assert time.monotonic() - start < 0.55
+    assert errors['slow_a'] is None and errors['slow_b'] is None
+    assert isinstance(errors['broken'], RuntimeError)
+
+
+def test_both_pipelines_share_config_and_registry():
+    olympics = games.load_pipeline('olympics')
+    paralympics = games.load_pipeline('paralympics')
+    assert olympics.DRAFTED_TEAMS is paralympics.DRAFTED_TEAMS is games.LEAGUE_DRAFT
+    assert olympics.WIKIPEDIA_URL_COUNTS == games.GAMES['olympics']['urls']['counts']
+    assert olympics.normalize_country_name("The Netherlands ") == 'netherlands'
+    assert paralympics.normalize_country_name('Czechia') == 'czech republic'
+
+
+def test_registry_strips_prefixes_then_applies_aliases():
+    registry = CountryRegistry({'Czechia': 'Czech Republic'})
+    assert registry.normalize("People's Republic of China") == 'china'
+    assert registry.normalize('CZECHIA') == 'czech republic'
+    assert registry.normalize(None) == ''
+    assert weighted_medals(2, 1, 3) == 11
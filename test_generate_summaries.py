@@ -0,0 +1,53 @@
+import csv
+import json
+import os
+
+import generate_summaries
+
+FIELDS = ['Country', 'Participants', 'Gold Medals', 'Silver Medals', 'Bronze Medals', 'Total Medals',
+          'Weighted Medals', 'Total Hardware', 'Weighted Hardware', 'Multiplied Medals', 'Multiplied Hardware']
+
+
+def write_inputs(norway_gold):
+    rows = [
+        ['Norway', 80, norway_gold, 1, 0, norway_gold + 1, norway_gold * 3 + 2, norway_gold + 4, 0, 10.5, 20.5],
+        ['Germany', 70, 2, 0, 0, 2, 6, 2, 0, 5.0, 5.0],
+    ]
+    with open('country_blog_data.csv', 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        writer.writerows(rows)
+    details = [{'Event': "Men's 4 x 10 km relay", 'Medal': 'Gold', 'Athlete': 'Team', 'Country': 'Norway'}]
+    with open('scraped_details.json', 'w', encoding='utf-8') as f:
+        json.dump(details, f)
+
+
+def test_one_changed_country_rewrites_only_its_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_inputs(3)
+    first = generate_summaries.generate_markdown()
+    assert first.written == 5  # master + four players
+    master = open('country_summaries.md', encoding='utf-8').read()
+    assert 'small team sports and relays' in master
+    assert '## Norway 🇳🇴' in master
+
+    before = {f: os.path.getmtime(f) for f in ('Maya_summaries.md', 'Drew_summaries.md')}
+    write_inputs(4)
+    second = generate_summaries.generate_markdown()
+    assert second.rendered == 1
+    assert sorted(second.files) == sorted(first.files)
+    assert second.written == 2  # the master file and Ross's
+    assert {f: os.path.getmtime(f) for f in before} == before
+    assert '4 🥇' in open('Ross_summaries.md', encoding='utf-8').read()
+
+    # Zero-medal drafted countries still get a section
+    assert 'did not bring home any medals' in open('Drew_summaries.md', encoding='utf-8').read()
+
+
+def test_json_feed_carries_the_event_mix(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_inputs(3)
+    generate_summaries.main(['--format', 'json'])
+    feed = json.load(open('country_summaries.json', encoding='utf-8'))
+    norway = next(item for item in feed['countries'] if item['display_name'] == 'Norway')
+    assert norway['event_mix'] == {'individual': 0, 'team': 1}
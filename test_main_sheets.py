@@ -0,0 +1,221 @@
+import pytest
+
+from fake_sheets import FakeClient, FakeSpreadsheet
+from flavor_index import FlavorIndex
+from main import (SHEET_KEY, calculate_draft_totals, cleanup_garbage_rows, repair_flavor_teams, update_flavor_tab,
+                  update_results_tab, update_summary_tab)
+from sheet_writes import WriteScheduler
+from totals_history import history_snapshots
+
+
+def results_client(rows):
+    return FakeClient({SHEET_KEY: {'Results': rows}})
+
+
+def test_cleanup_deletes_only_garbage_rows_in_one_call():
+    client = results_client([
+        ['Country', 'Gold', 'Silver', 'Bronze', 'Multiplier'],
+        ['Norway', '0', '0', '0', '1.5'],
+        ['35', '1', '1', '1', ''],
+        ['Totals', '9', '9', '9', ''],
+        ['Sweden', '0', '0', '0', '2'],
+        ['1', '', '', '', ''],
+    ])
+    writer = WriteScheduler()
+    snapshot = cleanup_garbage_rows(client, writer)
+    update_results_tab(client, {'Norway': {'Gold': 3, 'Silver': 2, 'Bronze': 1},
+                                'Sweden': {'Gold': 1, 'Silver': 0, 'Bronze': 0}},
+                       writer, data=snapshot)
+    writes_before = client.stats.writes
+    reads_before = client.stats.calls['get_all_values']
+    writer.flush()
+
+    ws = client.spreadsheets[SHEET_KEY]._by_title('Results')
+    assert ws.grid_values() == [
+        ['Country', 'Gold', 'Silver', 'Bronze', 'Multiplier'],
+        ['Norway', '3', '2', '1', '1.5'],
+        ['Sweden', '1', '0', '0', '2'],
+    ]
+    assert client.stats.writes - writes_before == 1
+    assert reads_before == 1
+    assert client.stats.calls['clear'] == 0
+
+
+def test_clean_tab_is_read_once_and_not_written():
+    client = results_client([['Country', 'Gold', 'Silver', 'Bronze'], ['Norway', '0', '0', '0']])
+    writer = WriteScheduler()
+    snapshot = cleanup_garbage_rows(client, writer)
+    assert snapshot == [['Country', 'Gold', 'Silver', 'Bronze'], ['Norway', '0', '0', '0']]
+    assert writer.pending == []
+    assert client.stats.calls['get_all_values'] == 1
+
+
+def flavor_client():
+    return FakeClient({SHEET_KEY: {'Flavor': [
+        ['Date', 'Country', 'Medal', 'Event', 'Athlete', 'Team'],
+        ['2026-02-07', 'Norway', 'Gold', 'Sprint', 'Johannes Klaebo', 'Ross'],
+    ]}})
+
+
+DETAILS = [
+    {'Event': 'Sprint', 'Medal': 'Gold', 'Athlete': 'Johannes Klaebo', 'Country': 'Norway'},
+    {'Event': 'Downhill', 'Medal': 'Silver', 'Athlete': 'Marco Odermatt', 'Country': 'Switzerland'},
+]
+TEAM_MAP = {'Ross': ['Norway'], 'Maya': ['Switzerland']}
+
+
+def test_flavor_index_skips_full_read_while_watermark_holds(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = flavor_client()
+    update_flavor_tab(client, DETAILS, TEAM_MAP)
+    assert client.stats.calls['get_all_values'] == 1  # First run builds the index
+
+    more = DETAILS + [{'Event': 'Slalom', 'Medal': 'Bronze', 'Athlete': 'Lara Gut', 'Country': 'Switzerland'}]
+    update_flavor_tab(client, more, TEAM_MAP)
+    assert client.stats.calls['get_all_values'] == 1
+    assert client.stats.calls['batch_get'] == 1
+
+    ws = client.spreadsheets[SHEET_KEY]._by_title('Flavor')
+    assert [r[4] for r in ws.grid_values()[1:]] == ['Johannes Klaebo', 'Marco Odermatt', 'Lara Gut']
+    assert ws.grid_values()[2][5] == 'Maya'
+
+
+def test_flavor_dates_are_sent_as_date_cells(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = flavor_client()
+    writer = WriteScheduler()
+    update_flavor_tab(client, DETAILS, TEAM_MAP, writer)
+    (_, request, _, _), = [p for p in writer.pending if 'appendCells' in p[1]]
+    date_cell = request['appendCells']['rows'][0]['values'][0]
+    assert date_cell['userEnteredFormat']['numberFormat']['type'] == 'DATE'
+    writer.flush()
+    assert client.spreadsheets[SHEET_KEY]._by_title('Flavor').grid_values()[-1][1] == 'Switzerland'
+
+
+def test_flavor_index_resyncs_when_tab_diverges(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = flavor_client()
+    update_flavor_tab(client, DETAILS, TEAM_MAP)
+
+    # Someone pastes a row by hand: the watermark no longer holds
+    ws = client.spreadsheets[SHEET_KEY]._by_title('Flavor')
+    ws._append([['2026-02-08', 'Italy', 'Gold', 'Luge', 'Dominik Fischnaller', 'Mom']])
+    update_flavor_tab(client, DETAILS + [
+        {'Event': 'Luge', 'Medal': 'Gold', 'Athlete': 'Dominik Fischnaller', 'Country': 'Italy'},
+    ], TEAM_MAP)
+
+    assert client.stats.calls['get_all_values'] == 2
+    assert len(ws.grid_values()) == 4
+
+
+def test_repair_only_examines_new_rows_until_the_draft_changes(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    client = FakeClient({SHEET_KEY: {'Flavor': [
+        ['Date', 'Country', 'Medal', 'Event', 'Athlete', 'Team'],
+        ['2026-02-07', 'Norway', 'Gold', 'Sprint', 'Johannes Klaebo', 'Free Agent'],
+        ['2026-02-07', 'Italy', 'Gold', 'Luge', 'Dominik Fischnaller', 'Free Agent'],
+    ]}})
+    ws = client.spreadsheets[SHEET_KEY]._by_title('Flavor')
+
+    repair_flavor_teams(client, TEAM_MAP)
+    assert [r[5] for r in ws.grid_values()[1:]] == ['Ross', 'Free Agent']
+    assert "Examining 2 of 2" in capsys.readouterr().out
+
+    repair_flavor_teams(client, TEAM_MAP)
+    assert "Examining 0 of 2" in capsys.readouterr().out
+    assert client.stats.calls['get_all_values'] == 1
+
+    repair_flavor_teams(client, dict(TEAM_MAP, Mom=['Italy']))
+    assert "Examining 2 of 2" in capsys.readouterr().out
+    assert [r[5] for r in ws.grid_values()[1:]] == ['Ross', 'Mom']
+
+
+def test_draft_totals_history_moves_to_its_own_tab():
+    draft = [['Ross', 'Maya', '', '', ''], ['Norway', 'Switzerland'], ['Italy', '']]
+    draft += [[''] * 5] * 7
+    draft += [['4', '2', '', '', 'Total Medals (Weighted)'], ['6', '2', '', '', 'Multiplied Total'], [''] * 5,
+              ['7', '3', '', '', 'Total Medals (Weighted)'], ['10.5', '3', '', '', 'Multiplied Total']]
+    client = FakeClient({SHEET_KEY: {
+        'Results': [['Country', 'Gold', 'Silver', 'Bronze', 'Multiplier'],
+                    ['Norway', '2', '1', '0', '1.5'], ['Switzerland', '1', '1', '0', '1']],
+        'Draft': draft,
+    }})
+    writer = WriteScheduler()
+    assert calculate_draft_totals(client, writer) == {'Ross': ['Norway', 'Italy'], 'Maya': ['Switzerland']}
+    writer.flush()
+    assert writer.api_calls == 1
+
+    sheet = client.spreadsheets[SHEET_KEY]
+    rows = sheet._by_title('Draft').grid_values()
+    assert len(rows) == 11
+    assert rows[-2:] == [['8', '5', '', '', 'Total Medals (Weighted)'], ['12', '5', '', '', 'Multiplied Total']]
+
+    calculate_draft_totals(client)
+    assert len(sheet._by_title('Draft').grid_values()) == 11
+    players, snapshots = history_snapshots(sheet._by_title('Totals History').grid_values())
+    assert players == ['Ross', 'Maya']
+    assert [totals['Ross'] for _, totals in snapshots] == [(4, 6), (7, 10.5), (8, 12), (8, 12)]
+    assert [bool(timestamp) for timestamp, _ in snapshots] == [False, False, True, True]
+
+
+def test_summary_tab_is_written_in_one_batch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakeClient({SHEET_KEY: {'Flavor': [
+        ['Date', 'Country', 'Medal', 'Event', 'Athlete', 'Team'],
+        ['2026-02-07', 'Norway', 'Gold', 'Sprint', 'Johannes Klaebo', 'Ross'],
+        # An older date cell as a US-locale sheet displays it
+        ['2/7/2026', 'Switzerland', 'Silver', 'Downhill', 'Marco Odermatt', 'Maya'],
+        ['2026-02-08', 'Norway', 'Bronze', 'Sprint', 'Johannes Klaebo', 'Ross'],
+        ['2026-02-08', 'Italy', 'Gold', 'Luge', 'Dominik Fischnaller', 'Free Agent'],
+    ]}})
+    details = [
+        {'Event': 'Sprint', 'Medal': 'Gold', 'Athlete': 'Johannes Klaebo', 'Country': 'Norway', 'Sport': 'Cross-country skiing'},
+        {'Event': 'Downhill', 'Medal': 'Silver', 'Athlete': 'Marco Odermatt', 'Country': 'Switzerland', 'Sport': 'Alpine skiing'},
+    ]
+    writer = WriteScheduler()
+    update_summary_tab(client, TEAM_MAP, details, writer)
+    writes_before = client.stats.writes
+    writer.flush()
+    assert client.stats.writes - writes_before == 1
+
+    rows = client.spreadsheets[SHEET_KEY]._by_title('Summary').grid_values()
+    assert rows[0][0] == 'Medals per Player per Day'
+    assert rows[1][:7] == ['Date', 'Ross', 'Maya', 'Free Agent', 'Ross (total)', 'Maya (total)', 'Free Agent (total)']
+    assert rows[2][:7] == ['2026-02-07', '1', '1', '0', '1', '1', '0']
+    assert rows[3][:7] == ['2026-02-08', '1', '0', '1', '2', '1', '1']
+    sport = rows[1].index('Sport')
+    assert [r[sport] for r in rows[2:5]] == ['Alpine skiing', 'Cross-country skiing', 'Other']
+    country = rows[1].index('Country')
+    assert rows[2][country:country + 6] == ['Norway', 'Ross', '1', '0', '1', '2']
+
+
+def test_chunked_flavor_append_resumes_after_a_timeout(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = flavor_client()
+    ws = client.spreadsheets[SHEET_KEY]._by_title('Flavor')
+    update_flavor_tab(client, DETAILS[:1], TEAM_MAP)  # Index now matches the tab
+    backlog = [{'Event': f'Heat {i}', 'Medal': 'Gold', 'Athlete': f'Skier {i}', 'Country': 'Norway'} for i in range(5)]
+
+    # The second chunk lands, but the response never makes it back
+    real_batch_update = FakeSpreadsheet.batch_update
+    calls = []
+
+    def flaky_batch_update(self, body):
+        calls.append(body)
+        result = real_batch_update(self, body)
+        if len(calls) == 2:
+            raise TimeoutError("read timed out")
+        return result
+
+    monkeypatch.setattr(FakeSpreadsheet, 'batch_update', flaky_batch_update)
+    index = FlavorIndex.load(SHEET_KEY)
+    index.chunk_rows = 2
+    with pytest.raises(TimeoutError):
+        update_flavor_tab(client, backlog, TEAM_MAP, index=index)
+    assert len(FlavorIndex.load(SHEET_KEY).rows) == 3  # Checkpoint after the first chunk
+
+    monkeypatch.setattr(FakeSpreadsheet, 'batch_update', real_batch_update)
+    update_flavor_tab(client, backlog, TEAM_MAP)
+    athletes = [r[4] for r in ws.grid_values()[1:]]
+    assert athletes == ['Johannes Klaebo'] + [f'Skier {i}' for i in range(5)]
+    assert len(FlavorIndex.load(SHEET_KEY).rows) == 6
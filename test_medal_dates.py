@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+
+import medal_dates
+import snapshot_store
+from fake_sheets import FakeClient
+from main import SHEET_KEY, repair_flavor_dates, update_flavor_tab
+
+SPRINT = {'Event': 'Sprint', 'Medal': 'Gold', 'Athlete': 'Johannes Klaebo', 'Country': 'Norway'}
+DOWNHILL = {'Event': 'Downhill', 'Medal': 'Silver', 'Athlete': 'Marco Odermatt', 'Country': 'Switzerland'}
+
+
+def at(day, hour=14):
+    return datetime(2026, 2, day, hour, tzinfo=timezone.utc)
+
+
+def test_first_seen_comes_from_the_earliest_snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    snapshot_store.write_run({}, [SPRINT], [], run_time=at(7))
+    snapshot_store.write_run({}, [SPRINT, DOWNHILL], [], run_time=at(9, 3))
+    first_seen = medal_dates.update_first_seen()
+    assert first_seen.award_date('Sprint', 'Gold', 'Johannes Klaebo') == '2026-02-07'
+    assert first_seen.award_date('Downhill', 'Silver', 'Marco Odermatt') == '2026-02-08'  # 03:00 UTC is still the 8th in CST
+
+    # Later calls only diff the new snapshots; a medal that drops out and comes back keeps its first date
+    snapshot_store.write_run({}, [DOWNHILL], [], run_time=at(10))
+    snapshot_store.write_run({}, [SPRINT, DOWNHILL], [], run_time=at(11))
+    first_seen = medal_dates.update_first_seen()
+    assert first_seen.award_date('Sprint', 'Gold', 'Johannes Klaebo') == '2026-02-07'
+    assert medal_dates.FirstSeen.load().last_run_time == at(11)
+
+
+def test_flavor_rows_use_the_attributed_dates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakeClient({SHEET_KEY: {'Flavor': [
+        ['Date', 'Country', 'Medal', 'Event', 'Athlete', 'Team'],
+        ['2026-02-10', 'Norway', 'Gold', 'Sprint', 'Johannes Klaebo', 'Ross'],
+    ]}})
+    first_seen = medal_dates.FirstSeen()
+    first_seen.apply_snapshots([(at(7), {medal_dates.record_key('Sprint', 'Gold', 'Johannes Klaebo')}),
+                                (at(8), {medal_dates.record_key('Downhill', 'Silver', 'Marco Odermatt'),
+                                         medal_dates.record_key('Sprint', 'Gold', 'Johannes Klaebo')})])
+
+    update_flavor_tab(client, [SPRINT, DOWNHILL], {'Ross': ['Norway'], 'Maya': ['Switzerland']}, first_seen=first_seen)
+    repair_flavor_dates(client, first_seen)
+    rows = client.spreadsheets[SHEET_KEY]._by_title('Flavor').grid_values()
+    assert [r[0] for r in rows[1:]] == ['2026-02-07', '2026-02-08']
+
+
+def test_date_repair_compares_dates_in_the_sheets_display_format(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = FakeClient({SHEET_KEY: {'Flavor': [
+        ['Date', 'Country', 'Medal', 'Event', 'Athlete', 'Team'],
+        ['2/10/2026', 'Norway', 'Gold', 'Sprint', 'Johannes Klaebo', 'Ross'],
+        ['2/6/2026', 'Switzerland', 'Silver', 'Downhill', 'Marco Odermatt', 'Maya'],
+        ['TBD', 'Norway', 'Gold', 'Relay', 'Norway', 'Ross'],
+    ]}})
+    first_seen = medal_dates.FirstSeen()
+    first_seen.apply_snapshots([(at(7), {medal_dates.record_key('Sprint', 'Gold', 'Johannes Klaebo'),
+                                         medal_dates.record_key('Downhill', 'Silver', 'Marco Odermatt'),
+                                         medal_dates.record_key('Relay', 'Gold', 'Norway')})])
+
+    repair_flavor_dates(client, first_seen)
+    rows = client.spreadsheets[SHEET_KEY]._by_title('Flavor').grid_values()
+    # Only the row dated after the medal first appeared moves; unparseable dates are left alone
+    assert [r[0] for r in rows[1:]] == ['2026-02-07', '2/6/2026', 'TBD']
@@ -0,0 +1,13 @@
+from bench_paralympics_joins import games, paralympics, run
+
+
+def test_joins_match_drafted_countries():
+    rows, scores = run(*games(180))
+    by_name = {r['NormName']: r for r in rows}
+    assert len(rows) == len(by_name)
+    usa = by_name[paralympics.normalize_country_name('USA')]
+    assert usa['Country'] == 'USA' and usa['Total Medals'] > 0
+    mom = next(p for p in scores if p['Player'] == 'Mom')
+    assert mom['Total Medals'] == usa['Total Medals']
+    ross = next(p for p in scores if p['Player'] == 'Ross')
+    assert ross['Total Medals'] == by_name['norway']['Total Medals']
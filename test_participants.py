@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import main
+import participants
+
+PAGE = """
+<html><body>
+<h2><span id="Participating_National_Olympic_Committees">Participating NOCs</span></h2>
+<ul>
+<li>United States (233)</li>
+<li>Norway[a] (80)</li>
+<li>Greece (4)</li>
+</ul>
+</body></html>
+"""
+
+NOW = datetime(2026, 2, 10, tzinfo=timezone.utc)
+
+
+class CountingFetch:
+    def __init__(self, html):
+        self.html = html
+        self.calls = 0
+
+    def __call__(self, url):
+        self.calls += 1
+        if self.html is None:
+            raise ConnectionError("offline")
+        return self.html
+
+
+def test_parse_participants():
+    assert participants.parse_participants(PAGE) == {'United States': 233, 'Norway': 80, 'Greece': 4}
+    assert participants.parse_participants("<html></html>") == {}
+
+
+def test_cache_is_reused_until_the_ttl_expires(tmp_path):
+    fetch = CountingFetch(PAGE)
+    first = participants.get_participants('olympics', directory=tmp_path, fetch=fetch, now=NOW)
+    again = participants.get_participants('olympics', directory=tmp_path, fetch=fetch, now=NOW + timedelta(days=29))
+    assert first == again == {'United States': 233, 'Norway': 80, 'Greece': 4}
+    assert fetch.calls == 1
+
+    participants.get_participants('olympics', directory=tmp_path, fetch=fetch, now=NOW + timedelta(days=31))
+    assert fetch.calls == 2
+    participants.get_participants('olympics', directory=tmp_path, fetch=fetch, now=NOW, refresh=True)
+    assert fetch.calls == 3
+
+
+def test_failed_refresh_falls_back_to_the_stale_cache(tmp_path):
+    participants.get_participants('olympics', directory=tmp_path, fetch=CountingFetch(PAGE), now=NOW)
+    offline = CountingFetch(None)
+    stale = participants.get_participants('olympics', directory=tmp_path, fetch=offline, now=NOW + timedelta(days=90))
+    assert stale['Greece'] == 4 and offline.calls == 1
+
+    assert participants.get_participants('olympics', directory=tmp_path, cached_only=True, fetch=offline) == stale
+    assert offline.calls == 1
+    assert participants.get_participants('paralympics', directory=tmp_path, cached_only=True) == {}
+
+
+def test_dynamic_multipliers():
+    multipliers, max_participants = participants.dynamic_multipliers({'United States': 233, 'Greece': 4, 'Nowhere': 0})
+    assert max_participants == 233
+    assert multipliers == {'United States': 1.0, 'Greece': 58.25, 'Nowhere': 1.0}
+    assert participants.dynamic_multipliers({}) == ({}, 0)
+
+
+def test_olympic_lookup_matches_draft_spellings():
+    lookup = main.multiplier_lookup({'United States': 1.0, 'Czechia': 2.0, 'Individual Neutral Athletes': 9.0})
+    assert main.multiplier_for('USA', lookup) == 1.0
+    assert main.multiplier_for('Czech Republic', lookup) == 2.0
+    assert main.multiplier_for('Individual Neutral Athletes', lookup) == 9.0
+    assert main.multiplier_for('Atlantis', lookup) == 1.0
+    assert main.multiplier_for('Atlantis', lookup, default=None) is None
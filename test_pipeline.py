@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+import main
+from bench_sheets import INPUT_FILES, build_client
+from pipeline import Pipeline, Stage, content_hash
+
+
+def counting_pipeline(calls, source_values):
+    def stage(name, func):
+        def run(**kwargs):
+            calls.append(name)
+            return func(**kwargs)
+        return run
+
+    return Pipeline([
+        Stage('a', stage('a', lambda: source_values['a']), [], ['a'], cache=False),
+        Stage('b', stage('b', lambda: source_values['b']), [], ['b'], cache=False),
+        Stage('double_a', stage('double_a', lambda a: a * 2), ['a'], ['a2']),
+        Stage('double_b', stage('double_b', lambda b: b * 2), ['b'], ['b2']),
+        Stage('total', stage('total', lambda a2, b2: a2 + b2), ['a2', 'b2'], ['total']),
+    ])
+
+
+def test_unchanged_stages_are_skipped_and_changes_flow_downstream(tmp_path):
+    cache_path = str(tmp_path / 'cache.json')
+    source_values = {'a': 1, 'b': 10}
+    calls = []
+    report = counting_pipeline(calls, source_values).run(cache_path=cache_path)
+    assert report['values']['total'] == 22
+    assert sorted(calls) == ['a', 'b', 'double_a', 'double_b', 'total']
+
+    calls.clear()
+    report = counting_pipeline(calls, source_values).run(cache_path=cache_path)
+    assert sorted(calls) == ['a', 'b']
+    assert report['values']['total'] == 22 and sorted(report['skipped']) == ['double_a', 'double_b', 'total']
+
+    # Only what reads the changed value runs
+    calls.clear()
+    source_values['a'] = 2
+    report = counting_pipeline(calls, source_values).run(cache_path=cache_path)
+    assert sorted(calls) == ['a', 'b', 'double_a', 'total']
+    assert report['values']['total'] == 24
+
+
+def test_from_and_only_selectors(tmp_path):
+    cache_path = str(tmp_path / 'cache.json')
+    source_values = {'a': 1, 'b': 10}
+    calls = []
+    counting_pipeline(calls, source_values).run(cache_path=cache_path)
+
+    calls.clear()
+    report = counting_pipeline(calls, source_values).run(cache_path=cache_path, only=['total'])
+    assert calls == ['total']
+    assert report['values']['total'] == 22 and 'double_a' in report['reused']
+
+    calls.clear()
+    counting_pipeline(calls, source_values).run(cache_path=cache_path, start='double_b')
+    assert calls == ['double_b', 'total']
+
+    with pytest.raises(ValueError):
+        counting_pipeline(calls, source_values).run(cache_path=cache_path, only=['nope'])
+
+
+def test_independent_stages_run_in_parallel(tmp_path):
+    pipeline = Pipeline([Stage(name, lambda: time.sleep(0.3), cache=False) for name in ('x', 'y', 'z')])
+    start = time.monotonic()
+    pipeline.run(cache_path=str(tmp_path / 'cache.json'))
+    assert time.monotonic() - start < 0.6
+
+
+def test_cycles_and_unhashable_inputs():
+    with pytest.raises(ValueError):
+        Pipeline([Stage('p', lambda q: q, ['q'], ['p']), Stage('q', lambda p: p, ['p'], ['q'])])
+    assert content_hash({'b': 1, 'a': [1, 2]}) == content_hash({'a': [1, 2], 'b': 1})
+    assert content_hash(object()) is None
+
+
+def test_main_only_reruns_what_a_medal_change_touches(tmp_path, monkeypatch):
+    for name in INPUT_FILES:
+        shutil.copy(name, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    client = build_client()
+    for _ in range(2):
+        main.main(client=client, offline=True)
+    report = main.main(client=client, offline=True)
+    assert {'results', 'flavor_append', 'summary', 'exports'} <= set(report['skipped'])
+
+    with open('scraped_medals.json', 'r') as f:
+        counts = json.load(f)
+    counts['Norway']['Gold'] += 1
+    with open('scraped_medals.json', 'w') as f:
+        json.dump(counts, f)
+    report = main.main(client=client, offline=True)
+    assert {'exports', 'results'} <= set(report['ran'])
+    # Details did not change, so neither did the Flavor tab
+    assert {'hardware', 'flavor_append', 'summary'} <= set(report['skipped'])
+    assert os.path.exists('player_scores.csv')
+
+
+def test_stages_whose_writes_failed_run_again(tmp_path, monkeypatch):
+    from fake_sheets import FakeSpreadsheet
+    for name in INPUT_FILES:
+        shutil.copy(name, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    client = build_client()
+    main.main(client=client, offline=True)
+
+    with open('scraped_medals.json', 'r') as f:
+        counts = json.load(f)
+    counts['Norway']['Gold'] += 5
+    with open('scraped_medals.json', 'w') as f:
+        json.dump(counts, f)
+
+    def sheet_down(self, body):
+        raise RuntimeError("sheet down")
+    with monkeypatch.context() as m:
+        m.setattr(FakeSpreadsheet, 'batch_update', sheet_down)
+        with pytest.raises(RuntimeError):
+            main.main(client=client, offline=True)
+
+    # The Results update never landed, so it is not skipped as unchanged
+    report = main.main(client=client, offline=True)
+    assert 'results' in report['ran']
+    rows = client.spreadsheets[main.SHEET_KEY]._by_title('Results').grid_values()
+    norway = next(row for row in rows if row[0] == 'Norway')
+    assert norway[1] == str(counts['Norway']['Gold'])
@@ -0,0 +1,34 @@
+import json
+
+import reports
+
+STAND = [
+    ('categories', [{'Category': 'Total Medals', 'Gold (1st)': 'Ross', 'Gold Score': 81, 'Silver (2nd)': 'Maya',
+                     'Silver Score': 68, 'Bronze (3rd)': 'Mom & Co', 'Bronze Score': 61}]),
+    ('players', [{'Player': 'Ross', 'Golds': 1, 'Silvers': 0, 'Bronzes': 0}]),
+    ('definitions', [{'Metric': 'Total Medals', 'Description': 'Count of medal "events" won'}]),
+]
+
+
+def test_one_model_three_formats(tmp_path):
+    paths = {}
+    for fmt in reports.FORMATS:
+        paths[fmt] = reports.report_path(str(tmp_path / 'stand'), fmt)
+        reports.write_report(paths[fmt], 'medal_stand', fmt, {'title': 'Medal Stand'}, STAND)
+
+    md = open(paths['md'], encoding='utf-8').read()
+    assert md.startswith('# Medal Stand\n\n## Category Winners')
+    assert '| **Total Medals** | Ross | 81 | Maya | 68 | Mom & Co | 61 |' in md
+
+    assert 'Mom &amp; Co' in open(paths['html'], encoding='utf-8').read()
+
+    feed = json.load(open(paths['json'], encoding='utf-8'))
+    assert feed['title'] == 'Medal Stand'
+    assert feed['players'] == STAND[1][1]
+    assert feed['definitions'][0]['Description'] == 'Count of medal "events" won'
+
+
+def test_templates_are_compiled_once():
+    first = reports.compile_templates('summaries', 'md')
+    assert reports.compile_templates('summaries', 'md') is first
+    assert set(first) >= {'header', 'countries_no_medals', 'countries_large_team'}
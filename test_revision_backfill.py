@@ -0,0 +1,42 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+import medal_dates
+from fake_wikipedia import FakeRevisionSource
+from revision_backfill import backfill
+
+START = datetime(2026, 2, 6, 12, tzinfo=timezone.utc)
+
+
+def medal(i):
+    return {'Event': f'Event {i}', 'Medal': 'Gold', 'Athlete': f'Athlete {i}', 'Country': 'NOR', 'Sport': 'Biathlon'}
+
+
+def history(n_revisions=200, added_at=(3, 3, 40, 41, 120, 199)):
+    """Revision r has every medal whose added_at index is <= r; most edits change nothing."""
+    snapshots = []
+    for r in range(n_revisions):
+        details = [medal(i) for i, rev in enumerate(added_at) if rev <= r]
+        snapshots.append((START + timedelta(hours=r), details))
+    return FakeRevisionSource.from_details(snapshots), added_at
+
+
+def test_bisection_finds_each_first_revision_with_few_fetches(tmp_path):
+    source, added_at = history()
+    first_seen = medal_dates.FirstSeen(str(tmp_path / 'first_seen.json'))
+    found = backfill(source, cache_dir=str(tmp_path / 'cache'), first_seen=first_seen)
+
+    for i, rev in enumerate(added_at):
+        key = medal_dates.record_key(f'Event {i}', 'Gold', f'Athlete {i}')
+        assert found[key] == (1000 + rev, START + timedelta(hours=rev))
+        assert first_seen.times[key] == START + timedelta(hours=rev)
+    assert source.fetches <= len(added_at) * math.ceil(math.log2(200)) + 2
+    assert source.fetches < 40
+
+
+def test_parsed_revisions_are_cached_on_disk(tmp_path):
+    source, _ = history()
+    backfill(source, cache_dir=str(tmp_path), dry_run=True)
+    fetched = source.fetches
+    backfill(source, cache_dir=str(tmp_path), dry_run=True)
+    assert source.fetches == fetched
@@ -0,0 +1,78 @@
+import json
+import shutil
+
+import pytest
+
+import main
+from bench_sheets import INPUT_FILES, build_client
+from fake_sheets import FakeClient
+from sheet_plan import PlanningScheduler
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    for name in INPUT_FILES:
+        shutil.copy(name, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def tabs(client):
+    return {ws.title: ws.grid_values() for ws in client.spreadsheets[main.SHEET_KEY]._worksheets}
+
+
+def test_dry_run_sends_nothing_and_lists_the_changes(workdir, capsys):
+    client = build_client()
+    before, writes_before = tabs(client), client.stats.writes
+
+    report = main.main(client=client, offline=True, dry_run=True, plan_path='plan.json')
+
+    # The live sheet and the local state are untouched
+    assert client.stats.writes == writes_before
+    assert tabs(client) == before
+    assert not (workdir / 'state').exists()
+    assert not (workdir / 'player_scores.csv').exists()
+
+    plan = report['plan']
+    steps = plan['steps']
+    assert any(s['op'] == 'cell' and s['tab'] == 'Results' and s['stage'] == 'results' for s in steps)
+    assert any(s['op'] == 'append' and s['tab'] == main.FLAVOR_TAB_NAME and s['stage'] == 'flavor_append'
+               for s in steps)
+    # Cells rewritten with the value they already hold are not in the plan
+    assert all(s['old'] != s['new'] for s in steps if s['op'] == 'cell')
+    assert plan['summary']['batch_updates'] >= 1
+
+    out = capsys.readouterr().out
+    assert 'Nothing was sent.' in out
+    assert '[results]' in out and '~ Results!' in out
+    with open(workdir / 'plan.json', encoding='utf-8') as f:
+        assert json.load(f) == plan
+
+
+def test_dry_run_after_a_real_run_only_plans_the_history_rows(workdir):
+    client = build_client()
+    first = main.main(client=client, offline=True, dry_run=True)['plan']
+    main.main(client=client, offline=True)
+    second = main.main(client=client, offline=True, dry_run=True)['plan']
+    assert first['summary']['cells'] > 0
+    # Every tab already holds these results; the draft still logs a Totals History row per player
+    assert second['summary']['cells'] == 0
+    assert {s['tab'] for s in second['steps']} == {'Totals History'}
+
+
+def test_clear_and_rewrite_only_plans_the_cells_that_differ():
+    client = FakeClient({'key': {'Tab': [['a', 'b'], ['c', 'd'], ['e', 'f']]}})
+    ws = client.open_by_key('key').worksheet('Tab')
+    writer = PlanningScheduler(label=lambda: 'test')
+    writer.clear(ws)
+    writer.update_cells(ws, [{'range': 'A1', 'values': [['a', 'B'], ['c', 'd']]}])
+    writer.delete_rows(ws, 3)
+    writer.append_rows(ws, [['g', 'h']])
+    writer.flush()
+
+    assert [(s['op'], s.get('cell')) for s in writer.plan.steps] == [('cell', 'B1'), ('delete', None), ('append', None)]
+    assert writer.plan.steps[0]['old'] == 'b' and writer.plan.steps[0]['new'] == 'B'
+    assert writer.plan.steps[1]['values'] == [['e', 'f']]
+    assert writer.plan.steps[2] == {'op': 'append', 'stage': 'test', 'tab': 'Tab', 'row': 3, 'values': [['g', 'h']]}
+    # The copy now holds what the live sheet would
+    assert ws.grid_values() == [['a', 'B'], ['c', 'd'], ['g', 'h']]
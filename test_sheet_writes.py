@@ -0,0 +1,121 @@
+import json
+from datetime import date
+
+import pytest
+import requests
+from gspread.exceptions import APIError
+
+from fake_sheets import FakeClient, FakeSpreadsheet
+from sheet_writes import Formula, WriteScheduler, parse_sheet_date
+
+KEY = 'test-sheet'
+
+
+def make_sheet(**kwargs):
+    client = FakeClient({KEY: {
+        'Results': [['Country', 'Gold', 'Silver', 'Bronze'], ['Norway', '0', '0', '0']],
+        'Flavor': [['Date', 'Country'], ['2026-02-07', 'Norway']],
+    }}, **kwargs)
+    sh = client.open_by_key(KEY)
+    return client, sh.worksheet('Results'), sh.worksheet('Flavor')
+
+
+def test_writes_to_several_tabs_share_one_call():
+    client, results, flavor = make_sheet()
+    writer = WriteScheduler()
+    writer.update_cells(results, [
+        {'range': 'B2', 'values': [[3]]},
+        {'range': 'C2', 'values': [[2]]},
+        {'range': 'D2', 'values': [[1]]},
+    ])
+    writer.append_rows(results, [['Sweden', 1, 0, 0]])
+    writer.append_rows(flavor, [['2026-02-08', 'Sweden']])
+    calls_before = client.stats.writes
+
+    assert writer.flush() == 1
+    assert client.stats.writes - calls_before == 1
+    assert results.grid_values()[1:] == [['Norway', '3', '2', '1'], ['Sweden', '1', '0', '0']]
+    assert flavor.grid_values()[-1] == ['2026-02-08', 'Sweden']
+    assert writer.pending == []
+
+
+def test_clear_then_append_keeps_its_order():
+    client, results, flavor = make_sheet()
+    writer = WriteScheduler()
+    writer.clear(flavor)
+    writer.append_rows(flavor, [['Date', 'Country', 'Medal']])
+    writer.flush()
+    assert flavor.grid_values() == [['Date', 'Country', 'Medal']]
+
+
+def test_rate_limited_flush_backs_off_and_retries():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    client, results, flavor = make_sheet(clock=lambda: now[0], sleep=sleep)
+    client.quota_per_minute = 1
+    results.append_rows([['Japan', 0, 0, 1]])  # Uses up this minute's write budget
+
+    writer = WriteScheduler(requests_per_minute=None, backoff=10, clock=lambda: now[0], sleep=sleep)
+    writer.append_rows(results, [['Italy', 1, 1, 1]])
+    writer.flush()
+
+    assert writer.retries > 0
+    assert client.stats.throttled == writer.retries
+    assert results.grid_values()[-1] == ['Italy', '1', '1', '1']
+    assert now[0] >= 60
+
+
+def test_dates_are_date_cells_and_only_formula_objects_are_formulas():
+    client, results, flavor = make_sheet()
+    writer = WriteScheduler()
+    writer.append_rows(flavor, [[date(2026, 2, 8), '=not a formula', Formula('=1+1')]])
+    (_, request, _, _), = writer.pending
+    cells = request['appendCells']['rows'][0]['values']
+    assert cells[0] == {'userEnteredValue': {'numberValue': 46061},
+                        'userEnteredFormat': {'numberFormat': {'type': 'DATE', 'pattern': 'yyyy-mm-dd'}}}
+    assert cells[1] == {'userEnteredValue': {'stringValue': '=not a formula'}}
+    assert cells[2] == {'userEnteredValue': {'formulaValue': '=1+1'}}
+    assert request['appendCells']['fields'] == 'userEnteredValue,userEnteredFormat.numberFormat'
+    writer.flush()
+    assert flavor.grid_values()[-1][0] == '2026-02-08'
+
+
+def test_parse_sheet_date_reads_display_formats():
+    for text in ('2026-02-07', '2/7/2026', '46060'):
+        assert parse_sheet_date(text) == date(2026, 2, 7)
+    assert parse_sheet_date('Date') is None and parse_sheet_date('') is None
+
+
+def server_error(status):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps({"error": {"code": status, "message": "backend error"}}).encode('utf-8')
+    return APIError(response)
+
+
+def test_appends_are_not_resent_after_a_server_error(monkeypatch):
+    client, results, flavor = make_sheet()
+    real_batch_update = FakeSpreadsheet.batch_update
+
+    def applied_then_503(self, body):
+        # The server applied the call, but the response says it failed
+        real_batch_update(self, body)
+        raise server_error(503)
+    monkeypatch.setattr(FakeSpreadsheet, 'batch_update', applied_then_503)
+
+    writer = WriteScheduler(requests_per_minute=None, sleep=lambda s: None)
+    writer.append_rows(flavor, [['2026-02-08', 'Sweden']])
+    with pytest.raises(APIError):
+        writer.flush()
+    assert writer.retries == 0
+    assert len(flavor.grid_values()) == 3
+
+    # Cell updates are idempotent, so those are retried
+    writer = WriteScheduler(requests_per_minute=None, max_retries=2, sleep=lambda s: None)
+    writer.update_cells(results, [{'range': 'B2', 'values': [[5]]}])
+    with pytest.raises(APIError):
+        writer.flush()
+    assert writer.retries == 2
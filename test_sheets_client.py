@@ -0,0 +1,52 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.oauth2.service_account import Credentials
+
+import sheets_client
+
+
+@pytest.fixture
+def service_account(monkeypatch):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption()).decode()
+    info = {
+        'type': 'service_account', 'project_id': 'test', 'private_key_id': '1', 'private_key': pem,
+        'client_email': 'bot@test.iam.gserviceaccount.com', 'token_uri': 'https://oauth2.googleapis.com/token',
+    }
+    monkeypatch.setenv('GOOGLE_CREDENTIALS', json.dumps(info))
+    monkeypatch.setattr(sheets_client, '_client', None)
+    return info
+
+
+def credentials_with_token(info, expires_in):
+    creds = Credentials.from_service_account_info(info, scopes=sheets_client.SCOPES)
+    creds.token = 'ya29.cached'
+    creds.expiry = datetime.utcnow() + expires_in
+    return creds
+
+
+def test_token_cache_is_encrypted_and_skips_the_exchange(service_account, tmp_path, monkeypatch):
+    path = str(tmp_path / 'token.bin')
+    sheets_client.save_cached_token(path, service_account, credentials_with_token(service_account, timedelta(hours=1)))
+    assert b'ya29.cached' not in open(path, 'rb').read()
+
+    def no_exchange(self, request):
+        raise AssertionError("token exchange should have been skipped")
+
+    monkeypatch.setattr(Credentials, 'refresh', no_exchange)
+    client = sheets_client.get_google_sheet_client(token_cache=path)
+    assert sheets_client.get_google_sheet_client() is client
+    assert client.http_client.session.credentials.token == 'ya29.cached'
+
+
+def test_token_close_to_expiry_is_not_reused(service_account, tmp_path):
+    path = str(tmp_path / 'token.bin')
+    sheets_client.save_cached_token(path, service_account, credentials_with_token(service_account, timedelta(minutes=2)))
+    fresh = Credentials.from_service_account_info(service_account, scopes=sheets_client.SCOPES)
+    assert not sheets_client.load_cached_token(path, service_account, fresh)
+    assert fresh.token is None
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+import pyarrow as pa
+
+import snapshot_store
+
+COUNTS = {'Norway': {'Gold': 3, 'Silver': 1, 'Bronze': 0}, 'Italy': {'Gold': 1, 'Silver': 0, 'Bronze': 2}}
+DETAILS = [{'Event': 'Sprint', 'Medal': 'Gold', 'Athlete': 'Johannes Klaebo', 'Country': 'Norway',
+            'Sport': 'Cross-country skiing'}]
+SCORES = [['Ross', 11, 16.5, 11, 16.5]]
+
+
+def test_runs_are_partitioned_by_date_and_read_back(tmp_path):
+    root = str(tmp_path)
+    first = snapshot_store.write_run(COUNTS, DETAILS, SCORES, root=root,
+                                     fetch_info={'counts': {'revision_id': 101, 'fetched_at': '2026-02-07T14:00:05Z'}},
+                                     run_time=datetime(2026, 2, 7, 14, 0, tzinfo=timezone.utc))
+    second = snapshot_store.write_run(dict(COUNTS, Japan={'Gold': 0, 'Silver': 0, 'Bronze': 1}), DETAILS, SCORES,
+                                      root=root, run_time=datetime(2026, 2, 8, 2, 0, tzinfo=timezone.utc))
+    assert (tmp_path / 'counts' / 'date=2026-02-08' / f'{second}.parquet').exists()
+
+    runs = snapshot_store.read_table('runs', root=root).to_pylist()
+    assert sorted(r['run_id'] for r in runs) == [first, second]
+    by_id = {r['run_id']: r for r in runs}
+    assert by_id[first]['counts_revision'] == 101
+    assert by_id[first]['details_hash'] == by_id[second]['details_hash']
+    assert by_id[first]['counts_hash'] != by_id[second]['counts_hash']
+
+    counts = snapshot_store.read_table('counts', root=root, dates=['2026-02-07'])
+    assert pa.types.is_dictionary(counts.schema.field('country').type)
+    assert sorted(counts.column('country').to_pylist()) == ['Italy', 'Norway']
+    assert snapshot_store.read_table('counts', root=root, run_ids=[second]).num_rows == 3
+
+
+def test_missing_table_reads_as_empty(tmp_path):
+    assert snapshot_store.read_table('scores', root=str(tmp_path)).num_rows == 0
@@ -0,0 +1,50 @@
+"""
+Startup budget for the offline commands, measured with python -X importtime.
+
+Recomputing CSVs from the cached JSON must not load the scraping, Sheets or
+plotting stacks: those load inside the stages that use them.
+"""
+import os
+import shutil
+import subprocess
+import sys
+
+from bench_sheets import INPUT_FILES
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = {'bs4', 'requests', 'urllib3', 'gspread', 'google', 'cryptography', 'pandas', 'pyarrow', 'matplotlib'}
+# Generous for a cold CI runner; a warm import of main takes ~25 ms
+STARTUP_BUDGET_MS = 400
+
+
+def importtime(args, cwd=ROOT):
+    """{top-level module: cumulative import ms} for one interpreter run."""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=cwd,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        top = name.strip().split('.')[0]
+        modules[top] = max(modules.get(top, 0), int(cumulative) / 1000)
+    return modules
+
+
+def test_importing_the_offline_modules_stays_light():
+    for module in ('main', 'tracker', 'generate_summaries', 'graph_results', 'run_teams'):
+        modules = importtime(['-c', f"import {module}"])
+        assert not HEAVY_MODULES & set(modules), (module, sorted(HEAVY_MODULES & set(modules)))
+        assert modules.get(module, 0) < STARTUP_BUDGET_MS
+
+
+def test_offline_exports_never_load_scraping_or_sheets(tmp_path):
+    for name in INPUT_FILES:
+        shutil.copy(os.path.join(ROOT, name), tmp_path)
+    modules = importtime([os.path.join(ROOT, 'main.py'), '--offline', '--only', 'exports'], cwd=tmp_path)
+    assert not HEAVY_MODULES & set(modules), sorted(HEAVY_MODULES & set(modules))
+    assert (tmp_path / 'player_scores.csv').exists()
+
+    modules = importtime([os.path.join(ROOT, 'run_teams.py')], cwd=tmp_path)
+    assert not HEAVY_MODULES & set(modules)
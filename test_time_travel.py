@@ -0,0 +1,47 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+import snapshot_store
+import time_travel
+from create_final_standings import chart_tables, load_history
+
+
+def scores(ross, maya):
+    return [['Ross', ross, ross * 2, ross, ross * 1.5], ['Maya', maya, maya * 2, maya, maya * 1.5]]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for day, (norway, ross, maya) in enumerate([(1, 3, 1), (2, 6, 4), (4, 12, 13)], start=7):
+        snapshot_store.write_run({'Norway': {'Gold': norway, 'Silver': 0, 'Bronze': 0}}, [], scores(ross, maya),
+                                 run_time=datetime(2026, 2, day, 14, tzinfo=timezone.utc))
+    return time_travel.SnapshotIndex()
+
+
+def test_as_of_picks_the_last_run_before_the_time(store):
+    assert store.run_at('2026-02-06') is None
+    assert store.run_at('2026-02-08T13:59')[0] == '20260207T140000Z'
+    assert store.country_counts('2026-02-08')['Norway']['gold'] == 2
+    assert [r['player'] for r in store.standings('2026-02-08')] == ['Ross', 'Maya']
+    assert [r['player'] for r in store.standings()] == ['Maya', 'Ross']
+
+
+def test_delta_between_two_times(store):
+    change = {r['player']: r for r in store.delta('standings', '2026-02-07', '2026-02-09')}
+    assert change['Maya']['final_score'] == 24
+    assert change['Ross']['medals'] == 9
+
+
+def test_cli_prints_json(store, capsys):
+    time_travel.main(['--json', 'counts', '--at', '2026-02-07'])
+    assert json.loads(capsys.readouterr().out) == [{'country': 'Norway', 'gold': 1, 'silver': 0, 'bronze': 0}]
+
+
+def test_final_standings_charts_build_from_snapshots(store):
+    players, history = load_history('snapshots')
+    weighted, multiplied = chart_tables(players, history)
+    assert weighted == [['Update #', 'Ross', 'Maya'], [1, 3, 1], [2, 6, 4], [3, 12, 13]]
+    assert multiplied[-1] == [3, 18.0, 19.5]
@@ -0,0 +1,49 @@
+import shutil
+
+import pytest
+
+import tracker
+from bench_sheets import INPUT_FILES
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    for name in INPUT_FILES:
+        shutil.copy(name, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_score_then_export_share_the_stage_cache(workdir, capsys):
+    tracker.main(['score', '--offline'])
+    out = capsys.readouterr().out
+    assert 'Final Score' in out and 'Ross' in out
+
+    # export needs details, counts and hardware: all reused from the score run
+    report = tracker.main(['export', '--offline'])
+    assert report['ran'] == ['exports']
+    assert {'details', 'counts', 'hardware'} <= set(report['reused'])
+    assert (workdir / 'player_scores.csv').exists()
+
+
+def test_summaries_pass_their_options_through(workdir):
+    tracker.main(['summaries', '--offline', '--format', 'html'])
+    assert (workdir / 'country_summaries.html').exists()
+    assert not (workdir / 'country_summaries.md').exists()
+
+
+def test_sync_sheets_reads_dates_instead_of_recording_a_snapshot(workdir):
+    from bench_sheets import build_client
+    import main
+    client = build_client()
+    main.main(client=client, offline=True)
+    report = main.main(client=client, offline=True, only=tracker.COMMAND_STAGES['sync-sheets'])
+    assert 'snapshot' in report['reused'] and 'snapshot' not in report['ran']
+    assert 'draft' in report['ran']
+
+
+def test_unknown_options_are_rejected(capsys):
+    with pytest.raises(SystemExit):
+        tracker.main(['export', '--bogus'])
+    with pytest.raises(SystemExit):
+        tracker.main(['nope'])
@@ -0,0 +1,118 @@
+import json
+import shutil
+from datetime import datetime, timedelta, timezone
+
+import main
+import watch
+from bench_sheets import INPUT_FILES, build_client
+from fake_sheets import FakeSpreadsheet
+
+# 10:00 in Milan on day 3 of the Olympics
+GAMES_DAY = datetime(2026, 2, 8, 9, 0, tzinfo=timezone.utc)
+KEYS = ['olympics']
+
+
+class FakeWorld:
+    """A clock that sleep() advances and a page that gets edited at chosen times."""
+
+    def __init__(self, start, edits=(), fail_runs=0):
+        self.now = start
+        self.edits = sorted(edits)
+        self.sleeps = []
+        self.runs = []
+        self.fail_runs = fail_runs
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += timedelta(seconds=seconds)
+
+    def probe(self, titles):
+        revid = 100 + sum(1 for when in self.edits if when <= self.now)
+        return {title: revid for title in titles}
+
+    def run(self, keys):
+        self.runs.append((self.now, list(keys)))
+        if self.fail_runs:
+            self.fail_runs -= 1
+            return {key: RuntimeError("sheet down") for key in keys}
+        return {key: None for key in keys}
+
+
+def test_pipeline_runs_only_when_a_page_changes():
+    world = FakeWorld(GAMES_DAY, edits=[GAMES_DAY + timedelta(hours=1)])
+    updates = watch.watch(KEYS, hours=2, probe=world.probe, run=world.run, sleep=world.sleep, clock=world.clock)
+    # The first poll warms everything up, then only the edit triggers a run
+    assert updates == 2
+    assert world.runs[1][0] >= GAMES_DAY + timedelta(hours=1)
+
+
+def test_failed_update_is_retried_on_the_next_poll():
+    world = FakeWorld(GAMES_DAY, fail_runs=1)
+    watch.watch(KEYS, hours=1, probe=world.probe, run=world.run, sleep=world.sleep, clock=world.clock)
+    assert len(world.runs) == 2
+    assert world.sleeps[0] == watch.MIN_POLL.total_seconds()
+
+
+def test_retry_after_a_failed_flush_updates_the_sheet(tmp_path, monkeypatch):
+    for name in INPUT_FILES:
+        shutil.copy(name, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    client = build_client()
+    world = FakeWorld(GAMES_DAY, edits=[GAMES_DAY + timedelta(hours=1)])
+
+    def sheet_down(self, body):
+        raise RuntimeError("sheet down")
+
+    def run(keys):
+        world.runs.append((world.now, list(keys)))
+        with monkeypatch.context() as m:
+            if len(world.runs) == 2:
+                # The edit: Norway wins a gold, but the sheet rejects the writes
+                with open('scraped_medals.json', 'r') as f:
+                    counts = json.load(f)
+                counts['Norway']['Gold'] += 1
+                with open('scraped_medals.json', 'w') as f:
+                    json.dump(counts, f)
+                m.setattr(FakeSpreadsheet, 'batch_update', sheet_down)
+            try:
+                main.main(client=client, offline=True)
+            except RuntimeError as e:
+                return {key: e for key in keys}
+        return {key: None for key in keys}
+
+    watch.watch(KEYS, hours=2, probe=world.probe, run=run, sleep=world.sleep, clock=world.clock)
+    assert len(world.runs) == 3
+    with open('scraped_medals.json', 'r') as f:
+        gold = json.load(f)['Norway']['Gold']
+    rows = client.spreadsheets[main.SHEET_KEY]._by_title('Results').grid_values()
+    assert next(row for row in rows if row[0] == 'Norway')[1] == str(gold)
+
+
+def test_interval_backs_off_to_the_time_of_day_ceiling():
+    interval = None
+    for _ in range(10):
+        interval = watch.next_interval(GAMES_DAY, interval, False, KEYS)
+    assert interval == watch.ACTIVE_MAX_POLL
+    assert watch.next_interval(GAMES_DAY, interval, True, KEYS) == watch.MIN_POLL
+
+    # 02:00 in Milan: slow, but awake for the 08:00 start
+    night = datetime(2026, 2, 9, 1, 0, tzinfo=timezone.utc)
+    interval = watch.next_interval(night, watch.IDLE_MAX_POLL, False, KEYS)
+    assert interval == watch.IDLE_MAX_POLL
+    interval = watch.next_interval(night + timedelta(hours=5), watch.IDLE_MAX_POLL, False, KEYS)
+    assert interval == timedelta(hours=1)
+
+
+def test_watch_stops_when_the_games_are_over():
+    world = FakeWorld(datetime(2026, 3, 1, tzinfo=timezone.utc))
+    assert watch.watch(KEYS, probe=world.probe, run=world.run, sleep=world.sleep, clock=world.clock) == 0
+    assert world.runs == []
+
+
+def test_watched_titles():
+    titles = watch.watched_titles('olympics')
+    assert titles == ['2026 Winter Olympics medal table', 'List of 2026 Winter Olympics medal winners']
+    assert 'Biathlon at the 2026 Winter Paralympics' in watch.watched_titles('paralympics')
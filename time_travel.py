@@ -0,0 +1,171 @@
+"""
+Time-travel queries over the snapshot store (see snapshot_store.py).
+
+    python time_travel.py runs
+    python time_travel.py standings --at 2026-02-12
+    python time_travel.py counts --at 2026-02-12T18:00
+    python time_travel.py scores --at 2026-02-12 --json
+    python time_travel.py delta standings --from 2026-02-10 --to 2026-02-15
+
+"As of" means the last run at or before the given time. A date on its own
+means the end of that day (UTC). The runs table (run id + run time only) is
+loaded once and kept sorted, so finding the run is a bisect and only that
+run's date partition is read. Nothing here needs Google credentials.
+"""
+import argparse
+import bisect
+import json
+from datetime import datetime, time, timezone
+
+import snapshot_store
+
+KINDS = {
+    # kind: (table, key column, numeric columns)
+    'standings': ('scores', 'player', ['final_score', 'weighted_hw', 'multiplied_medals', 'medals']),
+    'scores': ('scores', 'player', ['weighted_hw', 'final_score', 'medals', 'multiplied_medals']),
+    'counts': ('counts', 'country', ['gold', 'silver', 'bronze']),
+}
+
+
+def parse_when(value):
+    """'2026-02-12' (end of that day), ISO date-times (naive = UTC), or 'now'."""
+    if value is None or value == 'now':
+        return datetime.now(timezone.utc)
+    if isinstance(value, datetime):
+        when = value
+    elif len(value) == 10:
+        when = datetime.combine(datetime.fromisoformat(value).date(), time.max)
+    else:
+        when = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return when if when.tzinfo else when.replace(tzinfo=timezone.utc)
+
+
+class SnapshotIndex:
+    """Sorted run-time index over the stored runs, plus a cache of loaded runs."""
+
+    def __init__(self, root=snapshot_store.SNAPSHOT_ROOT):
+        self.root = root
+        runs = snapshot_store.read_table('runs', root=root, columns=['run_id', 'run_time']).to_pylist()
+        runs.sort(key=lambda r: r['run_time'])
+        self.times = [r['run_time'] for r in runs]
+        self.run_ids = [r['run_id'] for r in runs]
+        self._loaded = {}
+
+    def __len__(self):
+        return len(self.run_ids)
+
+    def run_at(self, when):
+        """(run_id, run_time) of the last run at or before when, or None."""
+        i = bisect.bisect_right(self.times, parse_when(when)) - 1
+        if i < 0:
+            return None
+        return self.run_ids[i], self.times[i]
+
+    def rows(self, table, run_id, run_time):
+        key = (table, run_id)
+        if key not in self._loaded:
+            date = run_time.astimezone(timezone.utc).strftime('%Y-%m-%d')
+            self._loaded[key] = snapshot_store.read_table(table, root=self.root, run_ids=[run_id], dates=[date]).to_pylist()
+        return self._loaded[key]
+
+    def table_at(self, table, when):
+        run = self.run_at(when)
+        return self.rows(table, *run) if run else []
+
+    # --- Queries ---
+
+    def country_counts(self, when=None):
+        """{country: {'gold', 'silver', 'bronze'}} as of when."""
+        return {r['country']: {k: r[k] for k in ('gold', 'silver', 'bronze')} for r in self.table_at('counts', when)}
+
+    def player_scores(self, when=None):
+        """{player: {'weighted_hw', 'final_score', 'medals', 'multiplied_medals'}} as of when."""
+        cols = KINDS['scores'][2]
+        return {r['player']: {k: r[k] for k in cols} for r in self.table_at('scores', when)}
+
+    def standings(self, when=None):
+        """Players ranked by Final Score as of when: [{'rank', 'player', ...scores}]."""
+        scores = self.player_scores(when)
+        ranked = sorted(scores.items(), key=lambda kv: kv[1]['final_score'], reverse=True)
+        return [dict(rank=i + 1, player=p, **s) for i, (p, s) in enumerate(ranked)]
+
+    def delta(self, kind, start, end):
+        """Change in each numeric column between two times, per player or country."""
+        table, key, cols = KINDS[kind]
+        before = {r[key]: r for r in self.table_at(table, start)}
+        after = {r[key]: r for r in self.table_at(table, end)}
+        changes = []
+        for name in sorted(set(before) | set(after)):
+            old, new = before.get(name, {}), after.get(name, {})
+            changes.append(dict({key: name}, **{c: (new.get(c) or 0) - (old.get(c) or 0) for c in cols}))
+        changes.sort(key=lambda r: r[cols[0]], reverse=True)
+        return changes
+
+    def score_history(self):
+        """
+        Every run's player scores, oldest first:
+        (players, [(run_time, {player: {'medals', 'multiplied_medals', ...}})]).
+        """
+        rows = snapshot_store.read_table('scores', root=self.root).to_pylist()
+        by_run = {}
+        for r in rows:
+            by_run.setdefault(r['run_time'], {})[r['player']] = {c: r[c] for c in KINDS['scores'][2]}
+        players = []
+        for run_time in sorted(by_run):
+            for p in by_run[run_time]:
+                if p not in players:
+                    players.append(p)
+        return players, sorted(by_run.items())
+
+
+def print_table(rows):
+    if not rows:
+        print("(no data)")
+        return
+    headers = list(rows[0])
+    cells = [[f"{v:.2f}" if isinstance(v, float) else str(v) for v in r.values()] for r in rows]
+    widths = [max(len(h), *(len(c[i]) for c in cells)) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    for c in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(c, widths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query stored medal snapshots as of any time.")
+    parser.add_argument('--root', default=snapshot_store.SNAPSHOT_ROOT, help="Snapshot store directory")
+    parser.add_argument('--json', action='store_true', help="Print JSON instead of a table")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('runs', help="List stored runs")
+    for kind in KINDS:
+        p = sub.add_parser(kind, help=f"{kind} as of a time")
+        p.add_argument('--at', default='now', help="Date or ISO time (default: now)")
+    p = sub.add_parser('delta', help="Change between two times")
+    p.add_argument('kind', choices=sorted(KINDS))
+    p.add_argument('--from', dest='start', required=True)
+    p.add_argument('--to', dest='end', default='now')
+    args = parser.parse_args(argv)
+
+    index = SnapshotIndex(args.root)
+    if args.command == 'runs':
+        rows = [{'run_id': r, 'run_time': t.isoformat()} for r, t in zip(index.run_ids, index.times)]
+    elif args.command == 'delta':
+        rows = index.delta(args.kind, args.start, args.end)
+    else:
+        run = index.run_at(args.at)
+        if run and not args.json:
+            print(f"As of run {run[0]} ({run[1].isoformat()}):")
+        if args.command == 'standings':
+            rows = index.standings(args.at)
+        elif args.command == 'scores':
+            rows = [dict(player=p, **s) for p, s in index.player_scores(args.at).items()]
+        else:
+            rows = [dict(country=c, **m) for c, m in sorted(index.country_counts(args.at).items())]
+
+    if args.json:
+        print(json.dumps(rows, indent=2, default=str))
+    else:
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Draft totals over time, kept in a narrow append-only "Totals History" tab.
+
+calculate_draft_totals used to write a new Weighted / Multiplied block below
+the roster on every run, so the Draft tab grew forever and every reader had
+to step over old totals. Now the Draft tab only holds the current totals and
+each run appends one row per player here:
+
+    Timestamp | Player | Weighted Total | Multiplied Total
+
+The first run after the switch copies the old Draft blocks across (with a
+blank timestamp, we never recorded when they were written) and deletes them.
+"""
+from sheet_writes import get_or_create_worksheet
+
+TOTALS_HISTORY_TAB_NAME = 'Totals History'
+TOTALS_HISTORY_HEADERS = ['Timestamp', 'Player', 'Weighted Total', 'Multiplied Total']
+TOTALS_LABEL_COL = 4  # Column E holds the "Total Medals (Weighted)" / "Multiplied Total" labels
+WEIGHTED_LABEL = 'Total Medals (Weighted)'
+MULTIPLIED_LABEL = 'Multiplied Total'
+
+
+def totals_label(row):
+    """'weighted', 'multiplied' or None for a Draft tab row."""
+    if len(row) <= TOTALS_LABEL_COL:
+        return None
+    context = row[TOTALS_LABEL_COL].strip()
+    if "Weighted" in context or "Total Medals" in context:
+        return 'weighted'
+    if "Multiplied Total" in context:
+        return 'multiplied'
+    return None
+
+
+def _number(val):
+    val = str(val).strip().replace(',', '')
+    try:
+        return int(val)
+    except ValueError:
+        pass
+    try:
+        return float(val)
+    except ValueError:
+        return val
+
+
+def draft_totals_blocks(draft_data, players):
+    """
+    Old-style totals blocks found anywhere in the Draft tab, oldest first.
+    players is {col_index: name}. Returns [{name: (weighted, multiplied)}].
+    """
+    weighted, multiplied = [], []
+    for row in draft_data:
+        label = totals_label(row)
+        if not label:
+            continue
+        scores = {name: _number(row[i]) if i < len(row) and row[i].strip() else 0
+                  for i, name in players.items()}
+        (weighted if label == 'weighted' else multiplied).append(scores)
+
+    blocks = []
+    for w, m in zip(weighted, multiplied):
+        blocks.append({name: (w[name], m[name]) for name in w})
+    return blocks
+
+
+def history_rows(timestamp, totals):
+    """totals is {player: (weighted, multiplied)} in column order."""
+    return [[timestamp, name, w, m] for name, (w, m) in totals.items()]
+
+
+def history_snapshots(history_data):
+    """
+    Groups Totals History rows back into one snapshot per run.
+    Returns (players, [(timestamp, {player: (weighted, multiplied)})]).
+
+    Rows of one run share a timestamp; migrated rows have none, so a new
+    snapshot also starts whenever a player shows up twice.
+    """
+    players = []
+    snapshots = []
+    for row in history_data[1:]:
+        if len(row) < 4 or not row[1].strip():
+            continue
+        timestamp, name = row[0].strip(), row[1].strip()
+        if name not in players:
+            players.append(name)
+        if not snapshots or snapshots[-1][0] != timestamp or name in snapshots[-1][1]:
+            snapshots.append((timestamp, {}))
+        snapshots[-1][1][name] = (_number(row[2]), _number(row[3]))
+    return players, snapshots
+
+
+def get_or_create_history_tab(sheet):
+    """Returns (worksheet, created)."""
+    return get_or_create_worksheet(sheet, TOTALS_HISTORY_TAB_NAME, cols=len(TOTALS_HISTORY_HEADERS))
@@ -0,0 +1,142 @@
+"""
+One command line for the Olympics tracker.
+
+    python tracker.py run [--offline] [--from STAGE | --only A,B] [--no-cache]
+    python tracker.py scrape                  # fetch the Wikipedia pages and delegation sizes
+    python tracker.py score [--offline]       # print the player standings
+    python tracker.py export [--offline]      # the CSVs
+    python tracker.py sync-sheets [--offline] # everything that writes the spreadsheet
+    python tracker.py sync-sheets --dry-run [--plan-json plan.json]  # what it would change
+    python tracker.py summaries [--format md --format html ...]
+    python tracker.py history record|compact|query|graph|chart-tabs [...]
+    python tracker.py bench [--runs 3 ...]
+    python tracker.py stages                  # the pipeline stages and their inputs
+
+The pipeline commands run a slice of main()'s stages (pipeline.py). They
+share its artifact cache (state/pipeline_cache.json): whatever a command
+needs from outside its slice is taken from the last run of those stages, so
+`export` after `scrape` recomputes the CSVs without fetching anything again,
+and a scheduled job can run only the stages that are due. Without a cached
+copy the upstream stages just run (from the scraped JSON with --offline).
+
+The other commands wrap the existing scripts (generate_summaries.py,
+compact_snapshots.py, time_travel.py, graph_results.py,
+create_final_standings.py, bench_sheets.py) and take the same options.
+"""
+import argparse
+import sys
+
+# Pipeline commands: the stages of main.build_pipeline() each one runs
+COMMAND_STAGES = {
+    'scrape': ['details', 'counts', 'multipliers'],
+    'score': ['scores'],
+    'export': ['exports'],
+    'sync-sheets': ['cleanup', 'results', 'draft', 'flavor_probe', 'flavor_append', 'flavor_dates', 'flavor_repair',
+                    'summary'],
+}
+# history <action>: the script behind each one
+HISTORY_ACTIONS = {
+    'compact': ('compact_snapshots', 'main'),
+    'query': ('time_travel', 'main'),
+    'graph': ('graph_results', 'cli'),
+    'chart-tabs': ('create_final_standings', 'main'),
+}
+
+
+def run_stages(command, offline=False, force=True, dry_run=False, plan_path=None):
+    import main
+    return main.main(offline=offline, only=COMMAND_STAGES[command], force=force, dry_run=dry_run, plan_path=plan_path)
+
+
+def print_scores(report):
+    scores = report['values'].get('player_scores')
+    if not scores:
+        print("No valid medal counts cached or scraped; nothing to score.")
+        return
+    print(f"{'Player':<8} {'Weighted HW':>12} {'Final Score':>12} {'Medals':>7} {'Mult. Medals':>13}")
+    for player, weighted_hw, final_score, medals, multiplied_medals in scores:
+        print(f"{player:<8} {weighted_hw:>12} {final_score:>12.2f} {medals:>7} {multiplied_medals:>13.2f}")
+
+
+def run_summaries(argv, offline=False):
+    import generate_summaries
+    # The summaries read the exported CSVs; bring them up to date first (skipped if unchanged)
+    run_stages('export', offline=offline, force=False)
+    generate_summaries.main(argv)
+
+
+def run_history(action, argv):
+    if action == 'record':
+        import main
+        return main.main(only=['snapshot'], offline='--offline' in argv)
+    import importlib
+    module, func = HISTORY_ACTIONS[action]
+    return getattr(importlib.import_module(module), func)(argv)
+
+
+def list_stages():
+    import main
+    pipeline = main.build_pipeline()
+    commands = {stage: command for command, stages in COMMAND_STAGES.items() for stage in stages}
+    for name in pipeline.order:
+        deps = ', '.join(sorted(pipeline.deps(name)))
+        print(f"{name:<15} {commands.get(name, ''):<12} {'<- ' + deps if deps else ''}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Olympics medal tracker.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    # Commands that wrap a script pass every other option on to it
+    sub.add_parser('run', help="The full update (same as python main.py)", add_help=False)
+    sub.add_parser('scrape', help="Fetch medal counts, details and delegation sizes")
+    for name, text in (('score', "Print the player standings"), ('export', "Write the CSV exports")):
+        p = sub.add_parser(name, help=text)
+        p.add_argument('--offline', action='store_true', help="Use scraped_*.json if nothing is cached")
+    sync = sub.add_parser('sync-sheets', help="Update the spreadsheet tabs")
+    sync.add_argument('--offline', action='store_true', help="Use scraped_*.json if nothing is cached")
+    sync.add_argument('--dry-run', action='store_true', help="Print the changes to the sheet without writing them")
+    sync.add_argument('--plan-json', metavar='PATH', help="With --dry-run, also save the change plan as JSON")
+    p = sub.add_parser('summaries', help="Write the country and player summaries", add_help=False)
+    p.add_argument('--offline', action='store_true')
+    p = sub.add_parser('history', help="Snapshot history: record, compact, query, graph, chart-tabs", add_help=False)
+    p.add_argument('action', choices=['record'] + list(HISTORY_ACTIONS))
+    sub.add_parser('bench', help="Benchmark a run against the fake sheet", add_help=False)
+    sub.add_parser('stages', help="List the pipeline stages")
+    return parser
+
+
+PASS_THROUGH = ('run', 'summaries', 'history', 'bench')
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if rest and args.command not in PASS_THROUGH:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    if args.command == 'run':
+        import main as tracker_main
+        return tracker_main.cli(rest)
+    if args.command == 'scrape':
+        return run_stages('scrape')
+    if args.command == 'score':
+        return print_scores(run_stages('score', offline=args.offline, force=False))
+    if args.command == 'sync-sheets':
+        if args.plan_json and not args.dry_run:
+            parser.error("--plan-json needs --dry-run")
+        return run_stages(args.command, offline=args.offline, dry_run=args.dry_run, plan_path=args.plan_json)
+    if args.command == 'export':
+        return run_stages(args.command, offline=args.offline)
+    if args.command == 'summaries':
+        return run_summaries(rest, offline=args.offline)
+    if args.command == 'history':
+        return run_history(args.action, rest)
+    if args.command == 'bench':
+        import bench_sheets
+        return bench_sheets.main(rest)
+    if args.command == 'stages':
+        return list_stages()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,169 @@
+"""
+Watch mode: one long-running process for the whole Games.
+
+The cron workflows start cold twice a day: pip install, interpreter start,
+imports, Sheets auth and a full scrape, whether or not anything changed.
+watch() instead keeps one process alive. The pooled HTTP session
+(http_client), the Sheets client (sheets_client), the country registries
+and the imported pipelines all stay warm between updates.
+
+Each poll is a single MediaWiki API request for the latest revision ids of
+every page the pipelines read. A Games' pipeline runs only when one of its
+pages has a new revision, and main()'s stage cache (pipeline.py) then skips
+whatever that edit did not touch.
+
+Polling adapts:
+- After a change it polls every MIN_POLL.
+- While nothing changes, the interval doubles up to a ceiling. The ceiling
+  is ACTIVE_MAX_POLL during competition hours (Italian time, while a Games
+  is on) and IDLE_MAX_POLL otherwise.
+- Sleeps never run past the start of the next competition day.
+
+    python watch.py                       # every Games, until the last one ends
+    python watch.py olympics --hours 5.5  # e.g. inside a CI job's time limit
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import unquote
+from zoneinfo import ZoneInfo
+
+from games import GAMES
+
+WIKIPEDIA_API = 'https://en.wikipedia.org/w/api.php'
+COMPETITION_TZ = ZoneInfo('Europe/Rome')
+COMPETITION_HOURS = (8, 24) # Local start and end hour of a competition day
+MIN_POLL = timedelta(minutes=2)
+ACTIVE_MAX_POLL = timedelta(minutes=15)
+IDLE_MAX_POLL = timedelta(hours=2)
+
+
+def page_title(url):
+    """Wikipedia URL -> page title as the API reports it ('2026 Winter Olympics medal table')."""
+    return unquote(url.rstrip('/').rsplit('/', 1)[-1]).replace('_', ' ')
+
+
+def watched_titles(key):
+    """Titles of the pages a Games' update reads (its delegation sizes are cached for weeks)."""
+    config = GAMES[key]
+    urls = [url for kind, url in config['urls'].items() if kind != 'games']
+    urls += [url for url, _ in config.get('sport_pages', [])]
+    return sorted({page_title(url) for url in urls})
+
+
+def probe_revisions(titles):
+    """{title: latest revision id} in one API request (None for a missing page)."""
+    import http_client
+    response = http_client.get(WIKIPEDIA_API, params={
+        'action': 'query', 'format': 'json', 'formatversion': 2,
+        'prop': 'revisions', 'rvprop': 'ids', 'titles': '|'.join(titles),
+    })
+    response.raise_for_status()
+    query = response.json().get('query', {})
+    renamed = {n['to']: n['from'] for n in query.get('normalized', [])}
+    revisions = {title: None for title in titles}
+    for page in query.get('pages', []):
+        title = renamed.get(page['title'], page['title'])
+        revs = page.get('revisions') or [{}]
+        revisions[title] = revs[0].get('revid')
+    return revisions
+
+
+def games_on(now, keys):
+    """Whether any of these Games is on (local date) at now."""
+    today = now.astimezone(COMPETITION_TZ).date()
+    return any(date.fromisoformat(GAMES[k]['dates'][0]) <= today <= date.fromisoformat(GAMES[k]['dates'][1])
+               for k in keys)
+
+
+def games_over(now, keys):
+    """Whether every one of these Games has ended (a day of slack for late edits)."""
+    today = now.astimezone(COMPETITION_TZ).date()
+    return all(today > date.fromisoformat(GAMES[k]['dates'][1]) + timedelta(days=1) for k in keys)
+
+
+def competition_hours(now, keys):
+    local = now.astimezone(COMPETITION_TZ)
+    return games_on(now, keys) and COMPETITION_HOURS[0] <= local.hour < COMPETITION_HOURS[1]
+
+
+def next_interval(now, previous, changed, keys):
+    """How long to sleep after a poll at now (see the module docstring)."""
+    if changed or previous is None:
+        interval = MIN_POLL
+    else:
+        interval = previous * 2
+    if competition_hours(now, keys):
+        return min(interval, ACTIVE_MAX_POLL)
+    interval = min(interval, IDLE_MAX_POLL)
+    # Wake up for the start of the next competition day
+    local = now.astimezone(COMPETITION_TZ)
+    day_start = local.replace(hour=COMPETITION_HOURS[0], minute=0, second=0, microsecond=0)
+    if day_start <= local:
+        day_start += timedelta(days=1)
+    if games_on(day_start, keys):
+        interval = min(interval, day_start - local)
+    return max(interval, timedelta(seconds=1))
+
+
+def run_changed(keys):
+    """Runs the pipelines of these Games (imported once, so warm after the first run)."""
+    import games
+    return games.run_games(keys)
+
+
+def watch(keys=None, hours=None, probe=probe_revisions, run=run_changed, sleep=time.sleep, clock=None):
+    """
+    Polls until every watched Games is over (or for `hours`). Returns how
+    many times a pipeline was run.
+    """
+    keys = list(keys or GAMES)
+    clock = clock or (lambda: datetime.now(timezone.utc))
+    titles = {key: watched_titles(key) for key in keys}
+    all_titles = sorted({t for ts in titles.values() for t in ts})
+    deadline = clock() + timedelta(hours=hours) if hours else None
+    seen = {}
+    interval = None
+    updates = 0
+
+    while True:
+        now = clock()
+        if (deadline and now >= deadline) or (not deadline and games_over(now, keys)):
+            print(f"Watch finished after {updates} update(s).")
+            return updates
+        try:
+            revisions = probe(all_titles)
+        except Exception as e:
+            print(f"Revision probe failed: {e}")
+            revisions = None
+
+        changed = []
+        if revisions is not None:
+            changed = [key for key in keys if any(revisions.get(t) != seen.get(t) for t in titles[key])]
+        if changed:
+            print(f"[{now.astimezone(COMPETITION_TZ):%Y-%m-%d %H:%M}] New revisions for {', '.join(changed)}; updating.")
+            errors = run(changed) or {}
+            updates += 1
+            for key in changed:
+                # A failed update keeps the old revisions, so the next poll retries it. main()
+                # only caches a stage once its Sheets writes have landed, so the retry redoes them.
+                if not errors.get(key):
+                    seen.update({t: revisions.get(t) for t in titles[key]})
+
+        interval = next_interval(now, interval, bool(changed), keys)
+        sleep(interval.total_seconds())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep the trackers updated from one long-running process.")
+    parser.add_argument('games', nargs='*', help=f"Any of {', '.join(GAMES)} (default: all of them)")
+    parser.add_argument('--hours', type=float, help="Stop after this many hours (default: when the Games are over)")
+    args = parser.parse_args(argv)
+    unknown = [key for key in args.games if key not in GAMES]
+    if unknown:
+        parser.error(f"unknown Games: {', '.join(unknown)}")
+    watch(args.games or None, hours=args.hours)
+
+
+if __name__ == "__main__":
+    main()